@@ -3,6 +3,7 @@ from PyQt6.QtWidgets import QApplication
 from PyQt6.QtGui import QFontDatabase, QIcon
 
 from src.views.MainWindow import MainWindow
+from src.models.MigrationRunner import MigrationRunner
 
 if __name__ == "__main__":    
     app = QApplication(sys.argv)
@@ -14,9 +15,20 @@ if __name__ == "__main__":
     else:
         print("Font loaded successfully!")
 
+    # The application also works on an older schema, only slower, so a failed migration
+    # is reported instead of keeping the application from starting
+    migrationError = None
+    try:
+        MigrationRunner.migrate()
+    except Exception as e:
+        print(f"Error: {e}")
+        migrationError = e
+
     window = MainWindow()
     window.setWindowTitle("UtiliTrack")
     window.setMinimumSize(1280, 720)
     window.show()
+    if migrationError is not None:
+        window.setStatusBarText(f"Could not update the database schema: {migrationError}")
     
     sys.exit(app.exec())
\ No newline at end of file
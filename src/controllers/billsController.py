@@ -8,19 +8,46 @@ from src.models.UtilityDatabaseTable import UtilityDatabaseTable as Utility
 from src.models.InstalledUtilityDatabaseTable import InstalledUtilityDatabaseTable as InstalledUtility
 
 from src.controllers.utilitiesController import UtilitiesController
+from src.controllers.eventBus import EventBus, Entity, ChangeType
 
 from src.utils.formatMoney import formatMoney
 
 class BillsController:
     
     @staticmethod
-    def fetchBills(currentPage: int, sortingOrder: str, sortingField: str, searchValue: str) -> tuple[list[dict[str, str]], int]:
+    def fetchBills(currentPage: int, sortingOrder: str, sortingField: str, searchValue: str, cursor: tuple = None, withCount: bool = True) -> tuple[list[dict[str, str]], int | None, tuple]:
         """
-        Fetches all units with pagination, sorting, and searching.
+        Fetches all bills with pagination, sorting, and searching.
+        If the cursor of the page is given, the page is read after it instead of skipping the previous pages.
+        Also returns the cursor of the next page.
+        If withCount is False, the number of pages is None unless it is cached, and countBills() reads it.
         """
         print(f"Fetching bills in page {currentPage} sorted by {sortingField} {sortingOrder} while searching for {searchValue}")
-        
-        searchValue = searchValue.replace("'", "''")
+
+        searchValue, months, day, year, nullSearch = BillsController.__searchFilters(searchValue)
+
+        fetchedBills, totalCount = Bill.uniqueReadPage(searchValue, sortingField, sortingOrder, months, day, year, page=currentPage, nullSearch=nullSearch, after=cursor, withTotal=withCount)
+        totalPages =  totalCount // 50 + 1 if totalCount is not None else None
+        nextCursor = (fetchedBills[-1][sortingField], fetchedBills[-1]["BillID"]) if len(fetchedBills) > 0 else None
+        for bill in fetchedBills:
+            bill["TotalAmount"] = formatMoney(amount = bill["TotalAmount"])
+            bill["DueDate"] = bill["DueDate"].strftime("%B %d, %Y")
+        return fetchedBills, totalPages, nextCursor
+
+    @staticmethod
+    def countBills(searchValue: str) -> int:
+        """
+        Counts the pages of the bills matching the search.
+        """
+        searchValue, months, day, year, nullSearch = BillsController.__searchFilters(searchValue)
+        return Bill.uniqueReadPageTotal(searchValue, months, day, year, nullSearch) // 50 + 1
+
+    @staticmethod
+    def __searchFilters(searchValue: str) -> tuple[str | None, list[str], str, str, bool]:
+        """
+        Splits the search text into the filters of the bills listing: the search value,
+        the months, day and year of a searched date, and whether bills without a unit match.
+        """
         searchValue = None if searchValue == "" else searchValue
         nullSearch = False
         monthsMap = {"January" : "1", "February" : "2", "March" : "3", "April" : "4", "May" : "5", "June" : "6", "July": "7",
@@ -49,12 +76,7 @@ class BillsController:
                         if len(splitSearch) > 2:
                             year = splitSearch[2] if splitSearch[2].isdigit else ""
 
-        totalPages =  Bill.uniqueTotalCount(searchValue, months, day, year, nullSearch=nullSearch) // 50 + 1
-        fetchedBills = Bill.uniqueRead(searchValue, sortingField, sortingOrder, months, day, year, page=currentPage, nullSearch=nullSearch)
-        for bill in fetchedBills:
-            bill["TotalAmount"] = formatMoney(amount = bill["TotalAmount"])
-            bill["DueDate"] = bill["DueDate"].strftime("%B %d, %Y")
-        return fetchedBills, totalPages 
+        return searchValue, months, day, year, nullSearch
     
     @staticmethod
     def addBill(unitID: str, utilityID: str, totalAmount: str, billingPeriodStart: QDate, billingPeriodEnd: QDate, status: str, dueDate: QDate) -> str:
@@ -83,7 +105,7 @@ class BillsController:
             return "Total Amount cannot be negative"
         
         # Get unit ID using unitName and UtilityID using utilityType
-        Bill.create({
+        billID = Bill.create({
             "UnitID": unitID,
             "UtilityID": utilityID,
             "TotalAmount": str(totalAmount),
@@ -92,6 +114,7 @@ class BillsController:
             "Status": status,
             "DueDate": dueDate.toString("yyyy-MM-dd")
         })
+        EventBus.publish(Entity.BILL, ChangeType.ADDED, [billID])
         return "Bill added successfully"
 
     @staticmethod
@@ -156,6 +179,7 @@ class BillsController:
         }
 
         Bill.update(int(originalID), editedColumns)
+        EventBus.publish(Entity.BILL, ChangeType.EDITED, [int(originalID)], list(editedColumns))
         return "Bill edited successfully"
         
     @staticmethod
@@ -165,4 +189,5 @@ class BillsController:
         """
         print("Deleting bill:", id)
         Bill.delete([int(id)])
+        EventBus.publish(Entity.BILL, ChangeType.DELETED, [int(id)])
         return "Bill deleted successfully"
\ No newline at end of file
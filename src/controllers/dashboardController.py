@@ -21,12 +21,14 @@ class DashboardController:
                 range = r
                 break
         offsetInt = (diffMonths(datetime.now(), offset)) // range.value + 1
-        unitBills = Bill.getAllGroupedBills(range = range, offset=offsetInt)
+        # Ranges of a year or more are charted per month, which the monthly rollup answers
+        unitBills = Bill.getAllGroupedBills(range = range, offset=offsetInt, monthly = range.value >= Range.ONE_YEAR.value)
         for utility in unitBills.keys():
             for bill in unitBills[utility]:
                 bill["BillingPeriodEnd"] = bill["BillingPeriodEnd"].strftime("%Y-%m-%d")
 
-        earliestBillDate = Bill.getEarliestBillDate() if Bill.getEarliestBillDate() is not None else date.today() - relativedelta(months=monthRange)
+        earliestBillDate = Bill.getEarliestBillDate()
+        earliestBillDate = earliestBillDate if earliestBillDate is not None else date.today() - relativedelta(months=monthRange)
         return unitBills, datetime.now() - relativedelta(dt1=datetime.now(), dt2=datetime.combine(earliestBillDate,datetime.min.time())) + relativedelta(months=monthRange)
 
     @staticmethod
@@ -40,9 +42,10 @@ class DashboardController:
                 range = r
                 break
         offsetInt = diffMonths(datetime.now(), currPage) // range.value + 1
-        totalUnpaid, totalCost, unpaidBillCount = (formatMoney(Bill.unpaidBillsTotalSum(range, filters, offset=offsetInt)), 
-                                formatMoney(Bill.billsTotalSum(range, filters, offset=offsetInt)),
-                                str(Bill.unpaidBillsCount(range, filters, offset=offsetInt)))
+        summary = Bill.billsSummary(range, filters, offset=offsetInt, overdue=False)
+        totalUnpaid, totalCost, unpaidBillCount = (formatMoney(summary["UnpaidAmount"]),
+                                formatMoney(summary["TotalAmount"]),
+                                str(summary["UnpaidCount"]))
         return (totalUnpaid, totalCost, unpaidBillCount)
 
     @staticmethod
@@ -0,0 +1,107 @@
+from enum import Enum
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+class Entity(Enum):
+    """
+    Enum class for the kinds of records a change event can be about.
+    """
+    UNIT = "Unit"
+    UTILITY = "Utility"
+    BILL = "Bill"
+
+class ChangeType(Enum):
+    """
+    Enum class for what happened to the records of a change event.
+    """
+    ADDED = "Added"
+    EDITED = "Edited"
+    DELETED = "Deleted"
+
+class ChangeEvent:
+    """
+    Describes records that were added, edited or deleted by a controller.
+    - entity: The kind of the records.
+    - change: What happened to the records.
+    - ids: The IDs of the records.
+    - columns: The columns that were edited, or None if every column may have changed.
+    Deleting a record also deletes the records referring to it, e.g. deleting a unit
+    deletes its bills.
+    """
+
+    def __init__(self, entity : Entity, change : ChangeType, ids : list[int], columns : list[str] = None):
+        self.entity = entity
+        self.change = change
+        self.ids = list(ids)
+        self.columns = None if columns is None else list(columns)
+
+    def touches(self, columns : list[str]) -> bool:
+        """
+        Returns True if any of the given columns may have changed.
+        """
+        return self.columns is None or any(column in self.columns for column in columns)
+
+    def affects(self, columns : list[str]) -> bool:
+        """
+        Returns True if the change may alter what a widget shows of the changed records,
+        for a widget that shows the given columns of them next to records of another
+        entity. Added records are not shown yet, deleted records take the records
+        referring to them along, and edited records only matter if a shown column changed.
+        """
+        if self.change == ChangeType.ADDED:
+            return False
+        if self.change == ChangeType.DELETED:
+            return True
+        return self.touches(columns)
+
+    def __repr__(self) -> str:
+        return f"ChangeEvent({self.entity.value}, {self.change.value}, {self.ids}, {self.columns})"
+
+class EventBus(QObject):
+    """
+    Delivers the change events the controllers publish to the widgets that subscribed
+    to them. Events are delivered on the thread the bus was created on, the GUI thread
+    since the pages subscribe when they are built: right away if they are published on
+    it, or queued if they are published from a worker thread.
+    """
+    __changed = pyqtSignal(object)
+    __instance : 'EventBus' = None
+
+    def __init__(self):
+        super().__init__()
+        self.__subscribers = []
+        self.__changed.connect(self.__deliver)
+
+    @staticmethod
+    def instance() -> 'EventBus':
+        if EventBus.__instance is None:
+            EventBus.__instance = EventBus()
+        return EventBus.__instance
+
+    @staticmethod
+    def subscribe(handler, entities : list[Entity]):
+        """
+        Calls the handler with every change event about the given entities.
+        - handler: A callable taking a ChangeEvent.
+        - entities: The entities the handler renders.
+        """
+        EventBus.instance().__subscribers.append((handler, set(entities)))
+
+    @staticmethod
+    def publish(entity : Entity, change : ChangeType, ids : list[int], columns : list[str] = None):
+        """
+        Tells the subscribers about records that were added, edited or deleted.
+        - entity: The kind of the records.
+        - change: What happened to the records.
+        - ids: The IDs of the records.
+        - columns: The columns that were edited, or None if every column may have changed.
+        """
+        EventBus.instance().__changed.emit(ChangeEvent(entity, change, ids, columns))
+
+    def __deliver(self, event : ChangeEvent):
+        for handler, entities in list(self.__subscribers):
+            if event.entity in entities:
+                try:
+                    handler(event)
+                except Exception as e:
+                    print(f"Error: {e}")
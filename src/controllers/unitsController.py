@@ -5,6 +5,9 @@ from src.models.UnitDatabaseTable import UnitDatabaseTable as Unit
 from src.models.UtilityDatabaseTable import UtilityDatabaseTable as Utility
 from src.models.InstalledUtilityDatabaseTable import InstalledUtilityDatabaseTable as InstalledUtility
 from src.models.BillDatabaseTable import BillDatabaseTable as Bill
+from src.models.DataLoader import DataLoader
+from src.models.DatabaseConnection import DatabaseConnection
+from src.controllers.eventBus import EventBus, Entity, ChangeType
 
 from src.utils.constants import Range
 from src.utils.diffMonths import diffMonths
@@ -12,17 +15,29 @@ from src.utils.diffMonths import diffMonths
 class UnitsController:
 
     @staticmethod
-    def fetchUnits(currentPage: int, sortingOrder: str, sortingField: str, searchValue: str) -> tuple[list[dict[str, str]], int]:
+    def fetchUnits(currentPage: int, sortingOrder: str, sortingField: str, searchValue: str, cursor: tuple = None, withCount: bool = True) -> tuple[list[dict[str, str]], int | None, tuple]:
         """
         Fetches all units with pagination, sorting, and searching.
+        If the cursor of the page is given, the page is read after it instead of skipping the previous pages.
+        Also returns the cursor of the next page.
+        If withCount is False, the number of pages is None unless it is cached, and countUnits() reads it.
         """
         print(f"Fetching units in page {currentPage} sorted by {sortingField} {sortingOrder} while searching for {searchValue}")
 
-        searchValue = searchValue.replace("'", "''")
         searchValue = None if searchValue == "" else searchValue
 
-        totalPages =  Unit.totalCount(searchValue=searchValue) // 50 + 1
-        return Unit.read(page=currentPage, sortBy=sortingField, order=sortingOrder, searchValue=searchValue), totalPages
+        fetchedUnits, totalCount = Unit.readPage(page=currentPage, sortBy=sortingField, order=sortingOrder, searchValue=searchValue, after=cursor, withTotal=withCount)
+        totalPages =  totalCount // 50 + 1 if totalCount is not None else None
+        nextCursor = (fetchedUnits[-1][sortingField], fetchedUnits[-1]["UnitID"]) if len(fetchedUnits) > 0 else None
+        return fetchedUnits, totalPages, nextCursor
+
+    @staticmethod
+    def countUnits(searchValue: str) -> int:
+        """
+        Counts the pages of the units matching the search.
+        """
+        searchValue = None if searchValue == "" else searchValue
+        return Unit.readPageTotal(searchValue=searchValue) // 50 + 1
 
     @staticmethod
     def addUnit(name: str, address: str, type: str) -> str:
@@ -43,16 +58,13 @@ class UnitsController:
         if len(errorMessage) > 0:
             return errorMessage
 
-        #Data Reformat
-        name = name.replace("'", "''")
-        address = address.replace("'", "''")
-
         #Unique Name Error Check
         if Unit.doesUnitNameExist(name):
             return (f"{name} already exists. Please input another name.")
 
         print("Adding unit:", name, address, type)
-        Unit.create({"Name" : name, "Address" : address, "Type" : type})
+        unitID = Unit.create({"Name" : name, "Address" : address, "Type" : type})
+        EventBus.publish(Entity.UNIT, ChangeType.ADDED, [unitID])
         return "Unit added successfully"
 
     @staticmethod
@@ -63,9 +75,14 @@ class UnitsController:
         id = int(id)
         unitInfo = Unit.readOne(id)
         installedUtilites = []
-        for utilityID in InstalledUtility.getUnitUtilities(id):
-            utilityInfo = Utility.readOne(utilityID)
-            utilityInfo["isShared"] = InstalledUtility.isUtilityShared(utilityID)
+        utilityIDs = InstalledUtility.getUnitUtilities(id)
+        utilities = DataLoader(Utility.readMany)
+        sharedUtilities = DataLoader(InstalledUtility.areUtilitiesShared)
+        utilities.loadMany(utilityIDs)
+        sharedUtilities.loadMany(utilityIDs)
+        for utilityID in utilityIDs:
+            utilityInfo = utilities.get(utilityID)
+            utilityInfo["isShared"] = sharedUtilities.get(utilityID)
             installedUtilites.append(utilityInfo)
         unitBills = Bill.getUnitBills(id, range = Range.THREE_MONTHS)
         for utility in unitBills.keys():
@@ -103,13 +120,6 @@ class UnitsController:
         if len(errorMessage) > 0:
             return errorMessage
         
-        #Data Reformat
-        name = name.replace("'", "''")
-        address = address.replace("'", "''")
-        for origKey in originalData.keys():
-            if isinstance(originalData[origKey], str):
-                originalData[origKey] = originalData[origKey].replace("'", "''")
-
         #Error Check
         if name != originalData["Name"] and Unit.doesUnitNameExist(name):
             return f"{name} already exists. Please input another name."
@@ -120,18 +130,21 @@ class UnitsController:
             editedColumns["Address"] = address
         if type != originalData["Type"]:
             editedColumns["Type"] = type
-            if type == "Individual":
+
+        if editedColumns == {}:
+            return "No changes made."
+
+        # The unit and its utilities change together or not at all
+        with DatabaseConnection.transaction():
+            if editedColumns.get("Type") == "Individual":
                 utilitiesInstalled = InstalledUtility.getUnitUtilities(originalID)
                 for utility in utilitiesInstalled:
                     for unit in InstalledUtility.getUtilityUnits(utility):
                         if unit["UnitID"] != originalID:
                             InstalledUtility.delete([unit["UnitID"], utility])
+            Unit.update(originalID, editedColumns)
 
-        if editedColumns == {}:
-            return "No changes made."
-
-        Unit.update(originalID, editedColumns)
-
+        EventBus.publish(Entity.UNIT, ChangeType.EDITED, [originalID], list(editedColumns))
         return "Unit edited successfully"
 
     @staticmethod
@@ -140,6 +153,7 @@ class UnitsController:
         Deletes a new unit with the given data.
         """
         Unit.delete([int(id)])
+        EventBus.publish(Entity.UNIT, ChangeType.DELETED, [int(id)])
         return "Unit deleted successfully"
 
     @staticmethod
@@ -165,10 +179,9 @@ class UnitsController:
             for bill in unitBills[utility]:
                 bill["BillingPeriodEnd"] = bill["BillingPeriodEnd"].strftime("%Y-%m-%d")
 
-        earliestBillDates = Bill.getEarliestUnitBillDates(id) if Bill.getEarliestUnitBillDates(id) is not None else None
-        if earliestBillDates is not None:
-            for utility in earliestBillDates.keys():
-                earliestBillDates[utility] = earliestBillDates[utility] if earliestBillDates[utility] is not None else date.today()
+        earliestBillDates = Bill.getEarliestUnitBillDates(id)
+        for utility in earliestBillDates.keys():
+            earliestBillDates[utility] = earliestBillDates[utility] if earliestBillDates[utility] is not None else date.today()
         print(earliestBillDates)
         earliestBillDate = min(earliestBillDates.values()) if len(earliestBillDates.values()) > 0 else date.today() - relativedelta(months=monthRange)
         return unitBills, datetime.now() - relativedelta(dt1=datetime.now(), dt2=datetime.combine(earliestBillDate,datetime.min.time())) + relativedelta(months=monthRange)
\ No newline at end of file
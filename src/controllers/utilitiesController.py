@@ -9,6 +9,9 @@ from src.models.UtilityDatabaseTable import UtilityDatabaseTable as Utility
 from src.models.UnitDatabaseTable import UnitDatabaseTable as Unit
 from src.models.BillDatabaseTable import BillDatabaseTable as Bill
 from src.models.InstalledUtilityDatabaseTable import InstalledUtilityDatabaseTable as InstalledUtility
+from src.models.DataLoader import DataLoader
+from src.models.DatabaseConnection import DatabaseConnection
+from src.controllers.eventBus import EventBus, Entity, ChangeType
 
 from src.utils.constants import Range
 from src.utils.diffMonths import diffMonths
@@ -17,25 +20,49 @@ from src.utils.constants import UTILITIES
 class UtilitiesController:
     
     @staticmethod
-    def fetchUtilities(currentPage: int, sortingOrder: str, sortingField: str, searchValue: str) -> tuple[list[dict[str, str]], int]:
+    def fetchUtilities(currentPage: int, sortingOrder: str, sortingField: str, searchValue: str, cursor: tuple = None, withCount: bool = True) -> tuple[list[dict[str, str]], int | None, tuple]:
         """
         Fetches all utilitys with pagination, sorting, and searching.
+        If the cursor of the page is given, the page is read after it instead of skipping the previous pages.
+        Also returns the cursor of the next page.
+        If withCount is False, the number of pages is None unless it is cached, and countUtilities() reads it.
         """
         print(f"Fetching utilities in page {currentPage} sorted by {sortingField} {sortingOrder} while searching for {searchValue}")
-        searchValue = searchValue.replace("'", "''")
+        searchValue, nullSearch = UtilitiesController.__searchFilters(searchValue)
+        fetchedUtils, totalCount = InstalledUtility.uniqueReadPage(searchValue,
+                                            sortingField,
+                                            sortingOrder,
+                                            page=currentPage,
+                                            nullSearch=nullSearch,
+                                            after=cursor,
+                                            withTotal=withCount)
+        totalPages =  totalCount // 50 + 1 if totalCount is not None else None
+        nextCursor = None
+        if len(fetchedUtils) > 0:
+            lastUtil = fetchedUtils[-1]
+            nextCursor = (lastUtil[sortingField], lastUtil["UtilityID"], lastUtil["UnitID"])
+        return fetchedUtils, totalPages, nextCursor
+
+    @staticmethod
+    def countUtilities(searchValue: str) -> int:
+        """
+        Counts the pages of the utilities matching the search.
+        """
+        searchValue, nullSearch = UtilitiesController.__searchFilters(searchValue)
+        return InstalledUtility.uniqueReadPageTotal(searchValue, nullSearch) // 50 + 1
+
+    @staticmethod
+    def __searchFilters(searchValue: str) -> tuple[str | None, bool]:
+        """
+        Returns the search value of the utilities listing and whether utilities without
+        a unit match it.
+        """
         searchValue = None if searchValue == "" else searchValue
         nullSearch = False
         if searchValue is not None:
             regex = re.escape(searchValue)
             nullSearch = True if re.search(regex, "None", re.IGNORECASE) else False
-        totalPages =  InstalledUtility.uniqueTotalCount(searchValue, nullSearch=nullSearch) // 50 + 1
-
-        fetchedUtils = InstalledUtility.uniqueRead(searchValue,
-                                            sortingField,
-                                            sortingOrder,
-                                            page=currentPage,
-                                            nullSearch=nullSearch)
-        return fetchedUtils, totalPages
+        return searchValue, nullSearch
 
     @staticmethod
     def addUtility(type: str, mainUnitID: str, sharedUnitIDs: list[str], status: str, billingCycle: str, installationDate : QDate) -> str:
@@ -50,44 +77,43 @@ class UtilitiesController:
         if len(sharedUnitIDs) > 0:
             sharedUnitIDs = [int(unitID) for unitID in sharedUnitIDs]
         installationDate = installationDate.toString("yyyy-MM-dd")
+
+        # The names are only read if an error message needs them, all in one query
+        units = DataLoader(Unit.readMany)
+        units.loadMany([mainUnitID] + sharedUnitIDs)
         
         #Error Checking
         if type == "":
-            unitName = Unit.readOne(mainUnitID)["Name"]
+            unitName = units.get(mainUnitID)["Name"]
             return f"Cannot add more utility types for {unitName}."
-        if InstalledUtility.unitHasUtilityType(mainUnitID, type):
-            unitName = Unit.readOne(mainUnitID)["Name"]
+        hasType = InstalledUtility.unitsHaveUtilityType([mainUnitID] + sharedUnitIDs, type)
+        if hasType[mainUnitID]:
+            unitName = units.get(mainUnitID)["Name"]
             return (f"{type} already exists for {unitName}. Please input another type.")
         if len(sharedUnitIDs) > 0:
             errorMsg = ""
             for sharedUnitID in sharedUnitIDs:
-                if InstalledUtility.unitHasUtilityType(sharedUnitID, type):
-                    unitName = Unit.readOne(sharedUnitID)["Name"]
+                if hasType[sharedUnitID]:
+                    unitName = units.get(sharedUnitID)["Name"]
                     errorMsg += (f"{type} already exists for {unitName}. Please input another type.\n")
             if errorMsg != "":
                 return errorMsg
 
         #Adding
-        Utility.create({
-            "Type": type,
-            "Status": status,
-            "BillingCycle": billingCycle
-        })
-
-        InstalledUtility.create({
-            "UtilityID": Utility.getLastID(),
-            "UnitID": mainUnitID,
-            "InstallationDate": installationDate,
-        })
+        with DatabaseConnection.transaction():
+            utilityID = Utility.create({
+                "Type": type,
+                "Status": status,
+                "BillingCycle": billingCycle
+            })
 
-        if len(sharedUnitIDs) > 0:
-            for id in sharedUnitIDs:
-                InstalledUtility.create({
-                    "UtilityID": Utility.getLastID(),
-                    "UnitID": id,
-                    "InstallationDate": installationDate,
-                })
+            InstalledUtility.createMany([{
+                "UtilityID": utilityID,
+                "UnitID": unitID,
+                "InstallationDate": installationDate,
+            } for unitID in [mainUnitID] + sharedUnitIDs])
 
+        EventBus.publish(Entity.UTILITY, ChangeType.ADDED, [utilityID])
         return "Utility added successfully"
 
     @staticmethod
@@ -145,19 +171,24 @@ class UtilitiesController:
 
         editedColumns = {}
 
+        # The names are only read if an error message needs them, all in one query
+        units = DataLoader(Unit.readMany)
+        units.loadMany([mainUnitID] + sharedUnitIDs)
+        hasType = InstalledUtility.unitsHaveUtilityType([mainUnitID] + sharedUnitIDs, type)
+
         #Error Checking 
         if type != originalData["Type"]: 
-            if InstalledUtility.unitHasUtilityType(mainUnitID, type):
-                unitName = Unit.readOne(mainUnitID)["Name"]
+            if hasType[mainUnitID]:
+                unitName = units.get(mainUnitID)["Name"]
                 return (f"{type} already exists for {unitName}. Please input another type or another unit.")
-        if InstalledUtility.unitHasUtilityType(mainUnitID, type) and mainUnitID != originalUnitID:
-            unitName = Unit.readOne(mainUnitID)["Name"]
+        if hasType[mainUnitID] and mainUnitID != originalUnitID:
+            unitName = units.get(mainUnitID)["Name"]
             return (f"{type} already exists for {unitName}. Please input another type.")
         if len(sharedUnitIDs) > 0:
             errorMsg = ""
             for sharedUnitID in sharedUnitIDs:
-                if InstalledUtility.unitHasUtilityType(sharedUnitID, type) and sharedUnitID not in originalSharedUnitIDs:
-                    unitName = Unit.readOne(sharedUnitID)["Name"]
+                if hasType[sharedUnitID] and sharedUnitID not in originalSharedUnitIDs:
+                    unitName = units.get(sharedUnitID)["Name"]
                     errorMsg += (f"{type} already exists for {unitName}. Please input another type or another unit.\n")
             if errorMsg != "":
                 return errorMsg
@@ -169,47 +200,55 @@ class UtilitiesController:
         if billingCycle != originalData["BillingCycle"]:
             editedColumns["BillingCycle"] = billingCycle
         
-        Utility.update(originalID, {
-            "Type": type,
-            "Status": status,
-            "BillingCycle": billingCycle
-        })
-
-        if mainUnitID != originalUnitID:
-            if originalUnitID is not None:
-                InstalledUtility.delete([originalUnitID, originalID])
-            for id in originalSharedUnitIDs:
-                InstalledUtility.delete([id, originalID])
-            InstalledUtility.create({
-                "UtilityID": originalID,
-                "UnitID": mainUnitID,
-                "InstallationDate": installationDate,
+        # The utility and its installations change together or not at all
+        with DatabaseConnection.transaction():
+            Utility.update(originalID, {
+                "Type": type,
+                "Status": status,
+                "BillingCycle": billingCycle
             })
-            if len(sharedUnitIDs) > 0:
-                for id in sharedUnitIDs:
-                    if id != mainUnitID:
-                        InstalledUtility.create({
-                            "UtilityID": originalID,
-                            "UnitID": id,
-                            "InstallationDate": installationDate,
-                        })
-        else:
-            originalInstallationDate = InstalledUtility.getInstallationDates(originalID)[0]["InstallationDate"]
-
-            if installationDate != originalInstallationDate:
-                InstalledUtility.update([originalUnitID, originalID], {"InstallationDate": installationDate})
-            if sorted(sharedUnitIDs) != sorted(originalSharedUnitIDs):
+
+            if mainUnitID != originalUnitID:
+                editedColumns["UnitID"] = mainUnitID
+                editedColumns["InstallationDate"] = installationDate
+                if originalUnitID is not None:
+                    InstalledUtility.delete([originalUnitID, originalID])
                 for id in originalSharedUnitIDs:
-                    if id not in sharedUnitIDs:
-                        InstalledUtility.delete([id, originalID])
-                for id in sharedUnitIDs:
-                    if id not in originalSharedUnitIDs and id != mainUnitID:
-                        InstalledUtility.create({
-                            "UtilityID": originalID,
-                            "UnitID": id,
-                            "InstallationDate": installationDate
-                        })    
+                    InstalledUtility.delete([id, originalID])
+                InstalledUtility.create({
+                    "UtilityID": originalID,
+                    "UnitID": mainUnitID,
+                    "InstallationDate": installationDate,
+                })
+                if len(sharedUnitIDs) > 0:
+                    for id in sharedUnitIDs:
+                        if id != mainUnitID:
+                            InstalledUtility.create({
+                                "UtilityID": originalID,
+                                "UnitID": id,
+                                "InstallationDate": installationDate,
+                            })
+            else:
+                originalInstallationDate = InstalledUtility.getInstallationDates(originalID)[0]["InstallationDate"]
+
+                if installationDate != originalInstallationDate:
+                    editedColumns["InstallationDate"] = installationDate
+                    InstalledUtility.update([originalUnitID, originalID], {"InstallationDate": installationDate})
+                if sorted(sharedUnitIDs) != sorted(originalSharedUnitIDs):
+                    editedColumns["UnitID"] = mainUnitID
+                    for id in originalSharedUnitIDs:
+                        if id not in sharedUnitIDs:
+                            InstalledUtility.delete([id, originalID])
+                    for id in sharedUnitIDs:
+                        if id not in originalSharedUnitIDs and id != mainUnitID:
+                            InstalledUtility.create({
+                                "UtilityID": originalID,
+                                "UnitID": id,
+                                "InstallationDate": installationDate
+                            })    
 
+        # The installations count as the UnitID and InstallationDate columns of the utility
+        EventBus.publish(Entity.UTILITY, ChangeType.EDITED, [originalID], list(editedColumns))
         return "Utility edited successfully"
 
     @staticmethod
@@ -219,6 +258,7 @@ class UtilitiesController:
         """
         print("Deleting utility:", id)
         Utility.delete([int(id)])
+        EventBus.publish(Entity.UTILITY, ChangeType.DELETED, [int(id)])
         return "Utility deleted successfully"
     
     @staticmethod
@@ -244,5 +284,6 @@ class UtilitiesController:
         utilityBills = {utilityType : Bill.getUtilityBills(id, range, offset=offsetInt)}
         for bill in utilityBills[utilityType]:
             bill["BillingPeriodEnd"] = bill["BillingPeriodEnd"].strftime("%Y-%m-%d")
-        earliestBillDate = Bill.getEarliestUtilityBillDate(id) if Bill.getEarliestUtilityBillDate(id) is not None else date.today() - relativedelta(months=monthRange)
+        earliestBillDate = Bill.getEarliestUtilityBillDate(id)
+        earliestBillDate = earliestBillDate if earliestBillDate is not None else date.today() - relativedelta(months=monthRange)
         return utilityBills, datetime.now() - relativedelta(dt1=datetime.now(), dt2=datetime.combine(earliestBillDate,datetime.min.time())) + relativedelta(months=monthRange)
\ No newline at end of file
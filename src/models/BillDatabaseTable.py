@@ -1,14 +1,17 @@
 import datetime
-import math
 
 from .DatabaseTable import DatabaseTable
 from .DatabaseConnection import DatabaseConnection
+from .SearchIndex import SearchIndex
+from .QueryCache import QueryCache
+from .BillRollup import BillRollup
 from .UnitDatabaseTable import UnitDatabaseTable
 from .UtilityDatabaseTable import UtilityDatabaseTable
 from .InstalledUtilityDatabaseTable import InstalledUtilityDatabaseTable
 
 from src.utils.constants import Range
 from src.utils.constants import UTILITIES
+from src.utils.periodCalculator import rangeBounds, maxOffset
 
 class BillDatabaseTable(DatabaseTable):
     """
@@ -27,6 +30,11 @@ class BillDatabaseTable(DatabaseTable):
     - PRIMARY KEY (BillID)
     - KEY UnitID (UnitID)
     - KEY UtilityID (UtilityID)
+    - KEY UtilityPeriod (UtilityID, BillingPeriodEnd), added by migration 1
+    - KEY StatusDue (Status, DueDate), added by migration 2
+    - KEY PeriodEnd (BillingPeriodEnd), added by migration 3
+    - KEY UnitUtilityPeriod (UnitID, UtilityID, BillingPeriodEnd), added by migration 5
+    The monthly totals of the bills are kept in the BillRollup table by triggers added by migration 4.
     - CONSTRAINT bill_ibfk_1 FOREIGN KEY (UnitID) REFERENCES unit (UnitID) ON DELETE SET NULL ON UPDATE CASCADE
     - CONSTRAINT bill_ibfk_2 FOREIGN KEY (UtilityID) REFERENCES utility (UtilityID) ON DELETE SET NULL ON UPDATE CASCADE
     - CONSTRAINT bill_chk_1 CHECK ((BillingPeriodEnd > BillingPeriodStart))
@@ -34,50 +42,29 @@ class BillDatabaseTable(DatabaseTable):
     """
     
     _tableName = "bill"
-    referredTables = {UnitDatabaseTable.getTableName() : UnitDatabaseTable, 
-                    UtilityDatabaseTable.getTableName() : UtilityDatabaseTable}
-
-    @classmethod
-    def initialize(cls):
-        """
-        Initializes the table by creating it if it does not exist and reading the columns.
-        This method can be called to ensure that the table is ready for use but it is not
-        necessarily required to be called before using the class methods. The class methods
-        will automatically call this method if the table is not initialized.
-
-        This class will also initialize the UnitDatabaseTable and UtilityDatabaseTable classes
-        to ensure that the foreign key references are valid.
-        """
-        UnitDatabaseTable.initialize()
-        UtilityDatabaseTable.initialize()
-        super().initialize()
-
-    @classmethod  
-    def _createTable(cls):
-        try:
-            cursor = DatabaseConnection.getConnection().cursor()
-            cursor.execute("CREATE TABLE IF NOT EXISTS bill ( " +
-                "BillID int NOT NULL AUTO_INCREMENT, " +
-                "UnitID int DEFAULT NULL, " +
-                "UtilityID int DEFAULT NULL, " +
-                "TotalAmount decimal(10,2) NOT NULL, " +
-                "BillingPeriodStart date NOT NULL, " +
-                "BillingPeriodEnd date NOT NULL, " +
-                "Status enum('Unpaid','Paid','Partially Paid','Overdue') NOT NULL, " +
-                "DueDate date NOT NULL, " +
-                "PRIMARY KEY (BillID), " +
-                "KEY UnitID (UnitID), " +
-                "KEY UtilityID (UtilityID), " +
-                "CONSTRAINT bill_ibfk_1 FOREIGN KEY (UnitID) REFERENCES unit (UnitID) ON DELETE SET NULL ON UPDATE CASCADE, " +
-                "CONSTRAINT bill_ibfk_2 FOREIGN KEY (UtilityID) REFERENCES utility (UtilityID) ON DELETE SET NULL ON UPDATE CASCADE, " +
-                "CONSTRAINT bill_chk_1 CHECK ((BillingPeriodEnd >= BillingPeriodStart)), " +
-                "CONSTRAINT bill_chk_2 CHECK ((DueDate >= BillingPeriodEnd)))"
-            )
-        except Exception as e:
-            print(f"Error: {e}")
-            raise e
-        finally:
-            cursor.close()
+    referredTables = {UnitDatabaseTable._tableName : UnitDatabaseTable, 
+                    UtilityDatabaseTable._tableName : UtilityDatabaseTable}
+
+    # Columns of the bills listing that can be sorted by and the column they sort on
+    __sortColumns = {"BillID": "b.BillID", "Name": "u.Name", "Type": "ut.Type",
+                    "TotalAmount": "b.TotalAmount", "DueDate": "b.DueDate", "Status": "b.Status"}
+
+    _createTableSQL = ("CREATE TABLE IF NOT EXISTS bill ( " +
+        "BillID int NOT NULL AUTO_INCREMENT, " +
+        "UnitID int DEFAULT NULL, " +
+        "UtilityID int DEFAULT NULL, " +
+        "TotalAmount decimal(10,2) NOT NULL, " +
+        "BillingPeriodStart date NOT NULL, " +
+        "BillingPeriodEnd date NOT NULL, " +
+        "Status enum('Unpaid','Paid','Partially Paid','Overdue') NOT NULL, " +
+        "DueDate date NOT NULL, " +
+        "PRIMARY KEY (BillID), " +
+        "KEY UnitID (UnitID), " +
+        "KEY UtilityID (UtilityID), " +
+        "CONSTRAINT bill_ibfk_1 FOREIGN KEY (UnitID) REFERENCES unit (UnitID) ON DELETE SET NULL ON UPDATE CASCADE, " +
+        "CONSTRAINT bill_ibfk_2 FOREIGN KEY (UtilityID) REFERENCES utility (UtilityID) ON DELETE SET NULL ON UPDATE CASCADE, " +
+        "CONSTRAINT bill_chk_1 CHECK ((BillingPeriodEnd >= BillingPeriodStart)), " +
+        "CONSTRAINT bill_chk_2 CHECK ((DueDate >= BillingPeriodEnd)))")
 
     @classmethod
     def batchUpdate(cls, 
@@ -103,7 +90,7 @@ class BillDatabaseTable(DatabaseTable):
                 raise TypeError("Data values must be strings, floats, or datetime.date.")
             if column not in cls._columns:
                 raise ValueError(f"Column {column} is not a valid column name.")
-            if column == cls._primaryKey or column == UnitDatabaseTable._primaryKey or column == UtilityDatabaseTable._primaryKey:
+            if column == cls._primary or column == UnitDatabaseTable.getPrimaryKey() or column == UtilityDatabaseTable.getPrimaryKey():
                 raise ValueError(f"Cannot update primary key or foreign keys.")
             if column == "TotalAmount":
                 if data[column] < 0:
@@ -128,16 +115,17 @@ class BillDatabaseTable(DatabaseTable):
                 if data[column] not in ["Unpaid", "Paid", "Partially Paid", "Overdue"]:
                         raise ValueError(f"Invalid value for column {column}.")
         try:
-            cursor = DatabaseConnection.getConnection().cursor()
             sql = f"UPDATE {cls._tableName} SET "
-            sql += ", ".join([f"{column} = '{value}'" for column, value in data.items()])
-            sql += " WHERE " + " AND ".join([f"{cls._primaryKey} = {key}" for key in keys])
-            cursor.execute(sql)
+            sql += ", ".join([f"{column} = %s" for column in data.keys()])
+            sql += f" WHERE {cls._primary} IN (" + ", ".join(["%s"] * len(keys)) + ")"
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, list(data.values()) + keys)
         except Exception as e:
             print(f"Error: {e}")
             raise e
         finally:
             cursor.close()
+        cls._notifyWrite(keys)
         return 
     
     #Unique methods for BillDatabaseTable
@@ -153,10 +141,12 @@ class BillDatabaseTable(DatabaseTable):
             year : str,
             page : int = 1, 
             limit : int = 50,
-            nullSearch: bool = False
+            nullSearch: bool = False,
+            after : tuple = None,
+            withTotal : bool = False
             ) -> list[dict[str, any]]:
         """
-        The unique method for reading data from the installedutility table with records
+        The unique method for reading data from the bill table with records
         from unit and utility table.
         The method accepts various parameters to filter,
         sort, and paginate the results. The parameters include:
@@ -165,6 +155,12 @@ class BillDatabaseTable(DatabaseTable):
         - order: A string indicating the order of sorting ('ASC' or 'DESC').
         - page: An integer indicating the page number for pagination.
         - limit: An integer indicating the number of records per page.
+        - after: A tuple of the sort value and BillID of the last row of the previous page.
+        If given, the page continues after that row instead of using page.
+        - withTotal: If True, each row also has the number of bills matching the search
+        in totalRows. The count ignores after, so it is only complete without a cursor.
+        The bill IDs of the page are picked first and only those rows are joined with
+        their unit and utility, so the skipped rows are never read in full.
         """
         cls.initialize()
 
@@ -174,33 +170,43 @@ class BillDatabaseTable(DatabaseTable):
             raise ValueError("sortBy must be a string.")
         if not isinstance(order, str):
             raise ValueError("order must be a string.")
+        if sortBy not in cls.__sortColumns:
+            raise ValueError(f"Column '{sortBy}' cannot be sorted.")
+        if order.upper() not in ["ASC", "DESC"]:
+            raise ValueError("order must be 'ASC' or 'DESC'.")
+        order = order.upper()
         
         result = None
 
         try:
-            cursor = DatabaseConnection.getConnection().cursor(dictionary = True)
             offset = (page - 1) * limit
-            sql = """
-                SELECT b.BillID, u.Name, ut.Type, b.TotalAmount, b.DueDate, b.Status FROM bill b
-                LEFT JOIN utility ut ON b.UtilityID = ut.UtilityID LEFT JOIN unit u ON b.UnitID = u.UnitID 
+            sortColumn = cls.__sortColumns[sortBy]
+            conditions = []
+            searchCondition, params = cls.__searchClause(searchValue, months, day, year, nullSearch)
+            if searchCondition != "":
+                conditions.append(f"({searchCondition})")
+            if after is not None:
+                seekClause, seekParams = cls._seekClause(sortColumn, ["b.BillID"], order, after)
+                conditions.append(seekClause)
+                params += seekParams
+                offset = 0
+            whereClause = "WHERE " + " AND ".join(conditions) if len(conditions) > 0 else ""
+            orderClause = f"ORDER BY {sortColumn} {order}, b.BillID {order}"
+            totalColumn = ", COUNT(*) OVER() AS totalRows" if withTotal else ""
+            pageTotal = ", page.totalRows" if withTotal else ""
+            hint = DatabaseConnection.searchTimeoutHint() if searchCondition != "" else ""
+            sql = f"""
+                SELECT {hint}b.BillID, u.Name, ut.Type, b.TotalAmount, b.DueDate, b.Status{pageTotal} FROM (
+                    SELECT b.BillID{totalColumn} FROM bill b
+                    LEFT JOIN utility ut ON b.UtilityID = ut.UtilityID LEFT JOIN unit u ON b.UnitID = u.UnitID
+                    {whereClause} {orderClause} LIMIT %s OFFSET %s
+                ) page
+                JOIN bill b ON b.BillID = page.BillID
+                LEFT JOIN utility ut ON b.UtilityID = ut.UtilityID LEFT JOIN unit u ON b.UnitID = u.UnitID
+                {orderClause}
                 """
-            if searchValue is not None:
-                sql += f"WHERE (BillID REGEXP \'{searchValue}\' OR ut.Type REGEXP \'{searchValue}\' OR Name REGEXP \'{searchValue}\' "
-                sql += f"OR TotalAmount REGEXP \'{searchValue}\' OR DueDate REGEXP \'{searchValue}\' "
-                sql += f"OR b.Status REGEXP \'{searchValue}\' "
-                if nullSearch:
-                    sql += f"OR ut.Type IS NULL OR Name IS NULL "
-                sql += ") "
-            if len(months) > 0:
-                sql += " OR ("
-                sql += " OR ".join([f"MONTH(DueDate) = {month} " for month in months])
-                if day != "":
-                    sql += f" AND DAY(DueDate) = {day}"
-                if year != "":
-                    sql += f" AND YEAR(DueDate) = {year}"
-                sql += " )"
-            sql += f"ORDER BY {sortBy} {order} LIMIT {limit} OFFSET {offset};"
-            cursor.execute(sql)
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, params + [limit, offset])
             result = cursor.fetchall()
         
         except Exception as e:
@@ -210,6 +216,48 @@ class BillDatabaseTable(DatabaseTable):
             cursor.close()
         return result
 
+    @classmethod
+    def uniqueReadPage(cls,
+            searchValue : str,
+            sortBy : str,
+            order : str,
+            months : list[str],
+            day : str,
+            year : str,
+            page : int = 1,
+            limit : int = 50,
+            nullSearch: bool = False,
+            after : tuple = None,
+            withTotal : bool = True
+            ) -> tuple[list[dict[str, any]], int | None]:
+        """
+        Reads a page of the bills listing like uniqueRead() and also returns the total
+        number of bills matching the search, from the same statement. The total is cached
+        per search, so changing only the sort order or the page reads the rows alone.
+        The parameters are the same as uniqueRead(), and:
+        - withTotal: If False, the rows are read alone and the total is None unless it
+        is cached. uniqueReadPageTotal() reads it afterwards.
+        """
+        return cls._readPage("uniqueRead", (searchValue, tuple(months), day, year, nullSearch),
+            lambda withTotal : cls.uniqueRead(searchValue, sortBy, order, months, day, year,
+                                              page, limit, nullSearch, after, withTotal),
+            lambda : cls.uniqueTotalCount(searchValue, months, day, year, nullSearch),
+            after is None, withTotal)
+
+    @classmethod
+    def uniqueReadPageTotal(cls,
+                searchValue : str,
+                months : list[str],
+                day : str,
+                year : str,
+                nullSearch: bool = False) -> int:
+        """
+        Returns the total number of bills matching the search of uniqueReadPage(), from
+        its cache if it is there. The parameters are the same as uniqueTotalCount().
+        """
+        return cls._readPageTotal("uniqueRead", (searchValue, tuple(months), day, year, nullSearch),
+            lambda : cls.uniqueTotalCount(searchValue, months, day, year, nullSearch))
+
     @classmethod
     def uniqueTotalCount(cls,
                 searchValue : str,
@@ -226,28 +274,16 @@ class BillDatabaseTable(DatabaseTable):
         result = 0
         
         try:
-            cursor = DatabaseConnection.getConnection().cursor(dictionary = True)
-            sql = """
-            SELECT COUNT(*) FROM bill b 
+            searchClause, params = cls.__searchClause(searchValue, months, day, year, nullSearch)
+            hint = DatabaseConnection.searchTimeoutHint() if searchClause != "" else ""
+            sql = f"""
+            SELECT {hint}COUNT(*) AS total FROM bill b 
             LEFT JOIN utility ut ON b.UtilityID = ut.UtilityID LEFT JOIN unit u ON b.UnitID = u.UnitID 
             """
-            if searchValue is not None:
-                sql += f"WHERE (BillID REGEXP \'{searchValue}\' OR ut.Type REGEXP \'{searchValue}\' OR Name REGEXP \'{searchValue}\' "
-                sql += f"OR TotalAmount REGEXP \'{searchValue}\' OR DueDate REGEXP \'{searchValue}\' "
-                sql += f"OR b.Status REGEXP \'{searchValue}\' "
-                if nullSearch:
-                    sql += f"OR ut.Type IS NULL OR Name IS NULL"
-                sql += ") "
-            if len(months) > 0:
-                sql += " OR ("
-                sql += " OR ".join([f"MONTH(DueDate) = {month} " for month in months])
-                if day != "":
-                    sql += f" AND DAY(DueDate) ={day}"
-                if year != "":
-                    sql += f" AND YEAR(DueDate) = {year}"
-                sql += " )"
-            cursor.execute(sql)
-            result = cursor.fetchone()["COUNT(*)"]
+            sql += f"WHERE {searchClause}" if searchClause != "" else ""
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, params)
+            result = cursor.fetchone()["total"]
 
         except Exception as e:
             print(f"Error: {e}")
@@ -282,15 +318,33 @@ class BillDatabaseTable(DatabaseTable):
         result = {}
 
         try:
-            cursor = DatabaseConnection.getConnection().cursor(dictionary = True)
-            for utilityID in InstalledUtilityDatabaseTable.getUnitUtilities(unit):
-                sql = f"SELECT Type FROM {UtilityDatabaseTable.getTableName()} WHERE UtilityID = {utilityID}"
-                cursor.execute(sql)
-                utilityType = cursor.fetchone()['Type']
-                unitType = UnitDatabaseTable.readOne(unit)['Type']
-                utilityIsShared = InstalledUtilityDatabaseTable.isUtilityShared(utilityID)
-                if(unitType == 'Shared' and utilityIsShared or unitType == 'Individual' and not utilityIsShared):
-                    result[utilityType] = cls.getUtilityBills(utilityID, range, offset)
+            rangeClause, rangeParams = cls.__rangeClause(range, offset)
+
+            # A shared unit charts the utilities installed in a shared unit, an individual
+            # unit the ones that are not. The left join keeps the utilities without bills.
+            sql = f"SELECT iu.UtilityID, ut.Type, Bill.BillID, Bill.TotalAmount, Bill.BillingPeriodEnd " + \
+                f"FROM {InstalledUtilityDatabaseTable.getTableName()} iu " + \
+                f"JOIN {UnitDatabaseTable.getTableName()} un ON un.UnitID = iu.UnitID " + \
+                f"JOIN {UtilityDatabaseTable.getTableName()} ut ON ut.UtilityID = iu.UtilityID " + \
+                f"LEFT JOIN {cls.getTableName()} ON Bill.UtilityID = iu.UtilityID AND {rangeClause} " + \
+                f"WHERE iu.UnitID = %s AND (un.Type = 'Shared') = EXISTS (" + \
+                f"SELECT 1 FROM {InstalledUtilityDatabaseTable.getTableName()} s " + \
+                f"JOIN {UnitDatabaseTable.getTableName()} su ON su.UnitID = s.UnitID " + \
+                f"WHERE s.UtilityID = iu.UtilityID AND su.Type = 'Shared') " + \
+                f"ORDER BY iu.UtilityID, Bill.BillingPeriodEnd, Bill.BillID"
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, rangeParams + [unit])
+
+            # A later utility of the same type replaces the bills of the earlier one
+            utilityOfType = {}
+            for row in cursor.fetchall():
+                if utilityOfType.get(row["Type"]) != row["UtilityID"]:
+                    utilityOfType[row["Type"]] = row["UtilityID"]
+                    result[row["Type"]] = []
+                if row["BillID"] is not None:
+                    result[row["Type"]].append({"BillID": row["BillID"],
+                                                "TotalAmount": row["TotalAmount"],
+                                                "BillingPeriodEnd": row["BillingPeriodEnd"]})
 
         except Exception as e:
             print(f"Error: {e}")
@@ -318,16 +372,13 @@ class BillDatabaseTable(DatabaseTable):
 
         try:
 
-            rangeClause = cls.__rangeClause(range, offset)
-
-            cursor = DatabaseConnection.getConnection().cursor(dictionary = True)
-            for utility in UTILITIES:
-                sql = f"SELECT Bill.BillID, Bill.TotalAmount, Bill.BillingPeriodEnd FROM bill " + \
-                    f"INNER JOIN utility ON Utility.UtilityID=Bill.UtilityID WHERE Utility.Type='{utility}'" + \
-                    f"AND {rangeClause} "             
-                cursor.execute(sql)
+            rangeClause, rangeParams = cls.__rangeClause(range, offset)
 
-                result[utility] = cursor.fetchall()
+            sql = f"SELECT Utility.Type, Bill.BillID, Bill.TotalAmount, Bill.BillingPeriodEnd FROM bill " + \
+                f"INNER JOIN utility ON Utility.UtilityID=Bill.UtilityID WHERE {rangeClause}"
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, rangeParams)
+            result = cls.__splitByType(cursor.fetchall())
 
         except Exception as e:
             print(f"Error: {e}")
@@ -355,11 +406,11 @@ class BillDatabaseTable(DatabaseTable):
 
         try:
             
-            rangeClause = "AND " + cls.__rangeClause(range, offset)
+            rangeClause, rangeParams = cls.__rangeClause(range, offset)
 
-            cursor = DatabaseConnection.getConnection().cursor(dictionary = True)
-            sql = f"SELECT Bill.BillID, Bill.TotalAmount, Bill.BillingPeriodEnd FROM {cls.getTableName()} WHERE Bill.UtilityID = {utility} {rangeClause}"
-            cursor.execute(sql)
+            sql = f"SELECT Bill.BillID, Bill.TotalAmount, Bill.BillingPeriodEnd FROM {cls.getTableName()} WHERE Bill.UtilityID = %s AND {rangeClause}"
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, [utility] + rangeParams)
             result = cursor.fetchall()
 
         except Exception as e:
@@ -372,24 +423,33 @@ class BillDatabaseTable(DatabaseTable):
     @classmethod
     def getAllGroupedBills(cls,
                         range : Range,
-                        offset : int = 1) -> dict[str, list[dict[str, float | datetime.date]]]:
+                        offset : int = 1,
+                        monthly : bool = False) -> dict[str, list[dict[str, float | datetime.date]]]:
         """
         Returns a dictionary where each utility type is a key. Each utility type
         will have a list of bills grouped by billing period end date and their
         total amount is summed up. Bills are limited to the given range and offset.
+        - monthly: If True, the bills are grouped by month instead, with the last day of each
+        month (or of the range) as the billing period end. The totals are read from the
+        monthly rollup when its triggers are installed.
         """
         cls.initialize()
         result = {}
+        periodEnd, periodParams = "Bill.BillingPeriodEnd", []
+        if monthly:
+            start, end = rangeBounds(range, offset)
+            if BillRollup.isMaintained():
+                return cls.__splitByType(BillRollup.monthlyTotals(start, end))
+            periodEnd, periodParams = "LEAST(LAST_DAY(Bill.BillingPeriodEnd), %s)", [end]
         try:
-            cursor = DatabaseConnection.getConnection().cursor(dictionary = True)
-            rangeClause = cls.__rangeClause(range, offset)
-            for utility in UTILITIES:
-                sql = f"SELECT Bill.BillingPeriodEnd, SUM(Bill.TotalAmount) AS TotalAmount FROM {cls.getTableName()}, " + \
-                    f"{UtilityDatabaseTable.getTableName()} " + \
-                    f"WHERE bill.UtilityID = utility.UtilityID AND utility.Type='{utility}' AND {rangeClause} " + \
-                    f"GROUP BY Bill.BillingPeriodEnd"
-                cursor.execute(sql)
-                result[utility] = cursor.fetchall()
+            rangeClause, rangeParams = cls.__rangeClause(range, offset)
+            sql = f"SELECT utility.Type, {periodEnd} AS BillingPeriodEnd, SUM(Bill.TotalAmount) AS TotalAmount FROM {cls.getTableName()}, " + \
+                f"{UtilityDatabaseTable.getTableName()} " + \
+                f"WHERE bill.UtilityID = utility.UtilityID AND {rangeClause} " + \
+                f"GROUP BY 1, 2 ORDER BY 1, 2"
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, periodParams + rangeParams)
+            result = cls.__splitByType(cursor.fetchall())
         except Exception as e:
             print(f"Error: {e}")
             raise e
@@ -417,18 +477,25 @@ class BillDatabaseTable(DatabaseTable):
 
         result = 0.0
 
+        if len(types) > 0 and BillRollup.isMaintained():
+            start, end = rangeBounds(range, offset)
+            summary = BillRollup.summary(start, end, types)
+            return summary["TotalAmount"] - summary["UnpaidAmount"] if paidOnly else summary["TotalAmount"]
+
         try:
             
-            whereClause = cls.__rangeClause(range, offset)
+            whereClause, params = cls.__rangeClause(range, offset)
 
             if paidOnly:
                 whereClause += " AND Bill.Status = 'Paid'"
-            whereClause += " AND (" + " OR ".join([f"u.Type = '{type}'" for type in types]) + ")" if len(types) > 0 else ""
-            cursor = DatabaseConnection.getConnection().cursor(dictionary = True)
+            if len(types) > 0:
+                whereClause += " AND u.Type IN (" + ", ".join(["%s"] * len(types)) + ")"
+                params += types
             sql = f"SELECT SUM(bill.TotalAmount) AS TotalAmount FROM {cls.getTableName()} " + \
                 f"JOIN {UtilityDatabaseTable.getTableName()} u ON bill.UtilityID=u.UtilityID " + \
                 f"WHERE {whereClause}"
-            cursor.execute(sql)
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, params)
             result = cursor.fetchone()['TotalAmount']
             result = result if len(types) > 0 else 0
         except Exception as e:
@@ -457,14 +524,14 @@ class BillDatabaseTable(DatabaseTable):
 
         try:
             
-            rangeClause = cls.__rangeClause(range, offset)
-            types = " AND (" + " OR ".join([f"u.Type = '{type}'" for type in types]) + ")" if len(types) > 0 else ""
+            rangeClause, params = cls.__rangeClause(range, offset)
+            typesClause = " AND u.Type IN (" + ", ".join(["%s"] * len(types)) + ")" if len(types) > 0 else ""
 
-            cursor = DatabaseConnection.getConnection().cursor(dictionary = True)
             sql = f"SELECT SUM(bill.TotalAmount) AS TotalAmount FROM {cls.getTableName()} " + \
                 f"JOIN {UtilityDatabaseTable.getTableName()} u ON bill.UtilityID=u.UtilityID " + \
-                f"WHERE {rangeClause} AND bill.Status != 'Paid' {types} "
-            cursor.execute(sql)
+                f"WHERE {rangeClause} AND bill.Status != 'Paid'{typesClause}"
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, params + list(types))
             result = cursor.fetchone()['TotalAmount']
             result = result if len(types) > 0 else 0
         except Exception as e:
@@ -493,14 +560,14 @@ class BillDatabaseTable(DatabaseTable):
 
         try:
             
-            rangeClause = cls.__rangeClause(range, offset)
-            types = " AND (" + " OR ".join([f"u.Type = '{type}'" for type in types]) + ")" if len(types) > 0 else ""
+            rangeClause, params = cls.__rangeClause(range, offset)
+            typesClause = " AND u.Type IN (" + ", ".join(["%s"] * len(types)) + ")" if len(types) > 0 else ""
 
-            cursor = DatabaseConnection.getConnection().cursor(dictionary = True)
             sql = f"SELECT COUNT(Bill.BillID) AS UnpaidCount FROM {cls.getTableName()} " + \
                 f"JOIN {UtilityDatabaseTable.getTableName()} u ON bill.UtilityID=u.UtilityID " + \
-                f"WHERE {rangeClause} {types} AND Bill.Status != 'Paid'"
-            cursor.execute(sql)
+                f"WHERE {rangeClause}{typesClause} AND Bill.Status != 'Paid'"
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, params + list(types))
             result = cursor.fetchone()['UnpaidCount']
             result = result if len(types) > 0 else 0
         except Exception as e:
@@ -510,6 +577,70 @@ class BillDatabaseTable(DatabaseTable):
             cursor.close()
         return result
 
+    @classmethod
+    def billsSummary(cls,
+                    range: Range,
+                    types: list[str],
+                    offset: int = 1,
+                    overdue: bool = True) -> dict[str, float | int]:
+        """
+        Returns the summary of the given types of bills for the given range from a single
+        scan of the bills, as a dictionary with the keys:
+        - TotalAmount: the total amount of the bills.
+        - UnpaidAmount, UnpaidCount: the total amount and count of the bills that are not paid.
+        - PaidAmount: the total amount of the paid bills.
+        - OverdueCount: the count of the bills that are overdue or not paid past their due date.
+        The range can be one of the following: 3m, 6m, 1y, 2y.
+        Without the overdue count, the summary is read from the monthly rollup.
+
+        - range: Range, the range of months to get bills for.
+        - types: list[str], the utility types that will be included.
+        - offset: int, the number of months to go back from the current date.
+        - overdue: bool, if False, OverdueCount is None.
+        """
+        cls.initialize()
+
+        result = {"TotalAmount": 0.0, "UnpaidAmount": 0.0, "UnpaidCount": 0, "PaidAmount": 0.0,
+                  "OverdueCount": 0 if overdue else None}
+        if len(types) == 0:
+            return result
+
+        if not overdue and BillRollup.isMaintained():
+            start, end = rangeBounds(range, offset)
+            summary = BillRollup.summary(start, end, types)
+            return {"TotalAmount": summary["TotalAmount"],
+                    "UnpaidAmount": summary["UnpaidAmount"],
+                    "UnpaidCount": summary["UnpaidCount"],
+                    "PaidAmount": summary["TotalAmount"] - summary["UnpaidAmount"],
+                    "OverdueCount": None}
+
+        try:
+            rangeClause, params = cls.__rangeClause(range, offset)
+            typesClause = " AND u.Type IN (" + ", ".join(["%s"] * len(types)) + ")"
+
+            sql = f"SELECT COALESCE(SUM(bill.TotalAmount), 0) AS TotalAmount, " + \
+                f"COALESCE(SUM(CASE WHEN bill.Status != 'Paid' THEN bill.TotalAmount ELSE 0 END), 0) AS UnpaidAmount, " + \
+                f"COALESCE(SUM(CASE WHEN bill.Status != 'Paid' THEN 1 ELSE 0 END), 0) AS UnpaidCount, " + \
+                f"COALESCE(SUM(CASE WHEN bill.Status = 'Paid' THEN bill.TotalAmount ELSE 0 END), 0) AS PaidAmount, " + \
+                f"COALESCE(SUM(CASE WHEN bill.Status = 'Overdue' OR (bill.Status != 'Paid' AND bill.DueDate < %s) " + \
+                f"THEN 1 ELSE 0 END), 0) AS OverdueCount " + \
+                f"FROM {cls.getTableName()} JOIN {UtilityDatabaseTable.getTableName()} u ON bill.UtilityID=u.UtilityID " + \
+                f"WHERE {rangeClause}{typesClause}"
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, [datetime.date.today()] + params + list(types))
+            row = cursor.fetchone()
+            result = {"TotalAmount": row["TotalAmount"],
+                      "UnpaidAmount": row["UnpaidAmount"],
+                      "UnpaidCount": int(row["UnpaidCount"]),
+                      "PaidAmount": row["PaidAmount"],
+                      "OverdueCount": int(row["OverdueCount"]) if overdue else None}
+        except Exception as e:
+            print(f"Error: {e}")
+            raise e
+        finally:
+            cursor.close()
+        return result
+
     @classmethod
     def urgentBills(cls,
                     limit: int = 15) -> list[dict[str, int | str | float | datetime.date]]:
@@ -530,13 +661,13 @@ class BillDatabaseTable(DatabaseTable):
             if limit <= 0:
                 raise ValueError("Limit must be greater than 0.")
             
-            cursor = DatabaseConnection.getConnection().cursor(dictionary = True)
             sql = f"SELECT Bill.BillID, Utility.Type, Bill.TotalAmount, Bill.DueDate, Bill.Status, " + \
                 f"DATEDIFF(Bill.DueDate, CURDATE()) AS closest FROM {cls.getTableName()} " + \
                 f"JOIN {UtilityDatabaseTable.getTableName()} ON Bill.UtilityID = Utility.UtilityID " + \
-                f"WHERE Bill.Status != 'Paid'" + \
-                f"ORDER BY closest ASC LIMIT {limit}"
-            cursor.execute(sql)
+                f"WHERE Bill.Status != 'Paid' " + \
+                f"ORDER BY closest ASC LIMIT %s"
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, (limit,))
             result = cursor.fetchall()
 
         except Exception as e:
@@ -563,12 +694,12 @@ class BillDatabaseTable(DatabaseTable):
             if not isinstance(unit, int):
                 raise ValueError("Unit must be an integer.")
             
+            utilityTypes = {utility["UtilityID"] : utility["Type"]
+                            for utility in InstalledUtilityDatabaseTable.getUnitUtilities(unit, type = True)}
             for utilityID, utilityDate in cls.getEarliestUnitBillDates(unit).items():
-                sql = f"SELECT Type FROM {UtilityDatabaseTable.getTableName()} WHERE UtilityID = {utilityID}"
-                cursor = DatabaseConnection.getConnection().cursor(dictionary = True)
-                cursor.execute(sql)
-                utilityType = cursor.fetchone()['Type']
-                result[utilityType] = cls.__getMaxOffset(utilityDate, range)
+                if utilityDate is None:
+                    continue
+                result[utilityTypes[utilityID]] = maxOffset(utilityDate, range)
         except Exception as e:
             print(f"Error: {e}")
             raise e
@@ -592,7 +723,8 @@ class BillDatabaseTable(DatabaseTable):
             if not isinstance(utility, int):
                 raise ValueError("Utility must be an integer.")
             
-            result = cls.__getMaxOffset(cls.getEarliestUtilityBillDates(utility), range)
+            earliestDate = cls.getEarliestUtilityBillDate(utility)
+            result = maxOffset(earliestDate, range) if earliestDate is not None else 0
 
         except Exception as e:
             print(f"Error: {e}")
@@ -612,16 +744,15 @@ class BillDatabaseTable(DatabaseTable):
 
         result = 0
         try:
-            cursor = DatabaseConnection.getConnection().cursor(dictionary = True)
-            sql = f"SELECT Bill.BillingPeriodEnd FROM bill LIMIT 1"
-            cursor.execute(sql)
-            result = cls.__getMaxOffset(cursor.fetchone()['BillingPeriodEnd'], range)
+            earliestDate = cls.getEarliestBillDate()
+            result = maxOffset(earliestDate, range) if earliestDate is not None else 0
         except Exception as e:
             print(f"Error: {e}")
             raise e
         return result
     
     @classmethod
+    @QueryCache.cached(_tableName, InstalledUtilityDatabaseTable._tableName)
     def getEarliestUnitBillDates(cls,
                                 unit: int) -> dict[int, 'datetime.date']:
         """
@@ -637,14 +768,14 @@ class BillDatabaseTable(DatabaseTable):
             if not isinstance(unit, int):
                 raise ValueError("Unit must be an integer.")
             
-            cursor = DatabaseConnection.getConnection().cursor(dictionary = True)
-            for utilityID in InstalledUtilityDatabaseTable.getUnitUtilities(unit):
-                sql = f"SELECT Bill.BillingPeriodEnd FROM {cls.getTableName()} " + \
-                    f"WHERE Bill.UtilityID = {utilityID} AND Bill.UnitID = {unit}" + \
-                    f" LIMIT 1"
-                cursor.execute(sql)
-                sqlRes = cursor.fetchone()
-                result[utilityID] = sqlRes['BillingPeriodEnd'] if cursor.rowcount > 0 else None
+            # The left join keeps the installed utilities without bills, whose date is None
+            sql = f"SELECT iu.UtilityID, MIN(Bill.BillingPeriodEnd) AS BillingPeriodEnd " + \
+                f"FROM {InstalledUtilityDatabaseTable.getTableName()} iu " + \
+                f"LEFT JOIN {cls.getTableName()} ON Bill.UnitID = iu.UnitID AND Bill.UtilityID = iu.UtilityID " + \
+                f"WHERE iu.UnitID = %s GROUP BY iu.UtilityID ORDER BY iu.UtilityID"
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, (unit,))
+            result = {row["UtilityID"] : row["BillingPeriodEnd"] for row in cursor.fetchall()}
 
         except Exception as e:
             print(f"Error: {e}")
@@ -654,6 +785,7 @@ class BillDatabaseTable(DatabaseTable):
         return result
 
     @classmethod
+    @QueryCache.cached(_tableName)
     def getEarliestUtilityBillDate(cls,
                                     utility: int) -> datetime.date:
         """
@@ -669,13 +801,12 @@ class BillDatabaseTable(DatabaseTable):
             if not isinstance(utility, int):
                 raise ValueError("Utility must be an integer.")
             
-            cursor = DatabaseConnection.getConnection().cursor(dictionary = True)
-            sql = f"SELECT Bill.BillingPeriodEnd FROM {cls.getTableName()} " + \
-                f"WHERE Bill.UtilityID = {utility} " + \
-                f"ORDER BY Bill.BillingPeriodEnd ASC LIMIT 1"
-            cursor.execute(sql)
+            sql = f"SELECT MIN(Bill.BillingPeriodEnd) AS BillingPeriodEnd FROM {cls.getTableName()} " + \
+                f"WHERE Bill.UtilityID = %s"
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, (utility,))
             sqlRes = cursor.fetchone()
-            result = sqlRes['BillingPeriodEnd'] if cursor.rowcount > 0 else None
+            result = sqlRes['BillingPeriodEnd'] if sqlRes is not None else None
 
         except Exception as e:
             print(f"Error: {e}")
@@ -685,6 +816,7 @@ class BillDatabaseTable(DatabaseTable):
         return result
 
     @classmethod
+    @QueryCache.cached(_tableName)
     def getEarliestBillDate(cls) -> datetime.date:
         """
         Returns the earliest billing period end dates for all bills.
@@ -695,12 +827,11 @@ class BillDatabaseTable(DatabaseTable):
         result = None
 
         try:
-            cursor = DatabaseConnection.getConnection().cursor(dictionary = True)
-            sql = f"SELECT Bill.BillingPeriodEnd FROM {cls.getTableName()} " + \
-                f"LIMIT 1"
+            sql = f"SELECT MIN(Bill.BillingPeriodEnd) AS BillingPeriodEnd FROM {cls.getTableName()}"
+            cursor = DatabaseConnection.getCursor(sql)
             cursor.execute(sql)
             sqlRes = cursor.fetchone()
-            result = sqlRes['BillingPeriodEnd'] if cursor.rowcount > 0 else None
+            result = sqlRes['BillingPeriodEnd'] if sqlRes is not None else None
 
         except Exception as e:
             print(f"Error: {e}")
@@ -711,81 +842,82 @@ class BillDatabaseTable(DatabaseTable):
 
     #Helper methods
 
+    @staticmethod
+    def __splitByType(rows : list[dict[str, any]]) -> dict[str, list[dict[str, any]]]:
+        """
+        Splits rows that have a Type column into a dictionary of the rows of each utility
+        type, without the Type column. Every type in UTILITIES has a list, even when it
+        has no rows, and types that are not in UTILITIES are added after them.
+        """
+        result = {utility : [] for utility in UTILITIES}
+        for row in rows:
+            utilityType = row.pop("Type")
+            result.setdefault(utilityType, []).append(row)
+        return result
+
     @classmethod
     def __rangeClause(
                     cls,
                     range: Range,
-                    offset: int) -> str:
+                    offset: int) -> tuple[str, list[datetime.date]]:
         """
-        Helper method that returns the range clause for the given range.
+        Helper method that returns the range clause for the given range and the
+        parameters bound to its placeholders. The bounds of the range are computed
+        locally and bound as dates, so the statement does not depend on CURDATE().
         The range can be one of the following: 3m, 6m, 1y, 2y.
 
         - range: Range, the range of months to get bills for.
         - offset: int, the number of months to go back from the current date.
         """
-        cls.initialize()
-
-        if not isinstance(range, Range):
-            raise ValueError("Range must be an instance of Range enum.")
-        if not range in [Range.THREE_MONTHS, Range.SIX_MONTHS, Range.ONE_YEAR, Range.TWO_YEARS]:
-            raise ValueError("Range must be one of the following: 3m, 6m, 1y, 2y.")
-        if offset <= 0:
-            raise ValueError("Offset must be greater than 0.")
-        if not isinstance(offset, int):
-            raise ValueError("Offset must be an integer.")
-        
-        rangeClause = f"Bill.BillingPeriodEnd >= DATE_SUB(CURDATE(), INTERVAL {range.value * offset} MONTH) AND" + \
-            f" Bill.BillingPeriodEnd <= DATE_SUB(CURDATE(), INTERVAL {range.value * (offset - 1)} MONTH)"
-        return rangeClause
+        start, end = rangeBounds(range, offset)
+        return "Bill.BillingPeriodEnd >= %s AND Bill.BillingPeriodEnd <= %s", [start, end]
 
     @classmethod
-    def __getMaxOffset(
+    def __searchClause(
                     cls,
-                    date: datetime.date,
-                    range: Range) -> int:
-        """
-        Helper method that returns the maximum offset for the given date and range.
-        The range can be one of the following: 3m, 6m, 1y, 2y.
-
-        - date: datetime.date, the date to get the maximum offset for.
-        - range: Range, the range of months to get the maximum offset for.
-        """
-        cls.initialize()
-
-        if not isinstance(date, datetime.date):
-            raise ValueError("Date must be a datetime.date object.")
-        if not isinstance(range, Range):
-            raise ValueError("Range must be an instance of Range enum.")
-        if not range in [Range.THREE_MONTHS, Range.SIX_MONTHS, Range.ONE_YEAR, Range.TWO_YEARS]:
-            raise ValueError("Range must be one of the following: 3m, 6m, 1y, 2y.")
-        try:
-            date = "'" + date.strftime("%Y-%m-%d") + "'"
-            
-            cursor = DatabaseConnection.getConnection().cursor(dictionary = True)
-            sql = f"SELECT " + \
-                f"TIMESTAMPDIFF(MONTH, {date}, CURDATE()) +" + \
-                f"DATEDIFF( " + \
-                f"    CURDATE(), " + \
-                f"    {date} + INTERVAL " + \
-                f"    TIMESTAMPDIFF(MONTH, {date}, CURDATE()) " + \
-                f"    MONTH " + \
-                f") / " + \
-                f"DATEDIFF(" + \
-                f"    {date} + INTERVAL " + \
-                f"    TIMESTAMPDIFF(MONTH, {date}, CURDATE()) + 1 " + \
-                f"    MONTH, " + \
-                f"    {date} + INTERVAL " + \
-                f"    TIMESTAMPDIFF(MONTH, {date}, CURDATE()) " + \
-                f"    MONTH " + \
-                f") AS MaxOffset " + \
-                f"FROM {cls.getTableName()} " + \
-                f"WHERE Bill.BillingPeriodEnd = {date} " + \
-                f"ORDER BY Bill.BillingPeriodEnd DESC LIMIT 1"
-            cursor.execute(sql)
-            result = math.ceil(cursor.fetchone()['MaxOffset'] / range.value)
-        except Exception as e:
-            print(f"Error: {e}")
-            raise e
-        finally:
-            cursor.close()
-        return result
\ No newline at end of file
+                    searchValue: str,
+                    months: list[str],
+                    day: str,
+                    year: str,
+                    nullSearch: bool) -> tuple[str, list[str]]:
+        """
+        Helper method that returns the search condition of the bills table with records
+        from unit and utility table and the parameters bound to its placeholders.
+        The condition is empty if there is nothing to search for.
+
+        - searchValue: str, the text searched for in the displayed columns. Plain text is
+        looked up in the search index of the bills, patterns are matched with REGEXP.
+        - months: list[str], the months of the due date that also match.
+        - day: str, the day of the due date, only used with months.
+        - year: str, the year of the due date, only used with months.
+        - nullSearch: bool, if True, bills without a unit or utility also match.
+        """
+        clause = ""
+        params = []
+        indexCondition = None if searchValue is None else SearchIndex.searchCondition("bill", "b.BillID", searchValue)
+        if indexCondition is not None:
+            clause += f"({indexCondition[0]} "
+            params += indexCondition[1]
+            if nullSearch:
+                clause += "OR ut.Type IS NULL OR u.Name IS NULL "
+            clause += ") "
+        elif searchValue is not None:
+            clause += "(b.BillID REGEXP %s OR ut.Type REGEXP %s OR u.Name REGEXP %s "
+            clause += "OR b.TotalAmount REGEXP %s OR b.DueDate REGEXP %s "
+            clause += "OR b.Status REGEXP %s "
+            params += [searchValue] * 6
+            if nullSearch:
+                clause += "OR ut.Type IS NULL OR u.Name IS NULL "
+            clause += ") "
+        if len(months) > 0:
+            clause += " OR (" if clause != "" else "("
+            clause += " OR ".join(["MONTH(b.DueDate) = %s " for _ in months])
+            params += [int(month) for month in months]
+            if day.isdigit():
+                clause += " AND DAY(b.DueDate) = %s"
+                params.append(int(day))
+            if year.isdigit():
+                clause += " AND YEAR(b.DueDate) = %s"
+                params.append(int(year))
+            clause += " ) "
+        return clause, params
@@ -0,0 +1,295 @@
+import argparse
+import datetime
+import threading
+
+from .DatabaseConnection import DatabaseConnection
+from .SchemaCache import SchemaCache
+
+from src.utils.periodCalculator import fullMonths
+
+class BillRollup:
+    """
+    The totals of the bills per unit, utility, utility type and month of their billing
+    period end, so sums over a range of months read one row per group and month instead
+    of every bill. Bills without a unit or utility are grouped under UnitID 0, and bills
+    without a utility under UtilityID 0 and Type ''.
+    The table has the following columns:
+    - UnitID: int, the unit of the bills, 0 if they have none.
+    - UtilityID: int, the utility of the bills, 0 if they have none.
+    - Type: varchar(32), the type of the utility, '' if they have none.
+    - Month: date, the first day of the month of the billing period end.
+    - TotalAmount: decimal(14,2), the total amount of the bills.
+    - BillCount: int, the number of bills.
+    - UnpaidAmount: decimal(14,2), the total amount of the bills that are not paid.
+    - UnpaidCount: int, the number of bills that are not paid.
+    - PRIMARY KEY (UnitID, UtilityID, Type, Month)
+    - KEY MonthType (Month, Type)
+
+    Triggers on the bill table add and subtract every written bill, and a trigger on the
+    utility table moves the totals of a utility when its type changes. The triggers are
+    installed by a migration. Cascading foreign key changes do not fire triggers, so the
+    totals of deleted units and utilities are refreshed by onWrite, which DatabaseTable
+    calls after every write. If bills were changed with the triggers missing, rebuild the
+    totals from the project folder with:
+    python -m src.models.BillRollup
+    """
+
+    _tableName = "bill_monthly_rollup"
+    _createTableSQL = ("CREATE TABLE IF NOT EXISTS bill_monthly_rollup ( " +
+        "UnitID int NOT NULL DEFAULT 0, " +
+        "UtilityID int NOT NULL DEFAULT 0, " +
+        "Type varchar(32) NOT NULL DEFAULT '', " +
+        "Month date NOT NULL, " +
+        "TotalAmount decimal(14,2) NOT NULL DEFAULT 0, " +
+        "BillCount int NOT NULL DEFAULT 0, " +
+        "UnpaidAmount decimal(14,2) NOT NULL DEFAULT 0, " +
+        "UnpaidCount int NOT NULL DEFAULT 0, " +
+        "PRIMARY KEY (UnitID, UtilityID, Type, Month), " +
+        "KEY MonthType (Month, Type))")
+
+    # The totals of the bills grouped like the rows of the table
+    __groupSQL = ("SELECT COALESCE(b.UnitID, 0) AS UnitID, COALESCE(b.UtilityID, 0) AS UtilityID, " +
+        "COALESCE(u.Type, '') AS Type, " +
+        "DATE_SUB(b.BillingPeriodEnd, INTERVAL DAYOFMONTH(b.BillingPeriodEnd) - 1 DAY) AS Month, " +
+        "SUM(b.TotalAmount) AS TotalAmount, COUNT(*) AS BillCount, " +
+        "SUM(IF(b.Status != 'Paid', b.TotalAmount, 0)) AS UnpaidAmount, " +
+        "SUM(IF(b.Status != 'Paid', 1, 0)) AS UnpaidCount " +
+        "FROM bill b LEFT JOIN utility u ON u.UtilityID = b.UtilityID")
+    __groupBy = " GROUP BY COALESCE(b.UnitID, 0), COALESCE(b.UtilityID, 0), COALESCE(u.Type, ''), Month"
+
+    __triggers = ["bill_rollup_insert", "bill_rollup_update", "bill_rollup_delete", "utility_rollup_update"]
+
+    # Refreshing more rows than this by key rebuilds the whole table instead
+    __maxKeys = 1000
+
+    # Whether the triggers are installed, None until it is looked up
+    __maintained = None
+    __lock = threading.Lock()
+
+    @classmethod
+    def _createTable(cls):
+        try:
+            cursor = DatabaseConnection.getConnection().cursor()
+            cursor.execute(cls._createTableSQL)
+        except Exception as e:
+            print(f"Error: {e}")
+            raise e
+        finally:
+            cursor.close()
+
+    @classmethod
+    def installStatements(cls) -> list[str]:
+        """
+        Returns the statements that install the triggers keeping the table up to date
+        and fill the table from the bills. Used by the migration that adds the rollup.
+        """
+        statements = [f"DROP TRIGGER IF EXISTS {trigger}" for trigger in cls.__triggers]
+        statements += [
+            "CREATE TRIGGER bill_rollup_insert AFTER INSERT ON bill FOR EACH ROW BEGIN " +
+                cls.__addBill("NEW") + "; END",
+            "CREATE TRIGGER bill_rollup_update AFTER UPDATE ON bill FOR EACH ROW BEGIN " +
+                cls.__subtractBill("OLD") + "; " + cls.__addBill("NEW") + "; END",
+            "CREATE TRIGGER bill_rollup_delete AFTER DELETE ON bill FOR EACH ROW BEGIN " +
+                cls.__subtractBill("OLD") + "; END",
+            "CREATE TRIGGER utility_rollup_update AFTER UPDATE ON utility FOR EACH ROW BEGIN " +
+                f"IF NOT (OLD.Type <=> NEW.Type) THEN UPDATE {cls._tableName} SET Type = NEW.Type " +
+                "WHERE UtilityID = NEW.UtilityID; END IF; END"
+        ]
+        statements += [f"DELETE FROM {cls._tableName}",
+                       f"INSERT INTO {cls._tableName} {cls.__groupSQL}{cls.__groupBy}"]
+        return statements
+
+    @classmethod
+    def isMaintained(cls) -> bool:
+        """
+        Returns True if the triggers keeping the table up to date are installed, so the
+        totals can be read instead of the bills. The answer is kept until resetMaintained()
+        is called, which the migrations and rebuild() do.
+        """
+        if cls.__maintained is not None:
+            return cls.__maintained
+        try:
+            cursor = DatabaseConnection.getConnection().cursor(dictionary = True)
+            sql = "SELECT COUNT(*) AS total FROM information_schema.TRIGGERS " + \
+                "WHERE TRIGGER_SCHEMA = DATABASE() AND TRIGGER_NAME IN (" + \
+                ", ".join(["%s"] * len(cls.__triggers)) + ")"
+            cursor.execute(sql, cls.__triggers)
+            maintained = cursor.fetchone()["total"] == len(cls.__triggers)
+        except Exception as e:
+            print(f"Error: {e}")
+            raise e
+        finally:
+            cursor.close()
+        with cls.__lock:
+            cls.__maintained = maintained
+        return maintained
+
+    @classmethod
+    def resetMaintained(cls):
+        """
+        Forgets whether the triggers are installed, so the next isMaintained() looks it up.
+        """
+        with cls.__lock:
+            cls.__maintained = None
+
+    @classmethod
+    def onWrite(cls, table : type, keys : list | None):
+        """
+        Refreshes the totals of the units or utilities that were written to. Deleting a
+        unit or utility clears the reference of its bills without firing the triggers.
+        - table: The DatabaseTable subclass that was written to.
+        - keys: The primary keys of the written rows, or None if they are not known.
+        """
+        tableName = table.getTableName()
+        if tableName not in ["unit", "utility"] or not cls.isMaintained():
+            return
+        if keys is None or len(keys) > cls.__maxKeys:
+            cls.rebuild()
+            return
+        cls.__refresh("UnitID" if tableName == "unit" else "UtilityID", keys)
+
+    @classmethod
+    def rebuild(cls):
+        """
+        Rebuilds the totals from the bills.
+        """
+        cls.resetMaintained()
+        with DatabaseConnection.transaction():
+            cls.__execute(f"DELETE FROM {cls._tableName}", [])
+            cls.__execute(f"INSERT INTO {cls._tableName} {cls.__groupSQL}{cls.__groupBy}", [])
+
+    @classmethod
+    def summary(cls,
+                start : datetime.date,
+                end : datetime.date,
+                types : list[str]) -> dict[str, float | int]:
+        """
+        Returns the totals of the bills of the given utility types whose billing period
+        ends between the given dates, as a dictionary with the keys TotalAmount, BillCount,
+        UnpaidAmount and UnpaidCount. The months fully inside the range are read from the
+        table and the bills of the partial months at its ends from the bill table.
+        - start: The first day of the range.
+        - end: The last day of the range.
+        - types: The utility types to include.
+        """
+        fullStart, fullEnd = fullMonths(start, end)
+        typesClause = ", ".join(["%s"] * len(types))
+
+        result = {}
+        try:
+            sql = "SELECT COALESCE(SUM(part.TotalAmount), 0) AS TotalAmount, COALESCE(SUM(part.BillCount), 0) AS BillCount, " + \
+                "COALESCE(SUM(part.UnpaidAmount), 0) AS UnpaidAmount, COALESCE(SUM(part.UnpaidCount), 0) AS UnpaidCount FROM (" + \
+                f"SELECT r.TotalAmount, r.BillCount, r.UnpaidAmount, r.UnpaidCount FROM {cls._tableName} r " + \
+                f"WHERE r.Month >= %s AND r.Month < %s AND r.Type IN ({typesClause}) " + \
+                "UNION ALL SELECT b.TotalAmount, 1, IF(b.Status != 'Paid', b.TotalAmount, 0), IF(b.Status != 'Paid', 1, 0) " + \
+                "FROM bill b JOIN utility u ON u.UtilityID = b.UtilityID " + \
+                "WHERE ((b.BillingPeriodEnd >= %s AND b.BillingPeriodEnd < %s) OR (b.BillingPeriodEnd >= %s AND b.BillingPeriodEnd <= %s)) " + \
+                f"AND u.Type IN ({typesClause})) AS part"
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, [fullStart, fullEnd] + list(types) + [start, fullStart, fullEnd, end] + list(types))
+            row = cursor.fetchone()
+            result = {"TotalAmount": row["TotalAmount"],
+                      "BillCount": int(row["BillCount"]),
+                      "UnpaidAmount": row["UnpaidAmount"],
+                      "UnpaidCount": int(row["UnpaidCount"])}
+        except Exception as e:
+            print(f"Error: {e}")
+            raise e
+        finally:
+            cursor.close()
+        return result
+
+    @classmethod
+    def monthlyTotals(cls,
+                    start : datetime.date,
+                    end : datetime.date) -> list[dict[str, str | float | datetime.date]]:
+        """
+        Returns the total amount of the bills per utility type and month for the bills whose
+        billing period ends between the given dates, ordered by type and month. Each row has
+        the keys Type, BillingPeriodEnd (the last day of the month, or the end of the range)
+        and TotalAmount.
+        - start: The first day of the range.
+        - end: The last day of the range.
+        """
+        fullStart, fullEnd = fullMonths(start, end)
+
+        result = []
+        try:
+            sql = "SELECT part.Type, LEAST(LAST_DAY(part.Month), %s) AS BillingPeriodEnd, SUM(part.TotalAmount) AS TotalAmount FROM (" + \
+                f"SELECT r.Type, r.Month, r.TotalAmount FROM {cls._tableName} r " + \
+                "WHERE r.Month >= %s AND r.Month < %s AND r.UtilityID != 0 " + \
+                "UNION ALL SELECT u.Type, DATE_SUB(b.BillingPeriodEnd, INTERVAL DAYOFMONTH(b.BillingPeriodEnd) - 1 DAY), b.TotalAmount " + \
+                "FROM bill b JOIN utility u ON u.UtilityID = b.UtilityID " + \
+                "WHERE (b.BillingPeriodEnd >= %s AND b.BillingPeriodEnd < %s) OR (b.BillingPeriodEnd >= %s AND b.BillingPeriodEnd <= %s)" + \
+                ") AS part GROUP BY part.Type, part.Month ORDER BY part.Type, part.Month"
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, [end, fullStart, fullEnd, start, fullStart, fullEnd, end])
+            result = cursor.fetchall()
+        except Exception as e:
+            print(f"Error: {e}")
+            raise e
+        finally:
+            cursor.close()
+        return result
+
+    @classmethod
+    def __refresh(cls, column : str, keys : list[int]):
+        """
+        Recomputes the totals of the given units or utilities and of the bills without one.
+        """
+        if len(keys) == 0:
+            return
+        placeholders = ", ".join(["%s"] * len(keys))
+        with DatabaseConnection.transaction():
+            cls.__execute(f"DELETE FROM {cls._tableName} WHERE {column} = 0 OR {column} IN ({placeholders})", keys)
+            cls.__execute(f"INSERT INTO {cls._tableName} {cls.__groupSQL} " +
+                        f"WHERE b.{column} IS NULL OR b.{column} IN ({placeholders}){cls.__groupBy}", keys)
+
+    @classmethod
+    def __addBill(cls, row : str) -> str:
+        """
+        Returns the trigger statement adding the bill in the given row (NEW) to its totals.
+        """
+        return f"INSERT INTO {cls._tableName} " + \
+            "(UnitID, UtilityID, Type, Month, TotalAmount, BillCount, UnpaidAmount, UnpaidCount) " + \
+            f"VALUES (COALESCE({row}.UnitID, 0), COALESCE({row}.UtilityID, 0), " + \
+            f"COALESCE((SELECT Type FROM utility WHERE UtilityID = {row}.UtilityID), ''), " + \
+            f"DATE_SUB({row}.BillingPeriodEnd, INTERVAL DAYOFMONTH({row}.BillingPeriodEnd) - 1 DAY), " + \
+            f"{row}.TotalAmount, 1, IF({row}.Status != 'Paid', {row}.TotalAmount, 0), IF({row}.Status != 'Paid', 1, 0)) AS delta " + \
+            f"ON DUPLICATE KEY UPDATE TotalAmount = {cls._tableName}.TotalAmount + delta.TotalAmount, " + \
+            f"BillCount = {cls._tableName}.BillCount + delta.BillCount, " + \
+            f"UnpaidAmount = {cls._tableName}.UnpaidAmount + delta.UnpaidAmount, " + \
+            f"UnpaidCount = {cls._tableName}.UnpaidCount + delta.UnpaidCount"
+
+    @classmethod
+    def __subtractBill(cls, row : str) -> str:
+        """
+        Returns the trigger statements subtracting the bill in the given row (OLD) from its
+        totals and dropping the totals that no longer have bills.
+        """
+        group = f"UnitID = COALESCE({row}.UnitID, 0) AND UtilityID = COALESCE({row}.UtilityID, 0) " + \
+            f"AND Type = COALESCE((SELECT Type FROM utility WHERE UtilityID = {row}.UtilityID), '') " + \
+            f"AND Month = DATE_SUB({row}.BillingPeriodEnd, INTERVAL DAYOFMONTH({row}.BillingPeriodEnd) - 1 DAY)"
+        return f"UPDATE {cls._tableName} SET TotalAmount = TotalAmount - {row}.TotalAmount, BillCount = BillCount - 1, " + \
+            f"UnpaidAmount = UnpaidAmount - IF({row}.Status != 'Paid', {row}.TotalAmount, 0), " + \
+            f"UnpaidCount = UnpaidCount - IF({row}.Status != 'Paid', 1, 0) WHERE {group}; " + \
+            f"DELETE FROM {cls._tableName} WHERE {group} AND BillCount <= 0"
+
+    @classmethod
+    def __execute(cls, sql : str, params : list):
+        try:
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, params)
+        except Exception as e:
+            print(f"Error: {e}")
+            raise e
+        finally:
+            cursor.close()
+
+SchemaCache.register(BillRollup)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Rebuilds the monthly bill totals from the bills.")
+    parser.parse_args()
+    BillRollup.rebuild()
+    print("The monthly bill rollup was rebuilt.")
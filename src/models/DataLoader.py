@@ -0,0 +1,71 @@
+class DataLoader:
+    """
+    Collects the keys a controller call is going to look up and resolves them together,
+    so looking up n rows takes one query instead of n. A loader is meant to live for a
+    single controller call: it remembers every value it resolved and never refreshes it.
+    - batchLoad: A function that takes a list of keys and returns a dictionary from key
+    to value, such as DatabaseTable.readMany. Keys missing from the dictionary resolve to None.
+    - maxBatchSize: The maximum number of keys passed to one batchLoad call.
+
+    Example:
+        units = DataLoader(Unit.readMany)
+        units.loadMany(unitIDs)       # no query yet
+        name = units.get(unitIDs[0])  # one query for all the unit IDs
+    """
+
+    def __init__(self, batchLoad, maxBatchSize : int = 1000):
+        self.__batchLoad = batchLoad
+        self.__maxBatchSize = max(1, maxBatchSize)
+        self.__values : dict = {}
+        self.__pending : list = []
+
+    def load(self, key):
+        """
+        Queues a key to be resolved with the next batch.
+        """
+        if key not in self.__values and key not in self.__pending:
+            self.__pending.append(key)
+
+    def loadMany(self, keys : list):
+        """
+        Queues several keys to be resolved with the next batch.
+        """
+        for key in keys:
+            self.load(key)
+
+    def get(self, key) -> any:
+        """
+        Returns the value of a key. If the key was not resolved yet, it is resolved
+        together with every queued key.
+        """
+        if key not in self.__values:
+            self.load(key)
+            self.dispatch()
+        return self.__values.get(key)
+
+    def getMany(self, keys : list) -> list:
+        """
+        Returns the values of several keys in the order of the keys.
+        """
+        self.loadMany(keys)
+        self.dispatch()
+        return [self.__values.get(key) for key in keys]
+
+    def prime(self, key, value):
+        """
+        Stores a value that is already known, so it is not looked up.
+        """
+        self.__values[key] = value
+        if key in self.__pending:
+            self.__pending.remove(key)
+
+    def dispatch(self):
+        """
+        Resolves every queued key, in batches of at most maxBatchSize keys.
+        """
+        while len(self.__pending) > 0:
+            batch = self.__pending[:self.__maxBatchSize]
+            self.__pending = self.__pending[self.__maxBatchSize:]
+            values = self.__batchLoad(batch)
+            for key in batch:
+                self.__values[key] = values.get(key)
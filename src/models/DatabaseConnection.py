@@ -1,26 +1,397 @@
 import mysql.connector
+from mysql.connector.errors import PoolError
 from dotenv import load_dotenv
+from contextlib import contextmanager
+import threading
+import time
 import os
 
+from .PreparedStatementCache import PreparedStatementCache, PreparedCursor
+
+class PooledConnection:
+    """
+    A connection that is owned by the DatabaseConnection pool. It keeps track of
+    when the connection was last returned to the pool and when it was borrowed
+    so that idle connections can be recycled and checkout durations measured.
+    Each connection has its own cache of prepared statements and counts the
+    transaction blocks it is in, so nested blocks become savepoints.
+    """
+
+    def __init__(self, connection : mysql.connector.MySQLConnection, statementCacheSize : int = 64):
+        self.connection = connection
+        self.statementCache = PreparedStatementCache(connection, statementCacheSize)
+        self.lastReturned = time.monotonic()
+        self.borrowedAt = None
+        self.transactionDepth = 0
+
 class DatabaseConnection:
     """
-    A singleton class to manage the database connection.
+    A thread-safe pool of database connections.
     It uses the mysql.connector library to connect to a MySQL database.
-    The connection parameters are loaded from a .env file.
+    Each thread that asks for a connection borrows one from the pool and keeps it
+    until it releases it, so every borrowing thread has its own connection.
+    The connection parameters and the pool settings are loaded from a .env file:
+    - POOL_SIZE: the maximum number of open connections (default 5).
+    - POOL_IDLE_TIMEOUT: seconds an idle connection is kept before it is recycled (default 300).
+    - POOL_WAIT_TIMEOUT: seconds a thread waits for a free connection before failing (default 30).
+    - STATEMENT_CACHE_SIZE: prepared statements kept per connection (default 64).
+    - SEARCH_TIMEOUT: milliseconds a search statement may run on the server before it
+    is stopped, 0 for no limit (default 10000).
     """
-    
-    __db = None
+
+    __started = False
+    __poolSize = 5
+    __idleTimeout = 300.0
+    __waitTimeout = 30.0
+    __statementCacheSize = 64
+    __searchTimeout = 10000
+
+    __idle : list[PooledConnection] = []
+    __borrowed : dict[int, PooledConnection] = {}
+    # Threads whose call was cancelled, they get no connection until they release theirs
+    __cancelledThreads : set[int] = set()
+    __openCount = 0
+    __condition = threading.Condition()
+    __transactionListeners : list = []
+
+    __stats = {
+        "checkouts": 0,
+        "waits": 0,
+        "totalWaitTime": 0.0,
+        "maxWaitTime": 0.0,
+        "releases": 0,
+        "totalCheckoutDuration": 0.0,
+        "maxCheckoutDuration": 0.0,
+        "recycled": 0
+    }
 
     @staticmethod
     def startConnection():
         """
-        Initializes the database connection using the credentials stored in the .env file.
+        Loads the credentials and the pool settings stored in the .env file.
+        Connections are opened lazily when a thread borrows one.
         """
-        if DatabaseConnection.__db is not None:
+        if DatabaseConnection.__started:
             return
-        
+
         load_dotenv()
-        DatabaseConnection.__db = mysql.connector.connect(
+        DatabaseConnection.__poolSize = max(1, int(os.getenv("POOL_SIZE", 5)))
+        DatabaseConnection.__idleTimeout = float(os.getenv("POOL_IDLE_TIMEOUT", 300))
+        DatabaseConnection.__waitTimeout = float(os.getenv("POOL_WAIT_TIMEOUT", 30))
+        DatabaseConnection.__statementCacheSize = int(os.getenv("STATEMENT_CACHE_SIZE", 64))
+        DatabaseConnection.__searchTimeout = max(0, int(os.getenv("SEARCH_TIMEOUT", 10000)))
+        DatabaseConnection.__started = True
+
+    @staticmethod
+    def getConnection() -> mysql.connector.MySQLConnection:
+        """
+        Returns the database connection borrowed by the current thread. If the thread
+        has not borrowed a connection yet, one is taken from the pool first. The thread
+        keeps the connection until releaseConnection() is called.
+        """
+        return DatabaseConnection.__current().connection
+
+    @staticmethod
+    def getCursor(sql : str) -> PreparedCursor:
+        """
+        Returns a prepared dictionary cursor for the given statement on the connection
+        of the current thread. The statement must use %s placeholders for its values.
+        Prepared statements are cached per connection, so executing the same statement
+        shape again skips parsing and planning on the server.
+        """
+        return DatabaseConnection.__current().statementCache.getCursor(sql)
+
+    @staticmethod
+    def getPoolSize() -> int:
+        """
+        Returns the maximum number of open connections of the pool.
+        """
+        DatabaseConnection.startConnection()
+        return DatabaseConnection.__poolSize
+
+    @staticmethod
+    def searchTimeoutHint() -> str:
+        """
+        Returns the optimizer hint that stops a SELECT statement once it ran longer than
+        SEARCH_TIMEOUT, to be put right after the SELECT keyword of search statements.
+        """
+        DatabaseConnection.startConnection()
+        if DatabaseConnection.__searchTimeout == 0:
+            return ""
+        return f"/*+ MAX_EXECUTION_TIME({DatabaseConnection.__searchTimeout}) */ "
+
+    @staticmethod
+    def getConnectionID() -> int:
+        """
+        Returns the server ID of the connection borrowed by the current thread, borrowing
+        one if needed. Another thread can stop its running statement with killQuery().
+        """
+        return DatabaseConnection.getConnection().connection_id
+
+    @staticmethod
+    def killQuery(connectionID : int):
+        """
+        Stops the statement that is running on the connection with the given server ID,
+        if any. The statement fails with an error on the thread that ran it and the
+        connection stays usable. It is sent on the connection of the current thread.
+        - connectionID: The server ID of the connection, from getConnectionID().
+        """
+        try:
+            DatabaseConnection.__execute(DatabaseConnection.getConnection(), f"KILL QUERY {int(connectionID)}")
+        except Exception as e:
+            print(f"Error: {e}")
+
+    @staticmethod
+    def cancelThread(threadID : int):
+        """
+        Cancels the call running on the given thread: getting a connection or a cursor
+        on it raises InterruptedError until the thread calls releaseConnection(), so the
+        call runs no further statements. Use killQuery() to stop the running one.
+        - threadID: The identifier of the thread, from threading.get_ident().
+        """
+        DatabaseConnection.__cancelledThreads.add(threadID)
+
+    @staticmethod
+    def releaseConnection():
+        """
+        Returns the connection borrowed by the current thread to the pool.
+        Background workers should call this once they are done with the database.
+        It also ends the cancellation of the thread set by cancelThread().
+        """
+        DatabaseConnection.__cancelledThreads.discard(threading.get_ident())
+        with DatabaseConnection.__condition:
+            pooled = DatabaseConnection.__borrowed.pop(threading.get_ident(), None)
+            if pooled is None:
+                return
+            now = time.monotonic()
+            duration = now - pooled.borrowedAt
+            stats = DatabaseConnection.__stats
+            stats["releases"] += 1
+            stats["totalCheckoutDuration"] += duration
+            stats["maxCheckoutDuration"] = max(stats["maxCheckoutDuration"], duration)
+            pooled.borrowedAt = None
+            pooled.lastReturned = now
+            DatabaseConnection.__idle.append(pooled)
+            DatabaseConnection.__condition.notify()
+
+    @staticmethod
+    @contextmanager
+    def borrowConnection():
+        """
+        Context manager that lends a connection to the current thread for the duration
+        of the block. The connection is only returned to the pool if it was borrowed by
+        this block, so it can be safely nested.
+        """
+        alreadyBorrowed = threading.get_ident() in DatabaseConnection.__borrowed
+        try:
+            yield DatabaseConnection.getConnection()
+        finally:
+            if not alreadyBorrowed:
+                DatabaseConnection.releaseConnection()
+
+    @staticmethod
+    def inTransaction() -> bool:
+        """
+        Returns True if the connection of the current thread has a transaction open.
+        """
+        pooled = DatabaseConnection.__borrowed.get(threading.get_ident())
+        return pooled is not None and pooled.transactionDepth > 0
+
+    @staticmethod
+    @contextmanager
+    def transaction():
+        """
+        Context manager that runs the statements of the block in one transaction on the
+        connection of the current thread, which is kept borrowed until the block ends.
+        The transaction is committed when the block ends and rolled back if it raises.
+        A block inside another block becomes a savepoint: if it raises, only its own
+        statements are rolled back, and they are committed with the outermost block.
+        """
+        with DatabaseConnection.borrowConnection() as connection:
+            pooled = DatabaseConnection.__current()
+            depth = pooled.transactionDepth
+            savepoint = f"savepoint_{depth}"
+            if depth == 0:
+                connection.start_transaction()
+            else:
+                DatabaseConnection.__execute(connection, f"SAVEPOINT {savepoint}")
+            pooled.transactionDepth += 1
+            try:
+                yield connection
+            except BaseException:
+                pooled.transactionDepth = depth
+                try:
+                    if depth == 0:
+                        connection.rollback()
+                    else:
+                        DatabaseConnection.__execute(connection, f"ROLLBACK TO SAVEPOINT {savepoint}")
+                except Exception as e:
+                    print(f"Error: {e}")
+                DatabaseConnection.__notifyTransaction(False)
+                raise
+            pooled.transactionDepth = depth
+            if depth == 0:
+                try:
+                    connection.commit()
+                except Exception as e:
+                    print(f"Error: {e}")
+                    try:
+                        connection.rollback()
+                    except Exception:
+                        pass
+                    DatabaseConnection.__notifyTransaction(False)
+                    raise e
+                DatabaseConnection.__notifyTransaction(True)
+            else:
+                DatabaseConnection.__execute(connection, f"RELEASE SAVEPOINT {savepoint}")
+
+    @staticmethod
+    def addTransactionListener(listener):
+        """
+        Registers a function that is called with True after a transaction is committed
+        and with False after a transaction or a savepoint is rolled back.
+        - listener: A callable taking (committed).
+        """
+        if listener not in DatabaseConnection.__transactionListeners:
+            DatabaseConnection.__transactionListeners.append(listener)
+
+    @staticmethod
+    def closeConnection():
+        """
+        Closes every connection of the pool, including the ones that are borrowed.
+        """
+        with DatabaseConnection.__condition:
+            connections = DatabaseConnection.__idle + list(DatabaseConnection.__borrowed.values())
+            DatabaseConnection.__idle = []
+            DatabaseConnection.__borrowed = {}
+            DatabaseConnection.__openCount = 0
+            DatabaseConnection.__condition.notify_all()
+        for pooled in connections:
+            DatabaseConnection.__discard(pooled)
+
+    @staticmethod
+    def getPoolStats() -> dict[str, int | float]:
+        """
+        Returns the statistics of the pool. The times are in seconds.
+        - size, idle, borrowed: the number of open, idle and borrowed connections.
+        - checkouts, waits: the number of borrows and how many of them had to wait.
+        - averageWaitTime, maxWaitTime: the time spent waiting for a free connection.
+        - averageCheckoutDuration, maxCheckoutDuration: the time connections were kept by a thread.
+        - recycled: the number of connections replaced because they were idle too long or broken.
+        """
+        with DatabaseConnection.__condition:
+            stats = DatabaseConnection.__stats
+            return {
+                "size": DatabaseConnection.__openCount,
+                "idle": len(DatabaseConnection.__idle),
+                "borrowed": len(DatabaseConnection.__borrowed),
+                "checkouts": stats["checkouts"],
+                "waits": stats["waits"],
+                "averageWaitTime": stats["totalWaitTime"] / stats["checkouts"] if stats["checkouts"] > 0 else 0.0,
+                "maxWaitTime": stats["maxWaitTime"],
+                "averageCheckoutDuration": stats["totalCheckoutDuration"] / stats["releases"] if stats["releases"] > 0 else 0.0,
+                "maxCheckoutDuration": stats["maxCheckoutDuration"],
+                "recycled": stats["recycled"]
+            }
+
+    @staticmethod
+    def getStatementCacheStats() -> dict[str, int | float]:
+        """
+        Returns the prepared statement cache statistics summed over all open connections.
+        """
+        with DatabaseConnection.__condition:
+            caches = [pooled.statementCache for pooled in DatabaseConnection.__idle + list(DatabaseConnection.__borrowed.values())]
+        hits = sum(cache.hits for cache in caches)
+        misses = sum(cache.misses for cache in caches)
+        return {
+            "statements": sum(len(cache) for cache in caches),
+            "hits": hits,
+            "misses": misses,
+            "evictions": sum(cache.evictions for cache in caches),
+            "hitRate": hits / (hits + misses) if hits + misses > 0 else 0.0
+        }
+
+    @staticmethod
+    def __current() -> PooledConnection:
+        """
+        Returns the pooled connection of the current thread, borrowing one if needed.
+        """
+        if threading.get_ident() in DatabaseConnection.__cancelledThreads:
+            raise InterruptedError("The call was cancelled.")
+        pooled = DatabaseConnection.__borrowed.get(threading.get_ident())
+        if pooled is None:
+            pooled = DatabaseConnection.__borrow()
+        return pooled
+
+    @staticmethod
+    def __borrow() -> PooledConnection:
+        """
+        Takes a connection from the pool for the current thread, waiting for one to be
+        released if the pool is exhausted. Idle connections are validated before they
+        are handed out and replaced if they timed out or are no longer usable.
+        """
+        DatabaseConnection.startConnection()
+
+        start = time.monotonic()
+        waited = False
+        pooled = None
+        with DatabaseConnection.__condition:
+            while len(DatabaseConnection.__idle) == 0 and DatabaseConnection.__openCount >= DatabaseConnection.__poolSize:
+                waited = True
+                remaining = DatabaseConnection.__waitTimeout - (time.monotonic() - start)
+                if remaining <= 0:
+                    raise PoolError(f"No connection became available within {DatabaseConnection.__waitTimeout} seconds.")
+                DatabaseConnection.__condition.wait(remaining)
+            if len(DatabaseConnection.__idle) > 0:
+                pooled = DatabaseConnection.__idle.pop()
+            else:
+                DatabaseConnection.__openCount += 1
+
+            waitTime = time.monotonic() - start
+            stats = DatabaseConnection.__stats
+            stats["checkouts"] += 1
+            stats["waits"] += 1 if waited else 0
+            stats["totalWaitTime"] += waitTime
+            stats["maxWaitTime"] = max(stats["maxWaitTime"], waitTime)
+
+        try:
+            if pooled is not None and not DatabaseConnection.__isValid(pooled):
+                DatabaseConnection.__discard(pooled)
+                DatabaseConnection.__stats["recycled"] += 1
+                pooled = None
+            if pooled is None:
+                pooled = PooledConnection(DatabaseConnection.__connect(), DatabaseConnection.__statementCacheSize)
+        except Exception as e:
+            with DatabaseConnection.__condition:
+                DatabaseConnection.__openCount -= 1
+                DatabaseConnection.__condition.notify()
+            print(f"Error: {e}")
+            raise e
+
+        pooled.borrowedAt = time.monotonic()
+        with DatabaseConnection.__condition:
+            DatabaseConnection.__borrowed[threading.get_ident()] = pooled
+        return pooled
+
+    @staticmethod
+    def __isValid(pooled : PooledConnection) -> bool:
+        """
+        Checks if an idle connection can be handed out again.
+        """
+        if time.monotonic() - pooled.lastReturned > DatabaseConnection.__idleTimeout:
+            return False
+        try:
+            pooled.connection.ping(reconnect = False)
+        except Exception:
+            return False
+        return True
+
+    @staticmethod
+    def __connect() -> mysql.connector.MySQLConnection:
+        """
+        Opens a new connection using the credentials stored in the .env file.
+        """
+        connection = mysql.connector.connect(
             host = os.getenv("HOST"),
             user = os.getenv("USER"),
             password = os.getenv("PASSWORD"),
@@ -28,24 +399,33 @@ class DatabaseConnection:
             database = os.getenv("DATABASE"),
             use_pure = True
         )
-        DatabaseConnection.__db.autocommit = True
+        connection.autocommit = True
+        return connection
 
     @staticmethod
-    def getConnection() -> mysql.connector.MySQLConnection:
-        """
-        Returns the database connection object. If the connection is not established,
-        it initializes the connection first.
-        """
-        if DatabaseConnection.__db is None:
-            DatabaseConnection.startConnection()
-        return DatabaseConnection.__db
+    def __execute(connection : mysql.connector.MySQLConnection, sql : str):
+        cursor = connection.cursor()
+        try:
+            cursor.execute(sql)
+        finally:
+            cursor.close()
 
     @staticmethod
-    def closeConnection():
+    def __notifyTransaction(committed : bool):
+        for listener in DatabaseConnection.__transactionListeners:
+            try:
+                listener(committed)
+            except Exception as e:
+                print(f"Error: {e}")
+
+    @staticmethod
+    def __discard(pooled : PooledConnection):
         """
-        Closes the database connection if it is open.
+        Closes a connection that is no longer part of the pool.
         """
-        if DatabaseConnection.__db is None:
-            return
-        if DatabaseConnection.__db.is_connected():
-            DatabaseConnection.__db.close()
\ No newline at end of file
+        try:
+            pooled.statementCache.clear()
+            if pooled.connection.is_connected():
+                pooled.connection.close()
+        except Exception:
+            pass
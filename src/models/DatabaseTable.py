@@ -1,6 +1,13 @@
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+import threading
 
 from .DatabaseConnection import DatabaseConnection
+from .SchemaCache import SchemaCache
+from .SearchIndex import SearchIndex
+from .BillRollup import BillRollup
+from .UtilitySharing import UtilitySharing
+from .QueryCache import QueryCache
 
 class DatabaseTable(ABC):
     """
@@ -8,12 +15,71 @@ class DatabaseTable(ABC):
     interact with the database, including creating tables, reading data, inserting,
     updating, and deleting records. It also provides methods to get the table name,
     primary key, and total count of records in the table.
+
+    Subclasses define the name of the table in _tableName and its CREATE TABLE
+    statement in _createTableSQL. Defining a subclass does not touch the database,
+    the table is created and its metadata read the first time it is used.
     """
     _tableName : str = None
-    _primary : str = None
+    _createTableSQL : str = None
+    _primary : str | list[str] = None
     _initialized : str = False
     _columns : list[str] = []
     referredTables : dict[str : 'DatabaseTable'] = {}
+    __writeListeners : list = []
+
+    # Total row counts of paged reads, keyed by table, method and filters
+    __pageTotals : OrderedDict[tuple, int] = OrderedDict()
+    __pageTotalsSize = 128
+    __pageTotalsGeneration = 0
+    __pageTotalsLock = threading.Lock()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if "_tableName" in cls.__dict__:
+            SchemaCache.register(cls)
+            QueryCache.addReferences(cls._tableName, [table._tableName for table in cls.referredTables.values()])
+
+    @staticmethod
+    def addWriteListener(listener):
+        """
+        Registers a function that is called after every successful write to any table,
+        with the table class and the primary keys of the written rows (None if unknown).
+        - listener: A callable taking (table, keys).
+        """
+        if listener not in DatabaseTable.__writeListeners:
+            DatabaseTable.__writeListeners.append(listener)
+
+    @classmethod
+    def _notifyWrite(cls, keys : list | None):
+        """
+        A protected method that tells the write listeners that rows of the table changed.
+        The cached page totals are dropped first, since any write can change them.
+        Inside a transaction, the listeners see the uncommitted rows of the transaction.
+        A failing listener does not undo the write, so its error is only printed.
+        - keys: The primary keys of the written rows, or None if they are not known.
+        """
+        with DatabaseTable.__pageTotalsLock:
+            DatabaseTable.__pageTotals.clear()
+            DatabaseTable.__pageTotalsGeneration += 1
+        for listener in DatabaseTable.__writeListeners:
+            try:
+                listener(cls, keys)
+            except Exception as e:
+                print(f"Error: {e}")
+
+    @staticmethod
+    def _onTransactionEnd(committed : bool):
+        """
+        A protected method called when a transaction ends. Reads inside the transaction
+        bypass the caches, but results other threads cached while it was open were read
+        before it committed, so every cached result is dropped.
+        - committed: True if the transaction was committed, False if it was rolled back.
+        """
+        with DatabaseTable.__pageTotalsLock:
+            DatabaseTable.__pageTotals.clear()
+            DatabaseTable.__pageTotalsGeneration += 1
+        QueryCache.invalidate()
 
     @classmethod
     def initialize(cls):
@@ -22,41 +88,42 @@ class DatabaseTable(ABC):
         This method can be called to ensure that the table is ready for use but it is not
         necessarily required to be called before using the class methods. The class methods
         will automatically call this method if the table is not initialized.
+        The metadata of the tables is cached by SchemaCache, so this only queries the
+        database when the table definitions changed since the last run.
+        A table with a composite primary key has a list of columns as its primary key.
         """
         try:
-            cursor = DatabaseConnection.getConnection().cursor(dictionary = True)
             if not cls._initialized:
+                metadata = SchemaCache.getMetadata(cls._tableName)
+                primary = metadata["primary"]
+                cls._primary = primary[0] if len(primary) == 1 else list(primary)
+                cls._columns = list(metadata["columns"])
                 cls._initialized = True
-                cls._createTable()
-                sql = f"SELECT COLUMN_NAME FROM information_schema.KEY_COLUMN_USAGE " + \
-                f"WHERE TABLE_NAME = '{cls._tableName}' AND CONSTRAINT_NAME = " + \
-                f"'PRIMARY' AND TABLE_SCHEMA = DATABASE()"
-                cursor.execute(sql)
-                cls._primary = cursor.fetchone()['COLUMN_NAME']
-                cls._columns = cls._readColumns(cls)
         except Exception as e:
             print(f"Error: {e}")
             raise e
-        finally:
-            cursor.close()
     
     @classmethod  
-    @abstractmethod
     def _createTable(cls):
         """
-        Creates the table in the database. This method should be implemented by
-        subclasses to create the specific table. The method should also handle
-        any exceptions that may occur during the table creation process.
-        Should only be called once when the table is initialized.
+        Creates the table in the database using the _createTableSQL statement of the
+        subclass if it does not exist yet. Called by SchemaCache when the metadata of
+        the table is not cached.
         """
-        pass
+        try:
+            cursor = DatabaseConnection.getConnection().cursor()
+            cursor.execute(cls._createTableSQL)
+        except Exception as e:
+            print(f"Error: {e}")
+            raise e
+        finally:
+            cursor.close()
     
     @classmethod
     def getTableName(cls) -> str:
         """
         Returns the name of the table.
         """
-        cls.initialize()
         return cls._tableName
     
     @classmethod
@@ -83,7 +150,9 @@ class DatabaseTable(ABC):
             sortBy : str = None, 
             order : str = "ASC",
             page : int = 1, 
-            limit : int = 50
+            limit : int = 50,
+            after : tuple = None,
+            withTotal : bool = False
             ) -> list[dict[str, str]]:
         """
         Reads data from the table. The method accepts various parameters to filter,
@@ -95,6 +164,11 @@ class DatabaseTable(ABC):
         - order: A string indicating the order of sorting ('ASC' or 'DESC').
         - page: An integer indicating the page number for pagination.
         - limit: An integer indicating the number of records per page.
+        - after: A tuple of the sort value and primary key of the last row of the previous
+        page. If given, the page continues after that row instead of using page.
+        Rows with the same sort value are ordered by the primary key.
+        - withTotal: If True, each row also has the number of rows matching the filters
+        in totalRows. The count ignores after, so it is only complete without a cursor.
         The method returns a list of dictionaries where each dictionary represents a row
         """
         cls.initialize()
@@ -129,6 +203,9 @@ class DatabaseTable(ABC):
             if len(referred[table]) == 0:
                 raise ValueError(f"referredColumns for table '{table}' must not be empty.")   
             
+        # Searches over all the columns of an indexed table can use the search index
+        searchAll = len(columns) == 0 and not referred
+
         # Check if columns is empty, if so, use all columns
         if len(columns) == 0:
             columns += cls._columns
@@ -143,6 +220,7 @@ class DatabaseTable(ABC):
         try:    
 
             searchClause = ""
+            params = []
 
             if referred: # Check if referred is not empty
                 for table, tableColumns in referred.items():
@@ -154,7 +232,8 @@ class DatabaseTable(ABC):
                                             for table in referred.keys()])
 
             if searchValue is not None: # Check if searchValue is not empty
-                allcolumns = "(" + " OR ".join([column + " REGEXP \'" + searchValue + "\'" for column in columns]) + ")"
+                allcolumns, searchParams = cls.__searchCondition(columns, searchValue, searchAll)
+                params += searchParams
                 if searchClause == "":
                     searchClause = "WHERE "
                 else:
@@ -177,14 +256,23 @@ class DatabaseTable(ABC):
 
             if order not in ["ASC", "DESC"]:
                 raise ValueError("order must be 'ASC' or 'DESC'.")
+
+            primaryKey = f"{cls._tableName}.{cls._primary}"
+            offset = (page - 1) * limit
+            if after is not None:
+                seekClause, seekParams = cls._seekClause(sortBy, [primaryKey], order, after)
+                searchClause += (" AND " if searchClause != "" else "WHERE ") + seekClause
+                params += seekParams
+                offset = 0
             
-            selectClause = ', '.join(columns)
+            selectClause = ', '.join(columns) + (", COUNT(*) OVER() AS totalRows" if withTotal else "")
             tableNames = ", ".join([cls.referredTables[table].getTableName() for table in referred.keys()] + [cls._tableName])
             
-            cursor = DatabaseConnection.getConnection().cursor(dictionary = True)
-            offset = (page - 1) * limit
-            sql = f"SELECT {selectClause} FROM {tableNames} {searchClause} ORDER BY {sortBy} {order} LIMIT {limit} OFFSET {offset}; "
-            cursor.execute(sql)
+            hint = DatabaseConnection.searchTimeoutHint() if searchValue is not None else ""
+            sql = f"SELECT {hint}{selectClause} FROM {tableNames} {searchClause} " + \
+                f"ORDER BY {sortBy} {order}, {primaryKey} {order} LIMIT %s OFFSET %s"
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, params + [limit, offset])
             result = cursor.fetchall()
         except Exception as e:
             print(f"Error: {e}")
@@ -194,6 +282,185 @@ class DatabaseTable(ABC):
         return result
 
     @classmethod
+    def readPage(cls,
+            columns : list[str] = None,
+            referred : dict[str, list[str]] = None,
+            searchValue : str = None,
+            sortBy : str = None,
+            order : str = "ASC",
+            page : int = 1,
+            limit : int = 50,
+            after : tuple = None,
+            withTotal : bool = True
+            ) -> tuple[list[dict[str, str]], int | None]:
+        """
+        Reads a page of data like read() and also returns the total number of rows
+        matching the filters, from the same statement. The total is cached for the
+        columns, referred tables and search value, so changing only the sort order or
+        the page reads the rows alone. The parameters are the same as read(), and:
+        - withTotal: If False, the rows are read alone and the total is None unless it
+        is cached. readPageTotal() reads it afterwards.
+        Returns the rows of the page and the total number of matching rows.
+        """
+        return cls._readPage("read", cls.__pageFilters(columns, referred, searchValue),
+            lambda withTotal : cls.read(None if columns is None else list(columns), referred, searchValue,
+                                        sortBy, order, page, limit, after, withTotal),
+            lambda : cls.totalCount(None if columns is None else list(columns), referred, searchValue),
+            after is None, withTotal)
+
+    @classmethod
+    def readPageTotal(cls,
+            columns : list[str] = None,
+            referred : dict[str, list[str]] = None,
+            searchValue : str = None
+            ) -> int:
+        """
+        Returns the total number of rows matching the filters of readPage(), from its
+        cache if it is there. The parameters are the same as totalCount().
+        """
+        return cls._readPageTotal("read", cls.__pageFilters(columns, referred, searchValue),
+            lambda : cls.totalCount(None if columns is None else list(columns), referred, searchValue))
+
+    @classmethod
+    def _readPage(cls,
+                name : str,
+                filters : tuple,
+                read,
+                count,
+                windowed : bool,
+                withTotal : bool = True) -> tuple[list[dict[str, any]], int | None]:
+        """
+        A protected method that returns a page of rows and the total number of rows
+        matching the filters. The total is read with the rows through a COUNT(*) OVER()
+        column named totalRows, and kept per filter signature until the next write.
+        - name: The name of the paged read, part of the cache key with the table name.
+        - filters: A hashable tuple of the arguments that decide which rows match.
+        - read: A function that takes withTotal and returns the rows of the page.
+        - count: A function that returns the total number of matching rows.
+        - windowed: False if the page is read after a keyset cursor, in which case the
+        window only counts the rows after the cursor and count() is used on a cache miss.
+        - withTotal: If False, the total is only returned if it is cached, so the page
+        is not held back by counting every matching row. It is None otherwise.
+        """
+        key = (cls._tableName, name, filters)
+        total, generation = DatabaseTable.__cachedTotal(key)
+        if total is not None:
+            return read(False), total
+        if not withTotal:
+            return read(False), None
+
+        if windowed:
+            rows = read(True)
+            total = rows[0]["totalRows"] if len(rows) > 0 else None
+            for row in rows:
+                del row["totalRows"]
+        else:
+            rows = read(False)
+        if total is None: # Past the last row or after a cursor, the window has no total
+            total = count()
+
+        DatabaseTable.__storeTotal(key, total, generation)
+        return rows, total
+
+    @classmethod
+    def _readPageTotal(cls,
+                name : str,
+                filters : tuple,
+                count) -> int:
+        """
+        A protected method that returns the total number of rows matching the filters
+        of a paged read, counting them only if the total is not cached.
+        - name: The name of the paged read, part of the cache key with the table name.
+        - filters: A hashable tuple of the arguments that decide which rows match.
+        - count: A function that returns the total number of matching rows.
+        """
+        key = (cls._tableName, name, filters)
+        total, generation = DatabaseTable.__cachedTotal(key)
+        if total is None:
+            total = count()
+            DatabaseTable.__storeTotal(key, total, generation)
+        return total
+
+    @staticmethod
+    def __cachedTotal(key : tuple) -> tuple[int | None, int]:
+        """
+        Returns the cached total of a paged read, or None, with the write generation it
+        was looked up in. Reads inside a transaction are not served from the cache.
+        """
+        if DatabaseConnection.inTransaction():
+            return None, DatabaseTable.__pageTotalsGeneration
+        with DatabaseTable.__pageTotalsLock:
+            total = DatabaseTable.__pageTotals.get(key)
+            if total is not None:
+                DatabaseTable.__pageTotals.move_to_end(key)
+            return total, DatabaseTable.__pageTotalsGeneration
+
+    @staticmethod
+    def __storeTotal(key : tuple, total : int, generation : int):
+        """
+        Caches the total of a paged read, unless a write happened since the generation
+        it was counted in or it was counted inside a transaction.
+        """
+        if DatabaseConnection.inTransaction():
+            return
+        with DatabaseTable.__pageTotalsLock:
+            if generation != DatabaseTable.__pageTotalsGeneration:
+                return
+            DatabaseTable.__pageTotals[key] = total
+            if len(DatabaseTable.__pageTotals) > DatabaseTable.__pageTotalsSize:
+                DatabaseTable.__pageTotals.popitem(last = False)
+
+    @staticmethod
+    def __pageFilters(columns : list[str] | None,
+                      referred : dict[str, list[str]] | None,
+                      searchValue : str | None) -> tuple:
+        """
+        Returns the hashable filters of readPage() that its cached totals are kept under.
+        """
+        return (tuple(columns or []),
+                tuple((table, tuple(tableColumns)) for table, tableColumns in (referred or {}).items()),
+                searchValue)
+
+    @classmethod
+    def _seekClause(cls,
+                    sortColumn : str,
+                    keyColumns : list[str],
+                    order : str,
+                    after : tuple) -> tuple[str, list]:
+        """
+        A protected method that returns the condition selecting the rows that come after
+        a keyset cursor and the parameters bound to its placeholders. The rows must be
+        ordered by sortColumn and then by keyColumns, all in the same order. NULL sort
+        values come first in ascending order and last in descending order, like in MySQL.
+        - sortColumn: The qualified column the rows are sorted by.
+        - keyColumns: The qualified columns that make the order unique.
+        - order: 'ASC' or 'DESC'.
+        - after: A tuple of the sort value followed by the key values of the last row
+        of the previous page.
+        """
+        if len(after) != len(keyColumns) + 1:
+            raise ValueError("The cursor must have a sort value and one value per key column.")
+        compare = ">" if order == "ASC" else "<"
+        sortValue, keyValues = after[0], list(after[1:])
+
+        keyClause, keyParams = "", []
+        for column, value in reversed(list(zip(keyColumns, keyValues))):
+            if keyClause == "":
+                keyClause, keyParams = f"{column} {compare} %s", [value]
+            else:
+                keyClause = f"({column} {compare} %s OR ({column} = %s AND {keyClause}))"
+                keyParams = [value, value] + keyParams
+
+        if sortValue is None and order == "ASC":
+            return f"(({sortColumn} IS NULL AND {keyClause}) OR {sortColumn} IS NOT NULL)", keyParams
+        if sortValue is None:
+            return f"({sortColumn} IS NULL AND {keyClause})", keyParams
+        nullsAfter = f" OR {sortColumn} IS NULL" if order == "DESC" else ""
+        return f"({sortColumn} {compare} %s OR ({sortColumn} = %s AND {keyClause}){nullsAfter})", \
+            [sortValue, sortValue] + keyParams
+
+    @classmethod
+    @QueryCache.cached()
     def readOne(cls, id: int) -> dict[str, int | str]:
         """
         Read one data from the table. The method returns a dictionary as the result.
@@ -203,9 +470,9 @@ class DatabaseTable(ABC):
         result = {}
 
         try:
-            cursor = DatabaseConnection.getConnection().cursor(dictionary=True)
-            sql = f"SELECT * FROM {cls.getTableName()} WHERE {cls.getPrimaryKey()} = {id}"
-            cursor.execute(sql)
+            sql = f"SELECT * FROM {cls.getTableName()} WHERE {cls.getPrimaryKey()} = %s"
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, (id,))
 
             result = cursor.fetchone()
         except Exception as e:
@@ -217,15 +484,58 @@ class DatabaseTable(ABC):
         return result
     
     @classmethod
-    def create(cls, data : dict[str, str]):
+    def readMany(cls, keys : list) -> dict[any, dict[str, int | str]]:
+        """
+        Reads the rows with the given primary keys in one query. Tables with a composite
+        primary key take tuples of the key values in key order.
+        Returns a dictionary from key to row. Keys without a row are left out.
+        - keys: The primary keys of the rows to read.
+        """
+        cls.initialize()
+
+        if not isinstance(keys, list):
+            raise ValueError("Keys must be a list.")
+        keys = list(dict.fromkeys(keys))
+        if len(keys) == 0:
+            return {}
+
+        composite = isinstance(cls._primary, list)
+        result = {}
+        try:
+            if composite:
+                rowPlaceholder = "(" + ", ".join(["%s"] * len(cls._primary)) + ")"
+                keyColumns = "(" + ", ".join(cls._primary) + ")"
+                params = [value for key in keys for value in key]
+            else:
+                rowPlaceholder = "%s"
+                keyColumns = cls._primary
+                params = keys
+            sql = f"SELECT * FROM {cls._tableName} WHERE {keyColumns} IN (" + ", ".join([rowPlaceholder] * len(keys)) + ")"
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, params)
+            for row in cursor.fetchall():
+                key = tuple(row[column] for column in cls._primary) if composite else row[cls._primary]
+                result[key] = row
+        except Exception as e:
+            print(f"Error: {e}")
+            raise e
+        finally:
+            cursor.close()
+        return result
+
+    @classmethod
+    def create(cls, data : dict[str, str]) -> int:
         """
         Inserts data into the table. The data must be a dictionary where the keys
         are the column names and the values are the corresponding values to be inserted.
         The method will raise an error if the primary key is included or if the data is not a
         dictionary.
+        Returns the generated primary key of the inserted row.
         """
         cls.initialize()
 
+        result = None
+
         if not isinstance(data, dict):
             raise ValueError("Data must be a dictionary.")
         if cls._primary in data:
@@ -240,25 +550,85 @@ class DatabaseTable(ABC):
             if sorted(list(data.keys())) != sorted(columns):
                 raise ValueError(f"Data keys {data.keys()} do not match table columns {cls._columns}.")
         
-            cursor = DatabaseConnection.getConnection().cursor()
             columnsClause = ', '.join(data.keys())
             values = []
-            for data in data.values():
-                if isinstance(data, str):
-                    data = f"'{data}'"
-                elif isinstance(data, int):
-                    data = str(data)
-                else:
-                    raise ValueError(f"Unsupported data type: {type(data)}")
-                values.append(data)
-            values = ', '.join(values)
-            sql = f"INSERT INTO {cls._tableName} ({columnsClause}) VALUES ({values})"
-            cursor.execute(sql)
+            for value in data.values():
+                if not isinstance(value, (str, int)):
+                    raise ValueError(f"Unsupported data type: {type(value)}")
+                values.append(value)
+            placeholders = ', '.join(['%s'] * len(values))
+            sql = f"INSERT INTO {cls._tableName} ({columnsClause}) VALUES ({placeholders})"
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, values)
+            result = cursor.lastrowid
         except Exception as e:
             print(f"Error: {e}")
             raise e
         finally:
             cursor.close()
+        cls._notifyWrite([result])
+        return result
+
+    @classmethod
+    def createMany(cls,
+                rows : list[dict[str, str | int]],
+                batchSize : int = 500) -> tuple[list[int], int]:
+        """
+        Inserts many rows into the table using multi-row INSERT statements of at most
+        batchSize rows each. All the batches run in one transaction, so either every row
+        is inserted or none of them is. Every row must have the same columns, following
+        the same rules as create().
+        Returns the generated primary keys of the inserted rows, in the order of the rows,
+        and the number of inserted rows. Tables without a generated key return no keys.
+        The keys are derived from the first generated key of each batch, which relies on
+        InnoDB handing out consecutive values to a single multi-row INSERT.
+        - rows: A list of dictionaries containing the data to be inserted into the table.
+        - batchSize: An integer indicating the maximum number of rows per INSERT statement.
+        """
+        cls.initialize()
+
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise ValueError("Rows must be a list of dictionaries.")
+        if not isinstance(batchSize, int) or batchSize < 1:
+            raise ValueError("batchSize must be a positive integer.")
+        if len(rows) == 0:
+            return [], 0
+
+        generatedKey = not isinstance(cls._primary, list)
+        columns = [column for column in cls._columns if not generatedKey or column != cls._primary]
+        rowColumns = list(rows[0].keys())
+        if sorted(rowColumns) != sorted(columns):
+            raise ValueError(f"Data keys {rowColumns} do not match table columns {cls._columns}.")
+        for row in rows:
+            if sorted(row.keys()) != sorted(rowColumns):
+                raise ValueError("All rows must have the same columns.")
+            for value in row.values():
+                if not isinstance(value, (str, int)):
+                    raise ValueError(f"Unsupported data type: {type(value)}")
+
+        # MySQL allows at most 65535 placeholders in a prepared statement
+        batchSize = min(batchSize, 65535 // len(rowColumns))
+
+        ids = []
+        total = 0
+        try:
+            with DatabaseConnection.transaction():
+                columnsClause = ', '.join(rowColumns)
+                rowPlaceholders = '(' + ', '.join(['%s'] * len(rowColumns)) + ')'
+                for start in range(0, len(rows), batchSize):
+                    batch = rows[start:start + batchSize]
+                    sql = f"INSERT INTO {cls._tableName} ({columnsClause}) VALUES " + ', '.join([rowPlaceholders] * len(batch))
+                    cursor = DatabaseConnection.getCursor(sql)
+                    cursor.execute(sql, [row[column] for row in batch for column in rowColumns])
+                    total += cursor.rowcount
+                    if generatedKey and cursor.lastrowid:
+                        ids += list(range(cursor.lastrowid, cursor.lastrowid + len(batch)))
+                    cursor.close()
+        except Exception as e:
+            print(f"Error: {e}")
+            raise e
+        cls._notifyWrite(ids if generatedKey else [tuple(row[column] for column in cls._primary) for row in rows])
+        return ids, total
     
     @classmethod
     def delete(cls, keys : list[int]):
@@ -276,15 +646,16 @@ class DatabaseTable(ABC):
                 raise ValueError("Keys must be a list of integers.")
         
         try:
-            cursor = DatabaseConnection.getConnection().cursor()
-            keysClause = ', '.join([str(key) for key in keys])
+            keysClause = ', '.join(['%s'] * len(keys))
             sql = f"DELETE FROM {cls._tableName} WHERE {cls._primary} IN ({keysClause})"
-            cursor.execute(sql)
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, keys)
         except Exception as e:
             print(f"Error: {e}")
             raise e
         finally:
             cursor.close()
+        cls._notifyWrite(keys)
 
     @classmethod
     def update(cls, key : int, data : dict[str, str]):
@@ -309,16 +680,17 @@ class DatabaseTable(ABC):
                 raise ValueError(f"Primary key {k} cannot be updated.") 
         
         try:
-            cursor = DatabaseConnection.getConnection().cursor()
-            set_clause = ', '.join([f"{k} = '{v}'" for k, v in data.items()])
-            sql = f"UPDATE {cls._tableName} SET {set_clause} WHERE {cls._primary} = {key}"
-            cursor.execute(sql)
+            set_clause = ', '.join([f"{k} = %s" for k in data.keys()])
+            sql = f"UPDATE {cls._tableName} SET {set_clause} WHERE {cls._primary} = %s"
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, list(data.values()) + [key])
         
         except Exception as e:
             print(f"Error: {e}")
             raise e
         finally:
             cursor.close()
+        cls._notifyWrite([key])
     
     @classmethod
     @abstractmethod
@@ -364,6 +736,9 @@ class DatabaseTable(ABC):
             if len(referred[table]) == 0:
                 raise ValueError(f"referredColumns for table '{table}' must not be empty.")   
             
+        # Searches over all the columns of an indexed table can use the search index
+        searchAll = len(columns) == 0 and not referred
+
         # Check if columns is empty, if so, use all columns
         if len(columns) == 0:
             columns += cls._columns
@@ -377,6 +752,7 @@ class DatabaseTable(ABC):
         
         try:
             searchClause = ""
+            params = []
             
             if referred: # Check if referred is not empty
                 for table, tableColumns in referred.items():
@@ -388,7 +764,8 @@ class DatabaseTable(ABC):
                                               for table in referred.keys()])
                 
             if searchValue is not None:
-                allcolumns = "(" + " OR ".join([column + " REGEXP \'" + searchValue + "\'" for column in columns]) + ")"
+                allcolumns, searchParams = cls.__searchCondition(columns, searchValue, searchAll)
+                params += searchParams
                 if searchClause == "":
                     searchClause = "WHERE "
                 else:
@@ -397,9 +774,10 @@ class DatabaseTable(ABC):
             
             tableNames = ", ".join([cls.referredTables[table].getTableName() for table in referred.keys()] + [cls._tableName])
 
-            cursor = DatabaseConnection.getConnection().cursor(dictionary = True)
-            sql = f"SELECT COUNT(*) AS total FROM {tableNames} {searchClause};"
-            cursor.execute(sql)
+            hint = DatabaseConnection.searchTimeoutHint() if searchValue is not None else ""
+            sql = f"SELECT {hint}COUNT(*) AS total FROM {tableNames} {searchClause}"
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, params)
             total = cursor.fetchone()['total']
             if total is None:
                 total = 0
@@ -421,8 +799,8 @@ class DatabaseTable(ABC):
         
         result = 0
         try:
-            cursor = DatabaseConnection.getConnection().cursor(dictionary = True)
             sql = f"SELECT MAX({cls._primary}) AS lastID FROM {cls._tableName}"
+            cursor = DatabaseConnection.getCursor(sql)
             cursor.execute(sql)
             result = cursor.fetchone()['lastID']
             result = 0 if result is None else result
@@ -433,24 +811,25 @@ class DatabaseTable(ABC):
             cursor.close()
         return result
 
-    def _readColumns(cls) -> list[str]:
+    @classmethod
+    def __searchCondition(cls,
+                        columns : list[str],
+                        searchValue : str,
+                        searchAll : bool) -> tuple[str, list[str]]:
         """
-        A protected method that returns a list of column names in the table.
-        It uses the information_schema.COLUMNS table to get the column names.
-        This method should only be called when the table is initialized. Use
-        getColumns() method to get the column names of the table.
+        Returns the condition matching the search and the parameters bound to it. A search
+        over all the columns of an indexed table uses the search index, any other search
+        matches each column with REGEXP.
         """
-        columns = []
-        try:
-            cursor = DatabaseConnection.getConnection().cursor(dictionary = True)
-            sql = f"SELECT COLUMN_NAME FROM information_schema.COLUMNS WHERE TABLE_NAME = '{cls._tableName}' AND TABLE_SCHEMA = DATABASE()"
-            cursor.execute(sql)
-            columns = cursor.fetchall()
-            columns = [row['COLUMN_NAME'] for row in columns]
-        except Exception as e:
-            print(f"Error: {e}")
-            raise e
-        finally:
-            cursor.close()
-        return columns
+        condition = SearchIndex.searchCondition(cls._tableName, f"{cls._tableName}.{cls._primary}", searchValue) \
+            if searchAll else None
+        if condition is not None:
+            return condition[0], condition[1]
+        return "(" + " OR ".join([column + " REGEXP %s" for column in columns]) + ")", [searchValue] * len(columns)
 
+DatabaseTable.addWriteListener(SearchIndex.onWrite)
+# Refreshed before the cache is invalidated, so no read caches the old sharing
+DatabaseTable.addWriteListener(UtilitySharing.onWrite)
+DatabaseTable.addWriteListener(QueryCache.onWrite)
+DatabaseTable.addWriteListener(BillRollup.onWrite)
+DatabaseConnection.addTransactionListener(DatabaseTable._onTransactionEnd)
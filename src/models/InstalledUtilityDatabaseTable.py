@@ -1,5 +1,8 @@
 from .DatabaseTable import DatabaseTable
 from .DatabaseConnection import DatabaseConnection
+from .SearchIndex import SearchIndex
+from .QueryCache import QueryCache
+from .UtilitySharing import UtilitySharing
 from .UnitDatabaseTable import UnitDatabaseTable
 from .UtilityDatabaseTable import UtilityDatabaseTable
 
@@ -20,56 +23,21 @@ class InstalledUtilityDatabaseTable(DatabaseTable):
     """
 
     _tableName = "installedutility"
-    referredTables = {UnitDatabaseTable.getTableName() : UnitDatabaseTable, 
-                    UtilityDatabaseTable.getTableName() : UtilityDatabaseTable}
-
-    @classmethod
-    def initialize(cls):
-        """
-        Initializes the table by creating it if it does not exist and reading the columns.
-        This method can be called to ensure that the table is ready for use but it is not
-        necessarily required to be called before using the class methods. The class methods
-        will automatically call this method if the table is not initialized.
-
-        This class will also initialize the UnitDatabaseTable and UtilityDatabaseTable classes
-        to ensure that the foreign key references are valid.
-        """
-        UnitDatabaseTable.initialize()
-        UtilityDatabaseTable.initialize()
-        try:
-            cursor = DatabaseConnection.getConnection().cursor(dictionary = True)
-            if not cls._initialized:
-                cls._initialized = True
-                cls._createTable()
-                cursor.execute("SELECT COLUMN_NAME FROM information_schema.KEY_COLUMN_USAGE " +
-                            f"WHERE TABLE_NAME = '{cls._tableName}' AND CONSTRAINT_NAME = " +
-                            "'PRIMARY' AND TABLE_SCHEMA = DATABASE()")
-                cls._primary = [row['COLUMN_NAME'] for row in cursor.fetchall()]
-                cls._columns = cls._readColumns(cls)
-        except Exception as e:
-            print(f"Error: {e}")
-            raise e
-        finally:
-            cursor.close()
-
-    @classmethod
-    def _createTable(cls):
-        try:
-            cursor = DatabaseConnection.getConnection().cursor()
-            cursor.execute("CREATE TABLE IF NOT EXISTS installedutility ( " +
-                "UnitID int NOT NULL, " +
-                "UtilityID int NOT NULL, " +
-                "InstallationDate date NOT NULL, " +
-                "PRIMARY KEY (UnitID,UtilityID), " +
-                "KEY UtilityID (UtilityID), " +
-                "CONSTRAINT installedutility_ibfk_1 FOREIGN KEY (UnitID) REFERENCES unit (UnitID) ON DELETE CASCADE ON UPDATE CASCADE, " +
-                "CONSTRAINT installedutility_ibfk_2 FOREIGN KEY (UtilityID) REFERENCES utility (UtilityID) ON DELETE CASCADE ON UPDATE CASCADE)"
-            )
-        except Exception as e:
-            print(f"Error: {e}")
-            raise e
-        finally:
-            cursor.close()
+    referredTables = {UnitDatabaseTable._tableName : UnitDatabaseTable, 
+                    UtilityDatabaseTable._tableName : UtilityDatabaseTable}
+
+    # Columns of the utilities listing that can be sorted by and the column they sort on
+    __sortColumns = {"UtilityID": "u.UtilityID", "Type": "u.Type", "Name": "unit.Name",
+                    "Status": "u.Status", "BillingCycle": "u.BillingCycle"}
+
+    _createTableSQL = ("CREATE TABLE IF NOT EXISTS installedutility ( " +
+        "UnitID int NOT NULL, " +
+        "UtilityID int NOT NULL, " +
+        "InstallationDate date NOT NULL, " +
+        "PRIMARY KEY (UnitID,UtilityID), " +
+        "KEY UtilityID (UtilityID), " +
+        "CONSTRAINT installedutility_ibfk_1 FOREIGN KEY (UnitID) REFERENCES unit (UnitID) ON DELETE CASCADE ON UPDATE CASCADE, " +
+        "CONSTRAINT installedutility_ibfk_2 FOREIGN KEY (UtilityID) REFERENCES utility (UtilityID) ON DELETE CASCADE ON UPDATE CASCADE)")
 
     @classmethod
     def getPrimaryKey(cls) -> list[str]:
@@ -87,7 +55,9 @@ class InstalledUtilityDatabaseTable(DatabaseTable):
             sortBy : str = None, 
             order : str = "ASC",
             page : int = 1, 
-            limit : int = 50
+            limit : int = 50,
+            after : tuple = None,
+            withTotal : bool = False
             ) -> list[dict[str, any]]:
         """
         Reads data from the table. The method accepts various parameters to filter,
@@ -99,6 +69,10 @@ class InstalledUtilityDatabaseTable(DatabaseTable):
         - order: A string indicating the order of sorting ('ASC' or 'DESC').
         - page: An integer indicating the page number for pagination.
         - limit: An integer indicating the number of records per page.
+        - after: A tuple of the sort value, UnitID and UtilityID of the last row of the
+        previous page. If given, the page continues after that row instead of using page.
+        - withTotal: If True, each row also has the number of rows matching the filters
+        in totalRows. The count ignores after, so it is only complete without a cursor.
         The method returns a list of dictionaries where each dictionary represents a row
         """
 
@@ -148,6 +122,7 @@ class InstalledUtilityDatabaseTable(DatabaseTable):
         try:
 
             searchClause = ""
+            params = []
 
             if referred: # Check if referred is not empty
                 for table, tableColumns in referred.items():
@@ -159,7 +134,8 @@ class InstalledUtilityDatabaseTable(DatabaseTable):
                                             for table in referred.keys()])
 
             if searchValue is not None: # Check if searchValue is not empty
-                allcolumns = "(" + " OR ".join([column + " REGEXP \'" + searchValue + "\'" for column in columns]) + ")"
+                allcolumns = "(" + " OR ".join([column + " REGEXP %s" for column in columns]) + ")"
+                params += [searchValue] * len(columns)
                 if searchClause == "":
                     searchClause = "WHERE "
                 else:
@@ -182,15 +158,22 @@ class InstalledUtilityDatabaseTable(DatabaseTable):
 
             if order not in ["ASC", "DESC"]:
                 raise ValueError("order must be 'ASC' or 'DESC'.")
+
+            primaryKeys = [f"{cls._tableName}.{key}" for key in cls._primary]
+            offset = (page - 1) * limit
+            if after is not None:
+                seekClause, seekParams = cls._seekClause(sortBy, primaryKeys, order, after)
+                searchClause += (" AND " if searchClause != "" else "WHERE ") + seekClause
+                params += seekParams
+                offset = 0
             
-            selectClause = ', '.join(columns)
+            selectClause = ', '.join(columns) + (", COUNT(*) OVER() AS totalRows" if withTotal else "")
             tableNames = ", ".join([cls.referredTables[table].getTableName() for table in referred.keys()] + [cls._tableName])
             
-            cursor = DatabaseConnection.getConnection().cursor(dictionary = True)
-            offset = (page - 1) * limit
-            sql = f"SELECT {selectClause} FROM {tableNames} {searchClause} ORDER BY {sortBy} {order} LIMIT {limit} OFFSET {offset}; "
-            print(sql)
-            cursor.execute(sql)
+            orderClause = ", ".join([f"{column} {order}" for column in [sortBy] + primaryKeys])
+            sql = f"SELECT {selectClause} FROM {tableNames} {searchClause} ORDER BY {orderClause} LIMIT %s OFFSET %s"
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, params + [limit, offset])
             result = cursor.fetchall()
         except Exception as e:
             print(f"Error: {e}")
@@ -218,25 +201,22 @@ class InstalledUtilityDatabaseTable(DatabaseTable):
         if sorted(list(data.keys())) != sorted(cls._columns):
             raise ValueError(f"Data keys {data.keys()} do not match table columns {cls._columns}.")
         try:
-            cursor = DatabaseConnection.getConnection().cursor()
             columnsClause = ', '.join(data.keys())
             values = []
-            for data in data.values():
-                if isinstance(data, str):
-                    data = f"'{data}'"
-                elif isinstance(data, int):
-                    data = str(data)
-                else:
-                    raise ValueError(f"Unsupported data type: {type(data)}")
-                values.append(data)
-            values = ', '.join(values)
-            sql = f"INSERT INTO {cls._tableName} ({columnsClause}) VALUES ({values})"
-            cursor.execute(sql)
+            for value in data.values():
+                if not isinstance(value, (str, int)):
+                    raise ValueError(f"Unsupported data type: {type(value)}")
+                values.append(value)
+            placeholders = ', '.join(['%s'] * len(values))
+            sql = f"INSERT INTO {cls._tableName} ({columnsClause}) VALUES ({placeholders})"
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, values)
         except Exception as e:
             print(f"Error: {e}")
             raise e
         finally:
             cursor.close()
+        cls._notifyWrite([(data[cls._primary[0]], data[cls._primary[1]])])
 
     @classmethod
     def delete(cls, keys : list[int]):
@@ -255,14 +235,15 @@ class InstalledUtilityDatabaseTable(DatabaseTable):
         if keys[0] < 0 or keys[1] < 0:
             raise ValueError("Keys must be positive integers.")
         try:
-            cursor = DatabaseConnection.getConnection().cursor()
-            sql = f"DELETE FROM {cls._tableName} WHERE {cls._primary[0]} = {keys[0]} AND {cls._primary[1]} = {keys[1]}"
-            cursor.execute(sql)
+            sql = f"DELETE FROM {cls._tableName} WHERE {cls._primary[0]} = %s AND {cls._primary[1]} = %s"
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, keys)
         except Exception as e:
             print(f"Error: {e}")
             raise e
         finally:
             cursor.close()
+        cls._notifyWrite([tuple(keys)])
     
     @classmethod
     def update(cls,
@@ -296,16 +277,17 @@ class InstalledUtilityDatabaseTable(DatabaseTable):
             if column == cls._primary[1]:
                 raise ValueError(f"Cannot update primary key {cls._primary[1]}.")
         try:
-            cursor = DatabaseConnection.getConnection().cursor()
             sql = f"UPDATE {cls._tableName} SET "
-            sql += ", ".join([f"{column} = '{value}'" for column, value in data.items()])
-            sql += f" WHERE {cls._primary[0]} = {keys[0]} AND {cls._primary[1]} = {keys[1]}"
-            cursor.execute(sql)
+            sql += ", ".join([f"{column} = %s" for column in data.keys()])
+            sql += f" WHERE {cls._primary[0]} = %s AND {cls._primary[1]} = %s"
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, list(data.values()) + keys)
         except Exception as e:
             print(f"Error: {e}")
             raise e
         finally:
             cursor.close()
+        cls._notifyWrite([tuple(keys)])
         
     @classmethod
     def batchUpdate(cls, 
@@ -336,19 +318,21 @@ class InstalledUtilityDatabaseTable(DatabaseTable):
             if column == cls._primary[1]:
                 raise ValueError(f"Cannot update primary key {cls._primary[1]}.")
         try:
-            cursor = DatabaseConnection.getConnection().cursor()
             sql = f"UPDATE {cls._tableName} SET "
-            sql += ", ".join([f"{column} = '{value}'" for column, value in data.items()])
-            sql += " WHERE " + " AND ".join([f"{cls._primary[0]} = {key[0]} AND {cls._primary[1]} = {key[1]}" for key in keys])
-            cursor.execute(sql)
+            sql += ", ".join([f"{column} = %s" for column in data.keys()])
+            sql += " WHERE " + " OR ".join([f"({cls._primary[0]} = %s AND {cls._primary[1]} = %s)" for _ in keys])
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, list(data.values()) + [value for key in keys for value in key])
         except Exception as e:
             print(f"Error: {e}")
             raise e
         finally:
             cursor.close()
+        cls._notifyWrite(keys)
         return 
     
     @classmethod
+    @QueryCache.cached(_tableName)
     def readOne(cls, id : list[int]) -> dict[str, str]:
         """
         Reads a single row from the table with the given primary keys.
@@ -368,9 +352,9 @@ class InstalledUtilityDatabaseTable(DatabaseTable):
         result = None
 
         try:
-            cursor = DatabaseConnection.getConnection().cursor(dictionary = True)
-            sql = f"SELECT * FROM {cls._tableName} WHERE {cls._primary[0]} = {id[0]} AND {cls._primary[1]} = {id[1]}"
-            cursor.execute(sql)
+            sql = f"SELECT * FROM {cls._tableName} WHERE {cls._primary[0]} = %s AND {cls._primary[1]} = %s"
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, id)
             result = cursor.fetchone()
         except Exception as e:
             print(f"Error: {e}")
@@ -390,6 +374,8 @@ class InstalledUtilityDatabaseTable(DatabaseTable):
             page : int = 1, 
             limit : int = 50,
             nullSearch : bool = False,
+            after : tuple = None,
+            withTotal : bool = False
             ) -> list[dict[str, any]]:
 
         """
@@ -402,6 +388,12 @@ class InstalledUtilityDatabaseTable(DatabaseTable):
         - order: A string indicating the order of sorting ('ASC' or 'DESC').
         - page: An integer indicating the page number for pagination.
         - limit: An integer indicating the number of records per page.
+        - after: A tuple of the sort value, UtilityID and UnitID of the last row of the
+        previous page. If given, the page continues after that row instead of using page.
+        - withTotal: If True, each row also has the number of rows matching the search
+        in totalRows. The count ignores after, so it is only complete without a cursor.
+        Each row also has the UnitID of the listed unit, which is None for utilities
+        that are not installed in any unit.
         """
         cls.initialize()
 
@@ -411,28 +403,39 @@ class InstalledUtilityDatabaseTable(DatabaseTable):
             raise ValueError("sortBy must be a string.")
         if not isinstance(order, str):
             raise ValueError("order must be a string.")
+        if sortBy not in cls.__sortColumns:
+            raise ValueError(f"Column '{sortBy}' cannot be sorted.")
+        if order.upper() not in ["ASC", "DESC"]:
+            raise ValueError("order must be 'ASC' or 'DESC'.")
+        order = order.upper()
         
         result = None
 
         try:
-            cursor = DatabaseConnection.getConnection().cursor(dictionary = True)
             offset = (page - 1) * limit
-            sql = """
-                SELECT u.UtilityID, u.Type, unit.Name, u.Status, u.BillingCycle FROM utility u 
+            sortColumn = cls.__sortColumns[sortBy]
+            keyColumns = ["u.UtilityID", "COALESCE(installedutility.UnitID, 0)"]
+            searchClause, params = cls.__searchClause(searchValue, nullSearch)
+            totalColumn = ", COUNT(*) OVER() AS totalRows" if withTotal else ""
+            hint = DatabaseConnection.searchTimeoutHint() if searchClause != "" else ""
+            sql = f"""
+                SELECT {hint}u.UtilityID, u.Type, unit.Name, u.Status, u.BillingCycle, installedutility.UnitID{totalColumn} FROM utility u 
                 LEFT JOIN installedutility ON installedutility.UtilityID = u.UtilityID LEFT JOIN unit ON installedutility.UnitID = unit.UnitID
+                LEFT JOIN {UtilitySharing.getTableName()} sharing ON sharing.UtilityID = u.UtilityID
                 WHERE ((unit.Type = 'Shared') 
-                OR ((SELECT COUNT(*) FROM (SELECT * FROM installedutility iu WHERE iu.UtilityID = u.UtilityID) AS c) <= 1 AND unit.Type = 'Individual')
+                OR (sharing.UnitCount <= 1 AND unit.Type = 'Individual')
                 OR (unit.NAME IS NULL))
                 """
-            if searchValue is not None:
-                sql += f"AND (u.Type REGEXP \'{searchValue}\' OR Name REGEXP \'{searchValue}\' "
-                sql += f"OR Status REGEXP \'{searchValue}\' OR BillingCycle REGEXP \'{searchValue}\' "
-                sql += f"OR u.UtilityID REGEXP \'{searchValue}\' "
-                if nullSearch:
-                    sql += f"OR Name IS NULL "
-                sql += ") "
-            sql += f"ORDER BY {sortBy} {order} LIMIT {limit} OFFSET {offset};"
-            cursor.execute(sql)
+            sql += searchClause
+            if after is not None:
+                seekClause, seekParams = cls._seekClause(sortColumn, keyColumns, order, 
+                                                        (after[0], after[1], after[2] or 0))
+                sql += f"AND {seekClause} "
+                params += seekParams
+                offset = 0
+            sql += "ORDER BY " + ", ".join([f"{column} {order}" for column in [sortColumn] + keyColumns]) + " LIMIT %s OFFSET %s"
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, params + [limit, offset])
             result = cursor.fetchall()
         
         except Exception as e:
@@ -442,6 +445,41 @@ class InstalledUtilityDatabaseTable(DatabaseTable):
             cursor.close()
         return result
 
+    @classmethod
+    def uniqueReadPage(cls,
+            searchValue : str,
+            sortBy : str,
+            order : str,
+            page : int = 1,
+            limit : int = 50,
+            nullSearch : bool = False,
+            after : tuple = None,
+            withTotal : bool = True
+            ) -> tuple[list[dict[str, any]], int | None]:
+        """
+        Reads a page of the utilities listing like uniqueRead() and also returns the
+        total number of rows matching the search, from the same statement. The total is
+        cached per search, so changing only the sort order or the page reads the rows alone.
+        The parameters are the same as uniqueRead(), and:
+        - withTotal: If False, the rows are read alone and the total is None unless it
+        is cached. uniqueReadPageTotal() reads it afterwards.
+        """
+        return cls._readPage("uniqueRead", (searchValue, nullSearch),
+            lambda withTotal : cls.uniqueRead(searchValue, sortBy, order, page, limit, nullSearch, after, withTotal),
+            lambda : cls.uniqueTotalCount(searchValue, nullSearch),
+            after is None, withTotal)
+
+    @classmethod
+    def uniqueReadPageTotal(cls,
+        searchValue : str,
+        nullSearch : bool = False) -> int:
+        """
+        Returns the total number of rows matching the search of uniqueReadPage(), from
+        its cache if it is there. The parameters are the same as uniqueTotalCount().
+        """
+        return cls._readPageTotal("uniqueRead", (searchValue, nullSearch),
+            lambda : cls.uniqueTotalCount(searchValue, nullSearch))
+
     @classmethod
     def uniqueTotalCount(cls,
         searchValue : str,
@@ -455,23 +493,20 @@ class InstalledUtilityDatabaseTable(DatabaseTable):
         result = 0
         
         try:
-            cursor = DatabaseConnection.getConnection().cursor(dictionary = True)
-            sql = """
-            SELECT COUNT(*) FROM utility u 
+            searchClause, params = cls.__searchClause(searchValue, nullSearch)
+            hint = DatabaseConnection.searchTimeoutHint() if searchClause != "" else ""
+            sql = f"""
+            SELECT {hint}COUNT(*) AS total FROM utility u 
             LEFT JOIN installedutility ON installedutility.UtilityID = u.UtilityID LEFT JOIN unit ON installedutility.UnitID = unit.UnitID
+            LEFT JOIN {UtilitySharing.getTableName()} sharing ON sharing.UtilityID = u.UtilityID
             WHERE ((unit.Type = 'Shared') 
-            OR ((SELECT COUNT(*) FROM (SELECT * FROM installedutility iu WHERE iu.UtilityID = u.UtilityID) AS c) <= 1 AND unit.Type = 'Individual')
+            OR (sharing.UnitCount <= 1 AND unit.Type = 'Individual')
             OR (unit.NAME IS NULL))
             """
-            if searchValue is not None:
-                sql += f"AND (u.Type REGEXP \'{searchValue}\' OR Name REGEXP \'{searchValue}\' "
-                sql += f"OR Status REGEXP \'{searchValue}\' OR BillingCycle REGEXP \'{searchValue}\' "
-                sql += f"OR u.UtilityID REGEXP \'{searchValue}\' "
-                if nullSearch:
-                    sql += f"OR Name IS NULL "
-                sql += ") "
-            cursor.execute(sql)
-            result = cursor.fetchone()["COUNT(*)"]
+            sql += searchClause
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, params)
+            result = cursor.fetchone()["total"]
         except Exception as e:
             print(f"Error: {e}")
             raise e
@@ -480,6 +515,7 @@ class InstalledUtilityDatabaseTable(DatabaseTable):
         return result
 
     @classmethod
+    @QueryCache.cached(_tableName, UtilityDatabaseTable._tableName)
     def getUnitUtilities(
         cls,
         unit : int,
@@ -500,13 +536,13 @@ class InstalledUtilityDatabaseTable(DatabaseTable):
         result = None
 
         try:
-            cursor = DatabaseConnection.getConnection().cursor(dictionary = True)
             ifTypeText = f"SELECT UtilityID, Utility.Type FROM {cls.getTableName()} " + \
                 f"JOIN {UtilityDatabaseTable.getTableName()} USING (UtilityID)"
             defaultText = f"SELECT UtilityID FROM {cls.getTableName()}"
             sql = ifTypeText if type else defaultText
-            sql += f" WHERE UnitID = {unit}"
-            cursor.execute(sql)
+            sql += " WHERE UnitID = %s"
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, (unit,))
             if not type:
                 result = [row["UtilityID"] for row in cursor.fetchall()]
             else:
@@ -525,6 +561,7 @@ class InstalledUtilityDatabaseTable(DatabaseTable):
         return result
 
     @classmethod
+    @QueryCache.cached(_tableName, UnitDatabaseTable._tableName)
     def getUtilityUnits(cls,
                         utility : int) -> list[dict[str, str]]:
         """
@@ -539,11 +576,11 @@ class InstalledUtilityDatabaseTable(DatabaseTable):
         result = None
 
         try:
-            cursor = DatabaseConnection.getConnection().cursor(dictionary = True)
             sql = f"SELECT installedutility.UnitID, unit.Name FROM {cls.getTableName()} " + \
                 f"NATURAL JOIN {UnitDatabaseTable.getTableName()} " + \
-                f"WHERE UtilityID = {utility}"
-            cursor.execute(sql)
+                f"WHERE UtilityID = %s"
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, (utility,))
             result = cursor.fetchall()
         except Exception as e:
             print(f"Error: {e}")
@@ -553,6 +590,7 @@ class InstalledUtilityDatabaseTable(DatabaseTable):
         return result
     
     @classmethod
+    @QueryCache.cached(_tableName, UnitDatabaseTable._tableName)
     def isUtilityShared(cls,
                         utility : int) -> bool:
         """
@@ -567,11 +605,11 @@ class InstalledUtilityDatabaseTable(DatabaseTable):
         result = None
 
         try:
-            cursor = DatabaseConnection.getConnection().cursor(dictionary = True)
-            sql = f"SELECT Count(*) as UnitCount FROM {cls.getTableName()} NATURAL JOIN {UnitDatabaseTable.getTableName()} " + \
-                f"WHERE UtilityID = {utility} AND {UnitDatabaseTable.getTableName()}.Type='Shared' "
-            cursor.execute(sql)
-            result = cursor.fetchone()["UnitCount"] > 0
+            sql = f"SELECT SharedCount FROM {UtilitySharing.getTableName()} WHERE UtilityID = %s"
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, (utility,))
+            sqlRes = cursor.fetchone()
+            result = sqlRes is not None and sqlRes["SharedCount"] > 0
         except Exception as e:
             print(f"Error: {e}")
             raise e
@@ -580,11 +618,43 @@ class InstalledUtilityDatabaseTable(DatabaseTable):
         return result
     
     @classmethod
+    def areUtilitiesShared(cls,
+                        utilities : list[int]) -> dict[int, bool]:
+        """
+        Returns whether each of the given utilities is shared, with one query.
+        - utilities: The IDs of the utilities.
+        """
+        cls.initialize()
+
+        if not isinstance(utilities, list) or not all(isinstance(utility, int) for utility in utilities):
+            raise ValueError("Utilities must be a list of integers.")
+        if len(utilities) == 0:
+            return {}
+
+        result = {utility : False for utility in utilities}
+
+        try:
+            sql = f"SELECT UtilityID FROM {UtilitySharing.getTableName()} " + \
+                f"WHERE UtilityID IN (" + ", ".join(["%s"] * len(utilities)) + ") AND SharedCount > 0"
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, utilities)
+            for row in cursor.fetchall():
+                result[row["UtilityID"]] = True
+        except Exception as e:
+            print(f"Error: {e}")
+            raise e
+        finally:
+            cursor.close()
+        return result
+
+    @classmethod
+    @QueryCache.cached(_tableName, UnitDatabaseTable._tableName)
     def getMainUnit(cls,
                     utility : int,
                     name : bool = False) -> int | str:
         """
-        Returns the main unit ID or Name for the given utility ID.
+        Returns the main unit ID or Name for the given utility ID. The main unit is the
+        shared unit with the lowest ID that the utility is installed in.
         - utility: The ID of the utility.
         - name: A boolean indicating whether to return the unit name or not.
         """
@@ -596,11 +666,12 @@ class InstalledUtilityDatabaseTable(DatabaseTable):
         result = None
 
         try:
-            cursor = DatabaseConnection.getConnection().cursor(dictionary = True)
             toGet = "Name" if name else "UnitID"
-            sql = f"SELECT {toGet} FROM {cls.getTableName()} NATURAL JOIN {UnitDatabaseTable.getTableName()} " + \
-                f"WHERE UtilityID = {utility} AND {UnitDatabaseTable.getTableName()}.Type='Shared' "
-            cursor.execute(sql)
+            sql = f"SELECT unit.{toGet} FROM {UtilitySharing.getTableName()} sharing " + \
+                f"JOIN {UnitDatabaseTable.getTableName()} unit ON unit.UnitID = sharing.MainUnitID " + \
+                f"WHERE sharing.UtilityID = %s"
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, (utility,))
             sqlRes = cursor.fetchone()
             result = sqlRes[toGet] if sqlRes else None
         except Exception as e:
@@ -611,6 +682,7 @@ class InstalledUtilityDatabaseTable(DatabaseTable):
         return result
     
     @classmethod
+    @QueryCache.cached(_tableName)
     def getInstallationDates(cls,
                             utility : int) -> list[dict[str, str]]:
         """
@@ -625,10 +697,10 @@ class InstalledUtilityDatabaseTable(DatabaseTable):
         result = None
 
         try:
-            cursor = DatabaseConnection.getConnection().cursor(dictionary = True)
             sql = f"SELECT UnitID, InstallationDate FROM {cls.getTableName()} " + \
-                  f"WHERE UtilityID = {utility}"
-            cursor.execute(sql)
+                  f"WHERE UtilityID = %s"
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, (utility,))
             result = cursor.fetchall()
         except Exception as e:
             print(f"Error: {e}")
@@ -638,6 +710,7 @@ class InstalledUtilityDatabaseTable(DatabaseTable):
         return result
     
     @classmethod
+    @QueryCache.cached(_tableName, UtilityDatabaseTable._tableName)
     def unitHasUtilityType(cls,
                             unit : int,
                             utilityType : str) -> bool:
@@ -654,10 +727,10 @@ class InstalledUtilityDatabaseTable(DatabaseTable):
         result = None
 
         try:
-            cursor = DatabaseConnection.getConnection().cursor(dictionary = True)
             sql = f"SELECT Count(*) as UnitCount FROM {cls.getTableName()} NATURAL JOIN {UtilityDatabaseTable.getTableName()} " + \
-                f"WHERE UnitID = {unit} AND Utility.Type='{utilityType}' "
-            cursor.execute(sql)
+                f"WHERE UnitID = %s AND Utility.Type = %s"
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, (unit, utilityType))
             result = cursor.fetchone()["UnitCount"] > 0
         except Exception as e:
             print(f"Error: {e}")
@@ -665,3 +738,67 @@ class InstalledUtilityDatabaseTable(DatabaseTable):
         finally:
             cursor.close()
         return result
+
+    @classmethod
+    def unitsHaveUtilityType(cls,
+                            units : list[int],
+                            utilityType : str) -> dict[int, bool]:
+        """
+        Returns whether each of the given units has the given utility type, with one query.
+        - units: The IDs of the units.
+        - utilityType: The type of the utility.
+        """
+        cls.initialize()
+
+        if not isinstance(units, list) or not all(isinstance(unit, int) for unit in units):
+            raise ValueError("Units must be a list of integers.")
+        if len(units) == 0:
+            return {}
+
+        result = {unit : False for unit in units}
+
+        try:
+            sql = f"SELECT DISTINCT UnitID FROM {cls.getTableName()} NATURAL JOIN {UtilityDatabaseTable.getTableName()} " + \
+                f"WHERE UnitID IN (" + ", ".join(["%s"] * len(units)) + ") AND Utility.Type = %s"
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, units + [utilityType])
+            for row in cursor.fetchall():
+                result[row["UnitID"]] = True
+        except Exception as e:
+            print(f"Error: {e}")
+            raise e
+        finally:
+            cursor.close()
+        return result
+
+    #Helper methods
+
+    @classmethod
+    def __searchClause(cls,
+                    searchValue : str,
+                    nullSearch : bool) -> tuple[str, list[str]]:
+        """
+        Helper method that returns the search clause of the utilities listing and the
+        parameters bound to its placeholders.
+        - searchValue: The text searched for in the displayed columns. Plain text is looked
+        up in the search index of the utilities, patterns are matched with REGEXP. Only the
+        name of the unit is shown, so it is matched with REGEXP either way, as the unit
+        documents of the index also hold the address and type of the unit.
+        - nullSearch: A boolean indicating whether utilities without a unit also match.
+        """
+        if searchValue is None:
+            return "", []
+        utilityCondition = SearchIndex.searchCondition("utility", "u.UtilityID", searchValue)
+        if utilityCondition is not None:
+            clause = f"AND ({utilityCondition[0]} OR Name REGEXP %s "
+            if nullSearch:
+                clause += "OR Name IS NULL "
+            clause += ") "
+            return clause, utilityCondition[1] + [searchValue]
+        clause = "AND (u.Type REGEXP %s OR Name REGEXP %s "
+        clause += "OR Status REGEXP %s OR BillingCycle REGEXP %s "
+        clause += "OR u.UtilityID REGEXP %s "
+        if nullSearch:
+            clause += "OR Name IS NULL "
+        clause += ") "
+        return clause, [searchValue] * 5
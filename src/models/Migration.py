@@ -0,0 +1,68 @@
+from .DatabaseConnection import DatabaseConnection
+
+class Migration:
+    """
+    A versioned change to the database schema, run by the MigrationRunner.
+    A migration is made of DDL statements and a check that tells whether the change is
+    already in the database, so running a migration again never fails or repeats work.
+    - version: The position of the migration, migrations run in increasing version.
+    - description: A short description of the change.
+    - statements: The statements that make the change.
+    - isApplied: A function that returns True if the change is already in the database.
+    - table: The table the change rebuilds or scans, used to estimate its cost.
+    - columns: The columns the change reads from the table, used to estimate its cost.
+    - costNote: What the change costs, for changes that do not add an index.
+    """
+
+    def __init__(self,
+                version : int,
+                description : str,
+                statements : list[str],
+                isApplied,
+                table : str = None,
+                columns : list[str] = None,
+                costNote : str = None):
+        self.version = version
+        self.description = description
+        self.statements = statements
+        self.isApplied = isApplied
+        self.table = table
+        self.columns = [] if columns is None else columns
+        self.costNote = costNote
+
+    @staticmethod
+    def addIndex(version : int,
+                table : str,
+                name : str,
+                columns : list[str],
+                description : str) -> 'Migration':
+        """
+        Returns a migration that adds a secondary index to a table. The index is built
+        online, so the table can still be read and written while it is built.
+        - version: The version of the migration.
+        - table: The name of the table.
+        - name: The name of the index.
+        - columns: The columns of the index in key order.
+        - description: A short description of the change.
+        """
+        sql = f"ALTER TABLE {table} ADD INDEX {name} ({', '.join(columns)}), ALGORITHM=INPLACE, LOCK=NONE"
+        return Migration(version, description, [sql],
+                        lambda : Migration.indexExists(table, name), table, columns)
+
+    @staticmethod
+    def indexExists(table : str, name : str) -> bool:
+        """
+        Returns True if the table has an index with the given name.
+        """
+        try:
+            cursor = DatabaseConnection.getConnection().cursor(dictionary = True)
+            sql = "SELECT COUNT(*) AS total FROM information_schema.STATISTICS " + \
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s"
+            cursor.execute(sql, (table, name))
+            result = cursor.fetchone()["total"] > 0
+        except Exception as e:
+            print(f"Error: {e}")
+            raise e
+        finally:
+            cursor.close()
+        return result
@@ -0,0 +1,229 @@
+import argparse
+
+import mysql.connector
+
+from .DatabaseConnection import DatabaseConnection
+from .SchemaCache import SchemaCache
+from .Migration import Migration
+from .BillDatabaseTable import BillDatabaseTable
+from .InstalledUtilityDatabaseTable import InstalledUtilityDatabaseTable
+from .BillRollup import BillRollup
+
+class MigrationRunner:
+    """
+    Brings the database schema up to date by running the migrations that are newer
+    than the version recorded in the schema_version table. Every applied migration
+    is recorded with the time it was applied. The tables themselves are created by
+    the models, the migrations change them afterwards. The schema_version table is
+    registered with the SchemaCache like the tables of the models, so a startup with
+    nothing pending reads it once and takes no lock.
+    Run it from the project folder with:
+    python -m src.models.MigrationRunner [--dry-run]
+    """
+
+    _tableName = "schema_version"
+    _createTableSQL = ("CREATE TABLE IF NOT EXISTS schema_version ( " +
+        "Version int NOT NULL, " +
+        "Description varchar(255) NOT NULL, " +
+        "AppliedAt datetime NOT NULL DEFAULT CURRENT_TIMESTAMP, " +
+        "PRIMARY KEY (Version))")
+
+    # Name of the lock that keeps two instances of the application from migrating at once
+    __lockName = "utilitrack_schema_migration"
+    __lockTimeout = 60
+
+    # Approximate bytes per index key value for the column types of the tables
+    __typeSizes = {"int": 4, "bigint": 8, "date": 3, "datetime": 5, "enum": 1, "decimal": 6}
+
+    __migrations = [
+        Migration.addIndex(1, "bill", "UtilityPeriod", ["UtilityID", "BillingPeriodEnd"],
+                        "Index bills by utility and billing period end for the chart ranges"),
+        Migration.addIndex(2, "bill", "StatusDue", ["Status", "DueDate"],
+                        "Index bills by status and due date for the urgent and unpaid bills"),
+        Migration.addIndex(3, "bill", "PeriodEnd", ["BillingPeriodEnd"],
+                        "Index bills by billing period end for the dashboard ranges"),
+        Migration(4, "Keep the monthly bill rollup up to date with triggers", BillRollup.installStatements(),
+                lambda : BillRollup.isMaintained(), "bill",
+                costNote = "Creating the triggers needs no table scan, filling the rollup groups every bill once."),
+        Migration.addIndex(5, "bill", "UnitUtilityPeriod", ["UnitID", "UtilityID", "BillingPeriodEnd"],
+                        "Index bills by unit, utility and billing period end for the earliest bill of each unit utility")
+    ]
+
+    @staticmethod
+    def migrate(dryRun : bool = False) -> list[int]:
+        """
+        Runs the pending migrations in version order. Migrations whose change is already
+        in the database are only recorded. Returns the versions that were applied, or
+        that would be applied in a dry run.
+        - dryRun: If True, prints the planned statements and their estimated cost
+        without changing the database.
+        """
+        if not dryRun:
+            # The models create their tables, and this one, when they are first used
+            BillDatabaseTable.initialize()
+            InstalledUtilityDatabaseTable.initialize()
+            SchemaCache.getMetadata(MigrationRunner._tableName)
+        applied = MigrationRunner.getAppliedVersions()
+        pending = [migration for migration in sorted(MigrationRunner.__migrations, key = lambda m : m.version)
+                   if migration.version not in applied]
+
+        if dryRun:
+            for migration in pending:
+                MigrationRunner.__plan(migration)
+            if len(pending) == 0:
+                print("The schema is up to date.")
+            return [migration.version for migration in pending]
+        if len(pending) == 0:
+            return []
+
+        if not MigrationRunner.__acquireLock():
+            raise RuntimeError("Another instance is migrating the database.")
+        try:
+            # Another instance may have migrated while this one waited for the lock
+            applied = MigrationRunner.getAppliedVersions()
+            versions = []
+            for migration in pending:
+                if migration.version in applied:
+                    continue
+                if not migration.isApplied():
+                    print(f"Applying migration {migration.version}: {migration.description}")
+                    for statement in migration.statements:
+                        MigrationRunner.__execute(statement)
+                MigrationRunner.__execute("INSERT INTO schema_version (Version, Description) VALUES (%s, %s)",
+                                        (migration.version, migration.description))
+                versions.append(migration.version)
+        finally:
+            MigrationRunner.__releaseLock()
+            # The migrations may have installed the triggers of the rollup
+            BillRollup.resetMaintained()
+        return versions
+
+    @staticmethod
+    def getAppliedVersions() -> set[int]:
+        """
+        Returns the versions of the migrations recorded in the schema_version table, none
+        if the table does not exist yet.
+        """
+        result = set()
+        try:
+            cursor = DatabaseConnection.getConnection().cursor(dictionary = True)
+            cursor.execute("SELECT Version FROM schema_version")
+            result = {row["Version"] for row in cursor.fetchall()}
+        except mysql.connector.Error as e:
+            if e.errno != 1146: # ER_NO_SUCH_TABLE
+                print(f"Error: {e}")
+                raise e
+        finally:
+            cursor.close()
+        return result
+
+    @staticmethod
+    def getVersion() -> int:
+        """
+        Returns the highest applied migration version, 0 if none was applied.
+        """
+        return max(MigrationRunner.getAppliedVersions(), default = 0)
+
+    @classmethod
+    def _createTable(cls):
+        """
+        Creates the schema_version table. Called by SchemaCache with the tables of the models.
+        """
+        MigrationRunner.__execute(cls._createTableSQL)
+
+    @staticmethod
+    def __plan(migration : Migration):
+        """
+        Prints the statements of a pending migration and the estimated cost of running them.
+        """
+        print(f"-- Migration {migration.version}: {migration.description}")
+        if migration.isApplied():
+            print("-- Already in the database, it will only be recorded.")
+            return
+        for statement in migration.statements:
+            print(f"{statement};")
+        if migration.table is None:
+            print("-- Estimated cost: no table scan.")
+            return
+        rows, dataLength, keyBytes = MigrationRunner.__estimate(migration.table, migration.columns)
+        if migration.costNote is not None:
+            print(f"-- Estimated cost: {migration.costNote} It reads about {rows} rows " +
+                f"({dataLength / 1048576:.1f} MB) of {migration.table}.")
+            return
+        print(f"-- Estimated cost: reads about {rows} rows ({dataLength / 1048576:.1f} MB) of {migration.table}, " +
+            f"writes an index of about {rows * keyBytes / 1048576:.1f} MB. The table stays readable and writable.")
+
+    @staticmethod
+    def __estimate(table : str, columns : list[str]) -> tuple[int, int, int]:
+        """
+        Returns the estimated number of rows and data size of a table from its statistics,
+        and the approximate size in bytes of an index entry on the given columns.
+        """
+        try:
+            cursor = DatabaseConnection.getConnection().cursor(dictionary = True)
+            cursor.execute("SELECT TABLE_ROWS, DATA_LENGTH FROM information_schema.TABLES " +
+                        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s", (table,))
+            tableStats = cursor.fetchone() or {"TABLE_ROWS": 0, "DATA_LENGTH": 0}
+            cursor.execute("SELECT COLUMN_NAME, DATA_TYPE, CHARACTER_OCTET_LENGTH, COLUMN_KEY FROM information_schema.COLUMNS " +
+                        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s", (table,))
+            tableColumns = cursor.fetchall()
+        except Exception as e:
+            print(f"Error: {e}")
+            raise e
+        finally:
+            cursor.close()
+
+        # An index entry holds the indexed columns, the primary key and a small header
+        keyBytes = 13
+        for column in tableColumns:
+            if column["COLUMN_NAME"] in columns or column["COLUMN_KEY"] == "PRI":
+                size = column["CHARACTER_OCTET_LENGTH"] if column["CHARACTER_OCTET_LENGTH"] is not None else \
+                    MigrationRunner.__typeSizes.get(column["DATA_TYPE"], 8)
+                keyBytes += size
+        return int(tableStats["TABLE_ROWS"] or 0), int(tableStats["DATA_LENGTH"] or 0), keyBytes
+
+    @staticmethod
+    def __execute(sql : str, params : tuple = ()):
+        try:
+            cursor = DatabaseConnection.getConnection().cursor()
+            cursor.execute(sql, params)
+        except Exception as e:
+            print(f"Error: {e}")
+            raise e
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def __acquireLock() -> bool:
+        try:
+            cursor = DatabaseConnection.getConnection().cursor()
+            cursor.execute("SELECT GET_LOCK(%s, %s)", (MigrationRunner.__lockName, MigrationRunner.__lockTimeout))
+            result = cursor.fetchone()[0] == 1
+        except Exception as e:
+            print(f"Error: {e}")
+            raise e
+        finally:
+            cursor.close()
+        return result
+
+    @staticmethod
+    def __releaseLock():
+        try:
+            cursor = DatabaseConnection.getConnection().cursor()
+            cursor.execute("SELECT RELEASE_LOCK(%s)", (MigrationRunner.__lockName,))
+            cursor.fetchone()
+        except Exception as e:
+            print(f"Error: {e}")
+        finally:
+            cursor.close()
+
+SchemaCache.register(MigrationRunner)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Brings the database schema up to date.")
+    parser.add_argument("--dry-run", action = "store_true",
+                        help = "print the planned statements and their estimated cost without running them")
+    arguments = parser.parse_args()
+    versions = MigrationRunner.migrate(dryRun = arguments.dry_run)
+    if not arguments.dry_run:
+        print(f"Applied migrations: {versions}" if len(versions) > 0 else "The schema is up to date.")
@@ -0,0 +1,147 @@
+from collections import OrderedDict
+import time
+
+import mysql.connector
+
+from .QueryMonitor import QueryMonitor
+
+class PreparedCursor:
+    """
+    A server-side prepared statement that is kept open by the PreparedStatementCache.
+    It exposes the part of the cursor interface used by the models. Closing it only
+    discards the unread rows, the statement itself stays prepared on the connection
+    so it can be executed again without being re-parsed by MySQL.
+    Every execution is reported to the QueryMonitor once its rows are fetched.
+    """
+
+    def __init__(self, connection : mysql.connector.MySQLConnection, sql : str):
+        self.__connection = connection
+        self.__cursor = connection.cursor(prepared = True, dictionary = True)
+        self.sql = sql
+        self.__pending = None
+
+    def execute(self, operation : str, params : tuple | list = ()):
+        """
+        Executes the prepared statement with the given parameters. The operation must
+        be the statement the cursor was prepared for. The stored statement is executed
+        instead of the operation, since the connector only reuses a prepared statement
+        when it is given the very string object it was prepared from.
+        """
+        if operation != self.sql:
+            raise ValueError("A prepared cursor can only execute the statement it was prepared for.")
+        self.__drain()
+        if not QueryMonitor.isEnabled():
+            self.__cursor.execute(self.sql, tuple(params))
+            return
+        model, controller = QueryMonitor.caller()
+        start = time.perf_counter()
+        self.__cursor.execute(self.sql, tuple(params))
+        duration = time.perf_counter() - start
+        if self.__connection.unread_result:
+            self.__pending = (duration, model, controller)
+        else:
+            QueryMonitor.record(self.sql, duration, max(self.__cursor.rowcount, 0), 0, model, controller)
+
+    def fetchone(self) -> dict[str, any] | None:
+        """
+        Returns the first row of the result and discards the rest.
+        """
+        rows = self.fetchall()
+        return rows[0] if len(rows) > 0 else None
+
+    def fetchall(self) -> list[dict[str, any]]:
+        """
+        Returns all the rows of the result.
+        """
+        start = time.perf_counter()
+        rows = self.__cursor.fetchall()
+        self.__recordFetch(rows, time.perf_counter() - start)
+        return rows
+
+    @property
+    def rowcount(self) -> int:
+        return self.__cursor.rowcount
+
+    @property
+    def lastrowid(self) -> int:
+        return self.__cursor.lastrowid
+
+    def close(self):
+        """
+        Discards the unread rows of the last execution. The statement stays prepared.
+        """
+        self.__drain()
+
+    def deallocate(self):
+        """
+        Closes the underlying cursor, which deallocates the statement on the server.
+        """
+        try:
+            self.__drain()
+            self.__cursor.close()
+        except Exception:
+            pass
+
+    def __drain(self):
+        if self.__connection.unread_result:
+            start = time.perf_counter()
+            rows = self.__cursor.fetchall()
+            self.__recordFetch(rows, time.perf_counter() - start)
+
+    def __recordFetch(self, rows : list[dict[str, any]], duration : float):
+        """
+        Reports the pending execution with the rows fetched for it.
+        """
+        if self.__pending is None:
+            return
+        executeDuration, model, controller = self.__pending
+        self.__pending = None
+        bytesFetched = sum(len(value) if isinstance(value, (str, bytes, bytearray)) else 8
+                        for row in rows for value in row.values() if value is not None)
+        QueryMonitor.record(self.sql, executeDuration + duration, len(rows), bytesFetched, model, controller)
+
+class PreparedStatementCache:
+    """
+    A least recently used cache of prepared statements for a single connection.
+    Statements are keyed by their SQL text, which only contains placeholders for
+    the values, so every call with the same statement shape reuses the plan.
+    """
+
+    def __init__(self, connection : mysql.connector.MySQLConnection, capacity : int = 64):
+        self.__connection = connection
+        self.__capacity = max(1, capacity)
+        self.__cursors : OrderedDict[str, PreparedCursor] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def getCursor(self, sql : str) -> PreparedCursor:
+        """
+        Returns the prepared cursor for the given statement, preparing it on a miss.
+        The least recently used statement is deallocated when the cache is full.
+        """
+        cursor = self.__cursors.get(sql)
+        if cursor is not None:
+            self.hits += 1
+            self.__cursors.move_to_end(sql)
+            return cursor
+
+        self.misses += 1
+        cursor = PreparedCursor(self.__connection, sql)
+        self.__cursors[sql] = cursor
+        if len(self.__cursors) > self.__capacity:
+            _, evicted = self.__cursors.popitem(last = False)
+            evicted.deallocate()
+            self.evictions += 1
+        return cursor
+
+    def clear(self):
+        """
+        Deallocates every cached statement.
+        """
+        for cursor in self.__cursors.values():
+            cursor.deallocate()
+        self.__cursors.clear()
+
+    def __len__(self) -> int:
+        return len(self.__cursors)
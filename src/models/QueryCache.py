@@ -0,0 +1,193 @@
+from collections import OrderedDict
+import copy
+import functools
+import threading
+import os
+
+from .DatabaseConnection import DatabaseConnection
+
+class QueryCache:
+    """
+    A least recently used cache of model read results, keyed by the table, the method
+    and the arguments of the read. Each cached read declares the tables it reads from.
+    Every write to a table bumps the version of that table and of the tables referring
+    to it (whose rows a cascading delete or update may change), and drops the cached
+    results that read from them. Results are copied when they are stored and returned,
+    so callers can change them freely.
+    Reads made inside a transaction neither use nor fill the cache, since they can see
+    rows the transaction has not committed yet.
+    The number of cached results is capped by QUERY_CACHE_SIZE from the .env file
+    (default 512).
+    """
+
+    __entries : OrderedDict[tuple, tuple[frozenset[str], any]] = OrderedDict()
+    __versions : dict[str, int] = {}
+    __generation = 0
+    __referrers : dict[str, set[str]] = {}
+    __size = None
+    __lock = threading.Lock()
+
+    __stats = {
+        "hits": 0,
+        "misses": 0,
+        "evictions": 0,
+        "invalidations": 0
+    }
+
+    @staticmethod
+    def cached(*tables : str):
+        """
+        Decorator for model classmethods whose result only depends on their arguments
+        and on the rows of the given tables. Place it below @classmethod. Without tables,
+        the result depends on the table of the class the method is called on.
+        - tables: The names of the tables the method reads from.
+        """
+        def decorator(method):
+            @functools.wraps(method)
+            def wrapper(cls, *args, **kwargs):
+                if DatabaseConnection.inTransaction():
+                    return method(cls, *args, **kwargs)
+                readTables = frozenset(tables) if len(tables) > 0 else frozenset([cls.getTableName()])
+                try:
+                    key = (cls.__name__, method.__name__, QueryCache.__freeze(args), QueryCache.__freeze(kwargs))
+                    hash(key)
+                except TypeError: # Unhashable arguments are not cached
+                    return method(cls, *args, **kwargs)
+
+                found, result, versions = QueryCache.__get(key, readTables)
+                if found:
+                    return copy.deepcopy(result)
+                result = method(cls, *args, **kwargs)
+                QueryCache.__put(key, readTables, versions, copy.deepcopy(result))
+                return result
+            return wrapper
+        return decorator
+
+    @staticmethod
+    def addReferences(tableName : str, referredTableNames : list[str]):
+        """
+        Records that a table refers to other tables, so writes to the referred tables
+        also invalidate the results read from the table.
+        - tableName: The name of the referring table.
+        - referredTableNames: The names of the tables it refers to.
+        """
+        with QueryCache.__lock:
+            for referredTableName in referredTableNames:
+                QueryCache.__referrers.setdefault(referredTableName, set()).add(tableName)
+
+    @staticmethod
+    def onWrite(table : type, keys : list | None):
+        """
+        Write listener that invalidates the results read from the written table and
+        from the tables referring to it.
+        - table: The DatabaseTable subclass that was written to.
+        - keys: The primary keys of the written rows (unused, any write invalidates the table).
+        """
+        QueryCache.invalidate(table.getTableName())
+
+    @staticmethod
+    def invalidate(tableName : str = None):
+        """
+        Drops the cached results read from the given table and from the tables referring
+        to it, or every cached result if no table is given.
+        """
+        with QueryCache.__lock:
+            if tableName is None:
+                tableNames = set()
+                QueryCache.__stats["invalidations"] += len(QueryCache.__entries)
+                QueryCache.__entries.clear()
+                QueryCache.__generation += 1
+            else:
+                tableNames = QueryCache.__affected(tableName)
+                for key in [key for key, (readTables, _) in QueryCache.__entries.items()
+                            if not readTables.isdisjoint(tableNames)]:
+                    del QueryCache.__entries[key]
+                    QueryCache.__stats["invalidations"] += 1
+            for name in tableNames:
+                QueryCache.__versions[name] = QueryCache.__versions.get(name, 0) + 1
+
+    @staticmethod
+    def getStats() -> dict[str, int | float]:
+        """
+        Returns the statistics of the cache.
+        - entries, size: the number of cached results and the maximum.
+        - hits, misses, hitRate: how many reads were served from the cache.
+        - evictions: results dropped to make room for newer ones.
+        - invalidations: results dropped because a table they read from was written to.
+        """
+        with QueryCache.__lock:
+            stats = QueryCache.__stats
+            reads = stats["hits"] + stats["misses"]
+            return {
+                "entries": len(QueryCache.__entries),
+                "size": QueryCache.__capacity(),
+                "hits": stats["hits"],
+                "misses": stats["misses"],
+                "hitRate": stats["hits"] / reads if reads > 0 else 0.0,
+                "evictions": stats["evictions"],
+                "invalidations": stats["invalidations"]
+            }
+
+    @staticmethod
+    def __get(key : tuple, readTables : frozenset[str]) -> tuple[bool, any, dict[str, int]]:
+        """
+        Looks up a cached result. Also returns the versions of the read tables, which
+        must be passed to __put so a result read during a write is not stored.
+        """
+        with QueryCache.__lock:
+            versions = {name : QueryCache.__versions.get(name, 0) for name in readTables}
+            versions[None] = QueryCache.__generation
+            entry = QueryCache.__entries.get(key)
+            if entry is not None:
+                QueryCache.__entries.move_to_end(key)
+                QueryCache.__stats["hits"] += 1
+                return True, entry[1], versions
+            QueryCache.__stats["misses"] += 1
+            return False, None, versions
+
+    @staticmethod
+    def __put(key : tuple, readTables : frozenset[str], versions : dict[str, int], result : any):
+        """
+        Stores a result unless one of the tables it was read from was written to meanwhile.
+        """
+        with QueryCache.__lock:
+            if versions[None] != QueryCache.__generation or \
+                any(QueryCache.__versions.get(name, 0) != version for name, version in versions.items() if name is not None):
+                return
+            QueryCache.__entries[key] = (readTables, result)
+            QueryCache.__entries.move_to_end(key)
+            while len(QueryCache.__entries) > QueryCache.__capacity():
+                QueryCache.__entries.popitem(last = False)
+                QueryCache.__stats["evictions"] += 1
+
+    @staticmethod
+    def __affected(tableName : str) -> set[str]:
+        """
+        Returns the table and every table that refers to it, directly or not.
+        """
+        affected = set()
+        pending = [tableName]
+        while len(pending) > 0:
+            name = pending.pop()
+            if name in affected:
+                continue
+            affected.add(name)
+            pending += list(QueryCache.__referrers.get(name, set()))
+        return affected
+
+    @staticmethod
+    def __freeze(value : any) -> any:
+        """
+        Returns a hashable version of a list, tuple or dictionary argument.
+        """
+        if isinstance(value, (list, tuple)):
+            return (type(value).__name__,) + tuple(QueryCache.__freeze(item) for item in value)
+        if isinstance(value, dict):
+            return ("dict",) + tuple(sorted((key, QueryCache.__freeze(item)) for key, item in value.items()))
+        return value
+
+    @staticmethod
+    def __capacity() -> int:
+        if QueryCache.__size is None:
+            QueryCache.__size = max(1, int(os.getenv("QUERY_CACHE_SIZE", 512)))
+        return QueryCache.__size
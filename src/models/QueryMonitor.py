@@ -0,0 +1,261 @@
+from collections import deque
+import datetime
+import logging
+import threading
+import time
+import sys
+import os
+import re
+
+class QueryMonitor:
+    """
+    Records every statement executed through the prepared statement cache. Each
+    execution is grouped by the fingerprint of its statement (the SQL with the values
+    and placeholder lists collapsed) and keeps its duration, the rows returned and an
+    estimate of the bytes fetched. The latencies of each fingerprint are kept in
+    histograms over a rolling window, and statements slower than a threshold are
+    written to a slow query log with the model method and the controller call that
+    ran them. The monitor is configured from the .env file:
+    - QUERY_MONITOR: set to 0 to turn the monitor off (default 1).
+    - QUERY_STATS_WINDOW: seconds covered by the latency histograms (default 300).
+    - SLOW_QUERY_MS: statements taking at least this many milliseconds are logged (default 200).
+    - SLOW_QUERY_LOG: the path of the slow query log (default slow_queries.log).
+    """
+
+    # Upper bounds of the latency histogram buckets in milliseconds
+    BUCKETS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, float("inf")]
+
+    # Files whose frames are part of the database layer rather than its callers
+    __internalFiles = ("DatabaseConnection.py", "PreparedStatementCache.py", "QueryMonitor.py", "QueryCache.py")
+
+    __configured = False
+    __enabled = True
+    __window = 300.0
+    __slowThreshold = 200.0
+    __slowLogPath = "slow_queries.log"
+    __slowLog : logging.Logger = None
+
+    # Each window holds its start time and the statistics per fingerprint
+    __windows : deque = deque()
+    __totals : dict[str, dict[str, any]] = {}
+    __fingerprints : dict[str, str] = {}
+    __lock = threading.Lock()
+
+    @staticmethod
+    def isEnabled() -> bool:
+        QueryMonitor.__configure()
+        return QueryMonitor.__enabled
+
+    @staticmethod
+    def caller() -> tuple[str | None, str | None]:
+        """
+        Returns the model method and the controller function that are running the
+        current statement, or None for the ones that are not on the stack.
+        """
+        model = None
+        controller = None
+        frame = sys._getframe(1)
+        while frame is not None and controller is None:
+            path = frame.f_code.co_filename
+            name = getattr(frame.f_code, "co_qualname", frame.f_code.co_name)
+            if model is None and f"{os.sep}models{os.sep}" in path and not path.endswith(QueryMonitor.__internalFiles):
+                model = QueryMonitor.__qualifiedName(frame, name)
+            elif f"{os.sep}controllers{os.sep}" in path:
+                controller = name
+            frame = frame.f_back
+        return model, controller
+
+    @staticmethod
+    def record(sql : str,
+            duration : float,
+            rows : int,
+            bytesFetched : int,
+            model : str = None,
+            controller : str = None):
+        """
+        Records one execution of a statement.
+        - sql: The statement that was executed.
+        - duration: The seconds spent executing it and fetching its rows.
+        - rows: The number of rows returned, or affected for statements without a result.
+        - bytesFetched: An estimate of the size of the fetched values.
+        - model: The model method that ran the statement.
+        - controller: The controller function that caused it.
+        """
+        if not QueryMonitor.isEnabled():
+            return
+        milliseconds = duration * 1000
+        with QueryMonitor.__lock:
+            fingerprint = QueryMonitor.__fingerprints.get(sql)
+            if fingerprint is None:
+                fingerprint = QueryMonitor.fingerprint(sql)
+                if len(QueryMonitor.__fingerprints) < 4096:
+                    QueryMonitor.__fingerprints[sql] = fingerprint
+            window = QueryMonitor.__currentWindow()
+            for stats in [window.setdefault(fingerprint, QueryMonitor.__emptyStats()),
+                          QueryMonitor.__totals.setdefault(fingerprint, QueryMonitor.__emptyStats())]:
+                stats["count"] += 1
+                stats["totalTime"] += milliseconds
+                stats["maxTime"] = max(stats["maxTime"], milliseconds)
+                stats["rows"] += rows
+                stats["bytes"] += bytesFetched
+                stats["histogram"][QueryMonitor.__bucket(milliseconds)] += 1
+                if model is not None:
+                    stats["models"].add(model)
+        if milliseconds >= QueryMonitor.__slowThreshold:
+            QueryMonitor.__logSlow(fingerprint, milliseconds, rows, bytesFetched, model, controller)
+
+    @staticmethod
+    def getStats(window : bool = True) -> dict[str, dict[str, any]]:
+        """
+        Returns the statistics per statement fingerprint, slowest total time first.
+        - window: If True, only the executions of the rolling window are counted,
+        otherwise every execution since the start or the last reset.
+        Each fingerprint has the keys count, totalTime, averageTime, maxTime, p50, p95
+        and p99 (in milliseconds, the percentiles are bucket upper bounds), rows, bytes,
+        histogram (bucket upper bound to count) and models.
+        """
+        with QueryMonitor.__lock:
+            if window:
+                QueryMonitor.__currentWindow()
+                merged = {}
+                for _, stats in QueryMonitor.__windows:
+                    for fingerprint, fingerprintStats in stats.items():
+                        QueryMonitor.__merge(merged.setdefault(fingerprint, QueryMonitor.__emptyStats()), fingerprintStats)
+            else:
+                merged = {}
+                for fingerprint, stats in QueryMonitor.__totals.items():
+                    QueryMonitor.__merge(merged.setdefault(fingerprint, QueryMonitor.__emptyStats()), stats)
+
+        result = {}
+        for fingerprint, stats in sorted(merged.items(), key = lambda item : item[1]["totalTime"], reverse = True):
+            result[fingerprint] = {
+                "count": stats["count"],
+                "totalTime": stats["totalTime"],
+                "averageTime": stats["totalTime"] / stats["count"],
+                "maxTime": stats["maxTime"],
+                "p50": QueryMonitor.__percentile(stats["histogram"], 0.50),
+                "p95": QueryMonitor.__percentile(stats["histogram"], 0.95),
+                "p99": QueryMonitor.__percentile(stats["histogram"], 0.99),
+                "rows": stats["rows"],
+                "bytes": stats["bytes"],
+                "histogram": dict(zip(QueryMonitor.BUCKETS, stats["histogram"])),
+                "models": sorted(stats["models"])
+            }
+        return result
+
+    @staticmethod
+    def reset():
+        """
+        Forgets every recorded execution.
+        """
+        with QueryMonitor.__lock:
+            QueryMonitor.__windows.clear()
+            QueryMonitor.__totals = {}
+
+    @staticmethod
+    def fingerprint(sql : str) -> str:
+        """
+        Returns the shape of a statement: whitespace is collapsed, literal values and
+        placeholders become ?, lists of them become a single (...) and repeated OR
+        conditions are kept once.
+        """
+        fingerprint = re.sub(r"\s+", " ", sql).strip()
+        fingerprint = re.sub(r"'(?:[^'\\]|\\.)*'", "?", fingerprint)
+        fingerprint = re.sub(r"(?<![\w.])-?\d+(?:\.\d+)?\b", "?", fingerprint)
+        fingerprint = fingerprint.replace("%s", "?")
+        fingerprint = re.sub(r"\(\s*\?(?:\s*,\s*\?)*\s*\)", "(...)", fingerprint)
+        fingerprint = re.sub(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+", "(...)", fingerprint)
+        fingerprint = re.sub(r"(\([^()]*\?[^()]*\))(?:\s+OR\s+\1)+", r"\1 OR ...", fingerprint)
+        return fingerprint
+
+    @staticmethod
+    def __configure():
+        if QueryMonitor.__configured:
+            return
+        QueryMonitor.__enabled = os.getenv("QUERY_MONITOR", "1") != "0"
+        QueryMonitor.__window = max(1.0, float(os.getenv("QUERY_STATS_WINDOW", 300)))
+        QueryMonitor.__slowThreshold = float(os.getenv("SLOW_QUERY_MS", 200))
+        QueryMonitor.__slowLogPath = os.getenv("SLOW_QUERY_LOG", "slow_queries.log")
+        QueryMonitor.__configured = True
+
+    @staticmethod
+    def __currentWindow() -> dict[str, dict[str, any]]:
+        """
+        Returns the statistics of the current part of the rolling window. The window is
+        split in four parts, and parts older than the window are dropped.
+        """
+        now = time.monotonic()
+        part = QueryMonitor.__window / 4
+        while len(QueryMonitor.__windows) > 0 and now - QueryMonitor.__windows[0][0] >= QueryMonitor.__window:
+            QueryMonitor.__windows.popleft()
+        if len(QueryMonitor.__windows) == 0 or now - QueryMonitor.__windows[-1][0] >= part:
+            QueryMonitor.__windows.append((now, {}))
+        return QueryMonitor.__windows[-1][1]
+
+    @staticmethod
+    def __emptyStats() -> dict[str, any]:
+        return {"count": 0, "totalTime": 0.0, "maxTime": 0.0, "rows": 0, "bytes": 0,
+                "histogram": [0] * len(QueryMonitor.BUCKETS), "models": set()}
+
+    @staticmethod
+    def __merge(target : dict[str, any], stats : dict[str, any]):
+        target["count"] += stats["count"]
+        target["totalTime"] += stats["totalTime"]
+        target["maxTime"] = max(target["maxTime"], stats["maxTime"])
+        target["rows"] += stats["rows"]
+        target["bytes"] += stats["bytes"]
+        target["histogram"] = [a + b for a, b in zip(target["histogram"], stats["histogram"])]
+        target["models"] |= stats["models"]
+
+    @staticmethod
+    def __bucket(milliseconds : float) -> int:
+        for index, bound in enumerate(QueryMonitor.BUCKETS):
+            if milliseconds <= bound:
+                return index
+        return len(QueryMonitor.BUCKETS) - 1
+
+    @staticmethod
+    def __percentile(histogram : list[int], fraction : float) -> float:
+        total = sum(histogram)
+        seen = 0
+        for bound, count in zip(QueryMonitor.BUCKETS, histogram):
+            seen += count
+            if seen >= total * fraction:
+                return bound
+        return QueryMonitor.BUCKETS[-1]
+
+    @staticmethod
+    def __qualifiedName(frame, name : str) -> str:
+        """
+        Returns the class and method name of a model frame. Classmethods share their
+        code between subclasses, so the class is taken from cls when it is available.
+        """
+        owner = frame.f_locals.get("cls")
+        method = name.split(".")[-1]
+        return f"{owner.__name__}.{method}" if isinstance(owner, type) else name
+
+    @staticmethod
+    def __logSlow(fingerprint : str,
+                milliseconds : float,
+                rows : int,
+                bytesFetched : int,
+                model : str,
+                controller : str):
+        """
+        Appends a slow statement to the slow query log.
+        """
+        with QueryMonitor.__lock:
+            if QueryMonitor.__slowLog is None:
+                logger = logging.getLogger("slowqueries")
+                logger.setLevel(logging.INFO)
+                logger.propagate = False
+                try:
+                    handler = logging.FileHandler(QueryMonitor.__slowLogPath, encoding = "utf-8")
+                except OSError as e:
+                    print(f"Error: {e}")
+                    handler = logging.NullHandler()
+                logger.addHandler(handler)
+                QueryMonitor.__slowLog = logger
+        timestamp = datetime.datetime.now().isoformat(timespec = "seconds")
+        QueryMonitor.__slowLog.info(f"{timestamp} {milliseconds:.1f} ms rows={rows} bytes={bytesFetched} " +
+            f"model={model} controller={controller} sql={fingerprint}")
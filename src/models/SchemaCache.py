@@ -0,0 +1,141 @@
+import hashlib
+import json
+import threading
+import os
+
+from .DatabaseConnection import DatabaseConnection
+
+class SchemaCache:
+    """
+    Keeps the metadata (primary keys and columns) of the database tables.
+    The metadata of every registered table is read with a single information_schema
+    query and saved to a local JSON file, keyed by a checksum of the host, the database
+    and the CREATE TABLE statements of the tables. As long as the checksum does not change,
+    later startups read the metadata from the file instead of querying information_schema.
+    The tables are still created if they do not exist, which is cheap, so a database that
+    was dropped and created again gets its tables back.
+    The file is stored at SCHEMA_CACHE_PATH from the .env file (default .schema_cache.json).
+    """
+
+    __tables : list[type] = []
+    __metadata : dict[str, dict[str, list[str]]] = {}
+    __lock = threading.RLock()
+
+    @staticmethod
+    def register(table : type):
+        """
+        Registers a table class. Tables are created in the order they are registered,
+        so a table must be registered after the tables it references.
+        - table: The DatabaseTable subclass to register.
+        """
+        with SchemaCache.__lock:
+            if table not in SchemaCache.__tables:
+                SchemaCache.__tables.append(table)
+
+    @staticmethod
+    def getMetadata(tableName : str) -> dict[str, list[str]]:
+        """
+        Returns the metadata of the given table as a dictionary with the keys:
+        - primary: the primary key columns of the table in key order.
+        - columns: the columns of the table in table order.
+        The metadata of all the registered tables is loaded the first time it is needed.
+        """
+        with SchemaCache.__lock:
+            if tableName not in SchemaCache.__metadata:
+                SchemaCache.__load()
+            return SchemaCache.__metadata[tableName]
+
+    @staticmethod
+    def invalidate():
+        """
+        Forgets the loaded metadata and deletes the cache file, so the next lookup reads
+        the metadata from the database again.
+        """
+        with SchemaCache.__lock:
+            SchemaCache.__metadata = {}
+            try:
+                os.remove(SchemaCache.__path())
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def __load():
+        """
+        Creates the registered tables if they do not exist yet and loads their metadata from
+        the cache file. If the file does not have an entry for the current checksum, the
+        metadata is read from the database and saved to the file.
+        """
+        DatabaseConnection.startConnection()
+        tables = list(SchemaCache.__tables)
+        checksum = SchemaCache.__checksum(tables)
+        path = SchemaCache.__path()
+
+        cache = {}
+        try:
+            with open(path, "r", encoding = "utf-8") as file:
+                cache = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            cache = {}
+
+        for table in tables:
+            table._createTable()
+
+        metadata = cache.get(checksum)
+        if metadata is None or any(table._tableName not in metadata for table in tables):
+            metadata = SchemaCache.__read([table._tableName for table in tables])
+            cache[checksum] = metadata
+            try:
+                with open(path, "w", encoding = "utf-8") as file:
+                    json.dump(cache, file, indent = 4)
+            except OSError as e:
+                print(f"Error: {e}")
+
+        SchemaCache.__metadata.update(metadata)
+
+    @staticmethod
+    def __read(tableNames : list[str]) -> dict[str, dict[str, list[str]]]:
+        """
+        Reads the columns and primary keys of the given tables in one query.
+        """
+        metadata = {tableName : {"primary": [], "columns": []} for tableName in tableNames}
+        try:
+            cursor = DatabaseConnection.getConnection().cursor(dictionary = True)
+            sql = "SELECT c.TABLE_NAME, c.COLUMN_NAME, k.ORDINAL_POSITION AS KEY_POSITION " + \
+                "FROM information_schema.COLUMNS c " + \
+                "LEFT JOIN information_schema.KEY_COLUMN_USAGE k ON k.TABLE_SCHEMA = c.TABLE_SCHEMA " + \
+                "AND k.TABLE_NAME = c.TABLE_NAME AND k.COLUMN_NAME = c.COLUMN_NAME AND k.CONSTRAINT_NAME = 'PRIMARY' " + \
+                "WHERE c.TABLE_SCHEMA = DATABASE() AND c.TABLE_NAME IN (" + ", ".join(["%s"] * len(tableNames)) + ") " + \
+                "ORDER BY c.TABLE_NAME, c.ORDINAL_POSITION"
+            cursor.execute(sql, tableNames)
+            keys = {tableName : [] for tableName in tableNames}
+            for row in cursor.fetchall():
+                tableName = row["TABLE_NAME"]
+                # information_schema names are case insensitive on some platforms
+                tableName = next((name for name in tableNames if name.lower() == tableName.lower()), tableName)
+                metadata[tableName]["columns"].append(row["COLUMN_NAME"])
+                if row["KEY_POSITION"] is not None:
+                    keys[tableName].append((row["KEY_POSITION"], row["COLUMN_NAME"]))
+            for tableName in tableNames:
+                metadata[tableName]["primary"] = [column for _, column in sorted(keys[tableName])]
+        except Exception as e:
+            print(f"Error: {e}")
+            raise e
+        finally:
+            cursor.close()
+        return metadata
+
+    @staticmethod
+    def __checksum(tables : list[type]) -> str:
+        """
+        Returns the checksum of the connection target and the table definitions.
+        """
+        digest = hashlib.sha256()
+        digest.update(f"{os.getenv('HOST')}/{os.getenv('DATABASE')}".encode("utf-8"))
+        for table in tables:
+            digest.update(table._tableName.encode("utf-8"))
+            digest.update(table._createTableSQL.encode("utf-8"))
+        return digest.hexdigest()
+
+    @staticmethod
+    def __path() -> str:
+        return os.getenv("SCHEMA_CACHE_PATH", ".schema_cache.json")
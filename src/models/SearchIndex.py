@@ -0,0 +1,248 @@
+import threading
+
+from .DatabaseConnection import DatabaseConnection
+from .SchemaCache import SchemaCache
+
+class SearchIndex:
+    """
+    A full-text search index over the units, utilities and bills shown in the tables.
+    Each indexed row has a document in the searchtoken table that holds the text of its
+    columns (bills also hold the name of their unit and the type of their utility), and the documents have a FULLTEXT index using the ngram parser,
+    so any part of a word of at least two characters can be looked up in the index.
+    The table has the following columns:
+    - Entity: enum('unit','utility','bill'), the table the document belongs to.
+    - EntityID: int, the primary key of the row in that table.
+    - Content: text, the searchable text of the row.
+    - PRIMARY KEY (Entity, EntityID)
+    - FULLTEXT KEY Content (Content) WITH PARSER ngram
+
+    The documents are kept up to date by onWrite, which DatabaseTable calls after every
+    write. Searches that contain regular expression characters or that are shorter than
+    an ngram cannot use the index and fall back to REGEXP matching on the columns.
+    """
+
+    _tableName = "searchtoken"
+    _createTableSQL = ("CREATE TABLE IF NOT EXISTS searchtoken ( " +
+        "Entity enum('unit','utility','bill') NOT NULL, " +
+        "EntityID int NOT NULL, " +
+        "Content text NOT NULL, " +
+        "PRIMARY KEY (Entity, EntityID), " +
+        "FULLTEXT KEY Content (Content) WITH PARSER ngram)")
+
+    NGRAM_SIZE = 2
+    PATTERN_CHARACTERS = set(".^$*+?{}[]\\|()")
+
+    # The query returning the document of each row of an entity and the key it is filtered on
+    __documents = {
+        "unit": ("SELECT 'unit' AS Entity, unit.UnitID AS EntityID, " +
+            "CONCAT_WS(' ', unit.UnitID, unit.Name, unit.Address, unit.Type) AS Content " +
+            "FROM unit", "unit.UnitID"),
+        "utility": ("SELECT 'utility' AS Entity, u.UtilityID AS EntityID, " +
+            "CONCAT_WS(' ', u.UtilityID, u.Type, u.Status, u.BillingCycle) AS Content " +
+            "FROM utility u", "u.UtilityID"),
+        "bill": ("SELECT 'bill' AS Entity, b.BillID AS EntityID, " +
+            "CONCAT_WS(' ', b.BillID, u.Name, ut.Type, b.TotalAmount, b.DueDate, " +
+            "DATE_FORMAT(b.DueDate, '%M %d, %Y'), DATE_FORMAT(b.DueDate, '%M %e, %Y'), b.Status) AS Content " +
+            "FROM bill b LEFT JOIN utility ut ON b.UtilityID = ut.UtilityID " +
+            "LEFT JOIN unit u ON b.UnitID = u.UnitID", "b.BillID")
+    }
+
+    # Refreshing more rows than this by key refreshes the whole entity instead
+    __maxKeys = 1000
+
+    __checked = False
+    __lock = threading.Lock()
+
+    @classmethod
+    def _createTable(cls):
+        """
+        Creates the searchtoken table. Stopwords are turned off for the session first,
+        otherwise the ngram parser drops every ngram that contains a stopword such as 'a'.
+        The connection is pooled, so the setting of the session is restored afterwards.
+        """
+        try:
+            cursor = DatabaseConnection.getConnection().cursor()
+            cursor.execute("SET @searchIndexStopword = @@SESSION.innodb_ft_enable_stopword")
+            cursor.execute("SET SESSION innodb_ft_enable_stopword = OFF")
+            try:
+                cursor.execute(cls._createTableSQL)
+            finally:
+                cursor.execute("SET SESSION innodb_ft_enable_stopword = @searchIndexStopword")
+        except Exception as e:
+            print(f"Error: {e}")
+            raise e
+        finally:
+            cursor.close()
+
+    @classmethod
+    def isIndexed(cls, tableName : str) -> bool:
+        """
+        Returns True if the rows of the given table have search documents.
+        """
+        return tableName in cls.__documents
+
+    @classmethod
+    def canSearch(cls, searchValue : str) -> bool:
+        """
+        Returns True if the search can be answered by the index. Searches with regular
+        expression characters are explicit pattern searches and words shorter than an
+        ngram have no ngram to look up, so both have to use REGEXP.
+        """
+        words = searchValue.split()
+        return len(words) > 0 and all(len(word) >= cls.NGRAM_SIZE for word in words) and \
+            not any(character in cls.PATTERN_CHARACTERS for character in searchValue)
+
+    @classmethod
+    def searchCondition(cls,
+                        tableName : str,
+                        keyColumn : str,
+                        searchValue : str) -> tuple[str, list[str]] | None:
+        """
+        Returns the condition that keeps the rows of the given table whose document
+        contains the search and the parameters bound to its placeholders, or None if the
+        table is not indexed or the search cannot use the index.
+        - tableName: The name of the table that is searched.
+        - keyColumn: The qualified primary key column of the table in the query.
+        - searchValue: The text to search for.
+        """
+        if not cls.isIndexed(tableName) or not cls.canSearch(searchValue):
+            return None
+        cls.__ensureBuilt()
+        condition = f"{keyColumn} IN (SELECT EntityID FROM {cls._tableName} " + \
+            "WHERE Entity = %s AND MATCH(Content) AGAINST (%s IN BOOLEAN MODE))"
+        return condition, [tableName, cls.__phrase(searchValue)]
+
+    @classmethod
+    def onWrite(cls, table : type, keys : list | None):
+        """
+        Refreshes the documents affected by a write to the given table. Documents of
+        other entities that show columns of the written rows are refreshed as well.
+        - table: The DatabaseTable subclass that was written to.
+        - keys: The primary keys of the written rows, or None if they are not known.
+        """
+        tableName = table.getTableName()
+        if not cls.isIndexed(tableName):
+            return
+        # An empty index is built in full instead of receiving only the written rows
+        cls.__ensureBuilt()
+        if keys is not None and len(keys) > cls.__maxKeys:
+            keys = None
+
+        if tableName == "unit":
+            cls.refresh("unit", keys)
+            # Bills show the unit name and lose their unit when it is deleted
+            cls.__refreshBills("b.UnitID", keys)
+        elif tableName == "utility":
+            cls.refresh("utility", keys)
+            cls.__refreshBills("b.UtilityID", keys)
+        else:
+            cls.refresh("bill", keys)
+
+    @classmethod
+    def refresh(cls, entity : str, keys : list[int] = None):
+        """
+        Rebuilds the documents of the given rows of an entity. Documents of rows that no
+        longer exist are removed.
+        - entity: 'unit', 'utility' or 'bill'.
+        - keys: The primary keys of the rows to refresh, or None to refresh every row.
+        """
+        if keys is not None and len(keys) == 0:
+            return
+        if keys is None:
+            cls.__deleteDocuments(entity, None)
+            cls.__refreshWhere(entity, None, [])
+            return
+        keyColumn = cls.__documents[entity][1]
+        cls.__deleteDocuments(entity, keys)
+        cls.__refreshWhere(entity, f"{keyColumn} IN (" + ", ".join(["%s"] * len(keys)) + ")", keys)
+
+    @classmethod
+    def rebuild(cls):
+        """
+        Rebuilds the documents of every indexed row. Use this after the tables were
+        changed outside of the application.
+        """
+        for entity in cls.__documents.keys():
+            cls.refresh(entity)
+
+    @classmethod
+    def __ensureBuilt(cls):
+        """
+        Builds the index once if it is empty, e.g. for a database filled before the
+        index existed.
+        """
+        if cls.__checked:
+            return
+        with cls.__lock:
+            if cls.__checked:
+                return
+            try:
+                sql = f"SELECT EXISTS(SELECT 1 FROM {cls._tableName}) AS built"
+                cursor = DatabaseConnection.getCursor(sql)
+                cursor.execute(sql)
+                built = cursor.fetchone()["built"]
+            except Exception as e:
+                print(f"Error: {e}")
+                raise e
+            finally:
+                cursor.close()
+            if not built:
+                cls.rebuild()
+            cls.__checked = True
+
+    @classmethod
+    def __refreshWhere(cls, entity : str, condition : str | None, params : list):
+        """
+        Inserts or replaces the documents of the rows of an entity that match the condition.
+        """
+        documentSQL, _ = cls.__documents[entity]
+        sql = f"INSERT INTO {cls._tableName} (Entity, EntityID, Content) " + \
+            f"SELECT * FROM ({documentSQL}" + (f" WHERE {condition}" if condition is not None else "") + \
+            ") AS document " + \
+            "ON DUPLICATE KEY UPDATE Content = document.Content"
+        try:
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, params)
+        except Exception as e:
+            print(f"Error: {e}")
+            raise e
+        finally:
+            cursor.close()
+
+    @classmethod
+    def __refreshBills(cls, column : str, keys : list[int] | None):
+        """
+        Refreshes the documents of the bills referring to the given rows through the
+        given column, and of the bills whose reference was cleared by a delete.
+        """
+        if keys is None:
+            cls.refresh("bill")
+            return
+        condition = f"({column} IS NULL OR {column} IN (" + ", ".join(["%s"] * len(keys)) + "))"
+        cls.__refreshWhere("bill", condition, keys)
+
+    @classmethod
+    def __deleteDocuments(cls, entity : str, keys : list[int] | None):
+        """
+        Deletes the documents of the given rows of an entity, or all of them if keys is None.
+        """
+        sql = f"DELETE FROM {cls._tableName} WHERE Entity = %s"
+        if keys is not None:
+            sql += " AND EntityID IN (" + ", ".join(["%s"] * len(keys)) + ")"
+        try:
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, [entity] + (keys or []))
+        except Exception as e:
+            print(f"Error: {e}")
+            raise e
+        finally:
+            cursor.close()
+
+    @classmethod
+    def __phrase(cls, searchValue : str) -> str:
+        """
+        Returns the search as a boolean mode phrase, so its ngrams must appear in order.
+        """
+        return '"' + searchValue.strip().replace('"', ' ') + '"'
+
+SchemaCache.register(SearchIndex)
@@ -17,23 +17,13 @@ class UnitDatabaseTable(DatabaseTable):
 
     _tableName = "unit"
 
-    @classmethod  
-    def _createTable(cls):
-        try:
-            cursor = DatabaseConnection.getConnection().cursor()
-            cursor.execute("CREATE TABLE IF NOT EXISTS unit( " +
-                "UnitID int NOT NULL AUTO_INCREMENT, " +
-                "Name varchar(30) NOT NULL, " +
-                "Address varchar(255) NOT NULL, "
-                "Type enum('Shared','Individual') NOT NULL," +
-                "PRIMARY KEY (UnitID), " +
-                "UNIQUE KEY Name (Name))"
-            )
-        except Exception as e:
-            print(f"Error: {e}")
-            raise e
-        finally:
-            cursor.close()
+    _createTableSQL = ("CREATE TABLE IF NOT EXISTS unit( " +
+        "UnitID int NOT NULL AUTO_INCREMENT, " +
+        "Name varchar(30) NOT NULL, " +
+        "Address varchar(255) NOT NULL, "
+        "Type enum('Shared','Individual') NOT NULL," +
+        "PRIMARY KEY (UnitID), " +
+        "UNIQUE KEY Name (Name))")
     
     @classmethod
     def batchUpdate(cls, 
@@ -59,21 +49,22 @@ class UnitDatabaseTable(DatabaseTable):
                 raise TypeError("Data values must be strings.")
             if column not in cls._columns:
                 raise ValueError(f"Column {column} is not a valid column name.")
-            if column == cls._primaryKey:
-                raise ValueError(f"Cannot update primary key {cls._primaryKey}.")
+            if column == cls._primary:
+                raise ValueError(f"Cannot update primary key {cls._primary}.")
         try:
             
-            cursor = DatabaseConnection.getConnection().cursor()
             sql = f"UPDATE {cls._tableName} SET "
-            sql += ", ".join([f"{column} = '{value}'" for column, value in data.items()])
-            sql += " WHERE " + " AND ".join([f"{cls._primaryKey} = {key}" for key in keys])
-            cursor.execute(sql)
+            sql += ", ".join([f"{column} = %s" for column in data.keys()])
+            sql += f" WHERE {cls._primary} IN (" + ", ".join(["%s"] * len(keys)) + ")"
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, list(data.values()) + keys)
             
         except Exception as e:
             print(f"Error: {e}")
             raise e
         finally:
             cursor.close()
+        cls._notifyWrite(keys)
         return
     
     @classmethod
@@ -87,9 +78,9 @@ class UnitDatabaseTable(DatabaseTable):
             raise TypeError("Name must be a string.")
         result = None
         try:
-            cursor = DatabaseConnection.getConnection().cursor()
-            sql = f"SELECT * FROM {cls._tableName} WHERE Name = '{name}'"
-            cursor.execute(sql)
+            sql = f"SELECT * FROM {cls._tableName} WHERE Name = %s"
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, (name,))
             result = cursor.fetchone()
         except Exception as e:
             print(f"Error: {e}")
@@ -15,22 +15,12 @@ class UtilityDatabaseTable(DatabaseTable):
     """
     _tableName = "utility"
 
-    @classmethod  
-    def _createTable(cls):
-        try:
-            cursor = DatabaseConnection.getConnection().cursor()
-            cursor.execute("CREATE TABLE IF NOT EXISTS utility (" +
-                "UtilityID int NOT NULL AUTO_INCREMENT, " + 
-                "Type enum('Electricity','Water','Gas','Internet','Trash','Maintenance','Miscellaneous') NOT NULL, " +
-                "Status enum('Active','Inactive','N/A') NOT NULL, " +
-                "BillingCycle enum('Monthly','Quarterly','Annually','Irregular') NOT NULL," +
-                "PRIMARY KEY (UtilityID))"
-            )
-        except Exception as e:
-            print(f"Error: {e}")
-            raise e
-        finally:
-            cursor.close()
+    _createTableSQL = ("CREATE TABLE IF NOT EXISTS utility (" +
+        "UtilityID int NOT NULL AUTO_INCREMENT, " +
+        "Type enum('Electricity','Water','Gas','Internet','Trash','Maintenance','Miscellaneous') NOT NULL, " +
+        "Status enum('Active','Inactive','N/A') NOT NULL, " +
+        "BillingCycle enum('Monthly','Quarterly','Annually','Irregular') NOT NULL," +
+        "PRIMARY KEY (UtilityID))")
         
     @classmethod
     def batchUpdate(cls, 
@@ -56,8 +46,8 @@ class UtilityDatabaseTable(DatabaseTable):
                 raise TypeError("Data values must be strings.")
             if column not in cls._columns:
                 raise ValueError(f"Column {column} is not a valid column name.")
-            if column == cls._primaryKey:
-                raise ValueError(f"Cannot update primary key {cls._primaryKey}.")
+            if column == cls._primary:
+                raise ValueError(f"Cannot update primary key {cls._primary}.")
             if column == "Type":
                 if data[column] not in ["Electricity", "Water", "Gas", "Internet", "Trash", "Maintenance", "Miscellaneous"]:
                     raise ValueError(f"Invalid value for column {column}.")
@@ -69,14 +59,15 @@ class UtilityDatabaseTable(DatabaseTable):
                     raise ValueError(f"Invalid value for column {column}.")
         try:
                 
-            cursor = DatabaseConnection.getConnection().cursor()
             sql = f"UPDATE {cls._tableName} SET "
-            sql += ", ".join([f"{column} = '{value}'" for column, value in data.items()])
-            sql += " WHERE " + " AND ".join([f"{cls._primaryKey} = {key}" for key in keys])
-            cursor.execute(sql)
+            sql += ", ".join([f"{column} = %s" for column in data.keys()])
+            sql += f" WHERE {cls._primary} IN (" + ", ".join(["%s"] * len(keys)) + ")"
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, list(data.values()) + keys)
         except Exception as e:
             print(f"Error: {e}")
             raise e
         finally:
             cursor.close()
+        cls._notifyWrite(keys)
         return 
\ No newline at end of file
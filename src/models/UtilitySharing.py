@@ -0,0 +1,133 @@
+import threading
+
+from .DatabaseConnection import DatabaseConnection
+from .SchemaCache import SchemaCache
+
+class UtilitySharing:
+    """
+    How each utility is shared between the units it is installed in, kept in the
+    utilitysharing table so listing the utilities and checking whether one is shared
+    are primary key lookups instead of counting the installations of every utility.
+    The table has the following columns:
+    - UtilityID: int, the ID of the utility.
+    - UnitCount: int, the number of units the utility is installed in.
+    - SharedCount: int, the number of those units that are shared units.
+    - MainUnitID: int, the shared unit with the lowest ID the utility is installed in,
+    NULL if it is not installed in a shared unit.
+    - PRIMARY KEY (UtilityID)
+    Utilities that are not installed in any unit have no row.
+
+    The rows are kept up to date by onWrite, which DatabaseTable calls after every write.
+    """
+
+    _tableName = "utilitysharing"
+    _createTableSQL = ("CREATE TABLE IF NOT EXISTS utilitysharing ( " +
+        "UtilityID int NOT NULL, " +
+        "UnitCount int NOT NULL DEFAULT 0, " +
+        "SharedCount int NOT NULL DEFAULT 0, " +
+        "MainUnitID int DEFAULT NULL, " +
+        "PRIMARY KEY (UtilityID))")
+
+    # The sharing of the utilities computed from their installations
+    __sharingSQL = ("SELECT iu.UtilityID, COUNT(*) AS UnitCount, " +
+        "SUM(IF(un.Type = 'Shared', 1, 0)) AS SharedCount, " +
+        "MIN(IF(un.Type = 'Shared', iu.UnitID, NULL)) AS MainUnitID " +
+        "FROM installedutility iu JOIN unit un ON un.UnitID = iu.UnitID")
+
+    # Refreshing more rows than this by key refreshes every row instead
+    __maxKeys = 1000
+
+    __checked = False
+    __lock = threading.Lock()
+
+    @classmethod
+    def _createTable(cls):
+        try:
+            cursor = DatabaseConnection.getConnection().cursor()
+            cursor.execute(cls._createTableSQL)
+        except Exception as e:
+            print(f"Error: {e}")
+            raise e
+        finally:
+            cursor.close()
+
+    @classmethod
+    def getTableName(cls) -> str:
+        """
+        Returns the name of the table. The table is filled first if it is empty.
+        """
+        cls.__ensureBuilt()
+        return cls._tableName
+
+    @classmethod
+    def onWrite(cls, table : type, keys : list | None):
+        """
+        Refreshes the sharing of the utilities affected by a write to the given table.
+        A write to a unit can change its type or delete its installations, so it
+        refreshes every utility.
+        - table: The DatabaseTable subclass that was written to.
+        - keys: The primary keys of the written rows, or None if they are not known.
+        """
+        tableName = table.getTableName()
+        if tableName not in ["installedutility", "utility", "unit"]:
+            return
+        cls.__ensureBuilt()
+        if tableName == "unit" or keys is None or len(keys) > cls.__maxKeys:
+            cls.refresh()
+        elif tableName == "installedutility":
+            cls.refresh(sorted({key[1] for key in keys}))
+        else:
+            cls.refresh(keys)
+
+    @classmethod
+    def refresh(cls, utilities : list[int] = None):
+        """
+        Recomputes the sharing of the given utilities from their installations.
+        - utilities: The IDs of the utilities, or None to refresh every utility.
+        """
+        if utilities is not None and len(utilities) == 0:
+            return
+        condition = "" if utilities is None else "WHERE UtilityID IN (" + ", ".join(["%s"] * len(utilities)) + ")"
+        params = [] if utilities is None else list(utilities)
+        with DatabaseConnection.transaction():
+            cls.__execute(f"DELETE FROM {cls._tableName} {condition}", params)
+            cls.__execute(f"INSERT INTO {cls._tableName} (UtilityID, UnitCount, SharedCount, MainUnitID) " +
+                        f"{cls.__sharingSQL} {condition.replace('UtilityID', 'iu.UtilityID')} GROUP BY iu.UtilityID", params)
+
+    @classmethod
+    def __ensureBuilt(cls):
+        """
+        Fills the table once if it is empty, e.g. for a database filled before the
+        table existed.
+        """
+        if cls.__checked:
+            return
+        with cls.__lock:
+            if cls.__checked:
+                return
+            try:
+                sql = f"SELECT EXISTS(SELECT 1 FROM {cls._tableName}) AS built"
+                cursor = DatabaseConnection.getCursor(sql)
+                cursor.execute(sql)
+                built = cursor.fetchone()["built"]
+            except Exception as e:
+                print(f"Error: {e}")
+                raise e
+            finally:
+                cursor.close()
+            if not built:
+                cls.refresh()
+            cls.__checked = True
+
+    @classmethod
+    def __execute(cls, sql : str, params : list):
+        try:
+            cursor = DatabaseConnection.getCursor(sql)
+            cursor.execute(sql, params)
+        except Exception as e:
+            print(f"Error: {e}")
+            raise e
+        finally:
+            cursor.close()
+
+SchemaCache.register(UtilitySharing)
@@ -0,0 +1,86 @@
+import calendar
+import math
+from datetime import date, timedelta
+
+from src.utils.constants import Range
+
+def addMonths(day : date, months : int) -> date:
+    """
+    Returns the date the given number of months after the given date, or before it
+    if months is negative. Days past the end of the new month become its last day,
+    like DATE_ADD with a MONTH interval in MySQL.
+    """
+    monthIndex = day.year * 12 + day.month - 1 + months
+    year, month = divmod(monthIndex, 12)
+    return date(year, month + 1, min(day.day, calendar.monthrange(year, month + 1)[1]))
+
+def monthsBetween(start : date, end : date) -> int:
+    """
+    Returns the number of whole months from start to end, like TIMESTAMPDIFF(MONTH, start, end)
+    in MySQL. A month is only counted once the day of the month of start is reached.
+    """
+    months = (end.year - start.year) * 12 + end.month - start.month
+    if months > 0 and end.day < start.day:
+        months -= 1
+    elif months < 0 and end.day > start.day:
+        months += 1
+    return months
+
+def checkRange(range : Range, offset : int = 1):
+    """
+    Raises a ValueError if the range is not one of 3m, 6m, 1y, 2y or the offset
+    is not a positive integer.
+    """
+    if not isinstance(range, Range):
+        raise ValueError("Range must be an instance of Range enum.")
+    if not range in [Range.THREE_MONTHS, Range.SIX_MONTHS, Range.ONE_YEAR, Range.TWO_YEARS]:
+        raise ValueError("Range must be one of the following: 3m, 6m, 1y, 2y.")
+    if not isinstance(offset, int):
+        raise ValueError("Offset must be an integer.")
+    if offset <= 0:
+        raise ValueError("Offset must be greater than 0.")
+
+def rangeBounds(range : Range, offset : int = 1, today : date = None) -> tuple[date, date]:
+    """
+    Returns the first and last day of the period of the given range and offset. The first
+    period ends today, and each offset goes back one more range of months.
+    For example, if the range is 3m and the offset is 2, the period starts 6 months ago
+    and ends 3 months ago.
+    - range: The range of months of the period.
+    - offset: The number of ranges to go back from today, starting at 1.
+    - today: The day the periods are counted from, the current date by default.
+    """
+    checkRange(range, offset)
+    today = date.today() if today is None else today
+    return addMonths(today, -range.value * offset), addMonths(today, -range.value * (offset - 1))
+
+def maxOffset(earliest : date, range : Range, today : date = None) -> int:
+    """
+    Returns the offset of the period of the given range that holds the earliest date,
+    which is the number of periods needed to go back from today to that date.
+    The months between the two dates are counted with the fraction of the last month.
+    - earliest: The earliest date that must be reachable.
+    - range: The range of months of the periods.
+    - today: The day the periods are counted from, the current date by default.
+    """
+    if not isinstance(earliest, date):
+        raise ValueError("Date must be a datetime.date object.")
+    checkRange(range)
+    today = date.today() if today is None else today
+    months = monthsBetween(earliest, today)
+    monthStart = addMonths(earliest, months)
+    monthEnd = addMonths(earliest, months + 1)
+    fraction = (today - monthStart) / (monthEnd - monthStart) if monthEnd != monthStart else 0
+    return math.ceil((months + fraction) / range.value)
+
+def fullMonths(start : date, end : date) -> tuple[date, date]:
+    """
+    Returns the first day of the first month that lies fully between start and end and
+    the first day after the last such month. Without a full month, both are the day
+    after end.
+    """
+    fullStart = start if start.day == 1 else addMonths(start.replace(day = 1), 1)
+    fullEnd = (end + timedelta(days = 1)).replace(day = 1)
+    if fullStart >= fullEnd:
+        fullStart = fullEnd = end + timedelta(days = 1)
+    return fullStart, fullEnd
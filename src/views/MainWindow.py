@@ -1,7 +1,7 @@
 from PyQt6 import QtCore, QtGui, QtWidgets
 from PyQt6.QtWidgets import QMainWindow, QGraphicsOpacityEffect
 from PyQt6.QtGui import QIcon
-from PyQt6.QtCore import QSize
+from PyQt6.QtCore import QSize, QTimer
 
 from src.views.pages.UnitsPage import UnitsPage
 from src.views.pages.UtilitiesPage import UtilitiesPage
@@ -23,6 +23,14 @@ class MainWindow(QMainWindow):
         }
 
         self.setupUi(self)
+
+        # Typing searches once the text stopped changing for a moment, Enter searches at once
+        self.searchTimer = QTimer(self)
+        self.searchTimer.setSingleShot(True)
+        self.searchTimer.setInterval(300)
+        self.searchTimer.timeout.connect(self.handleSearch)
+        self.searchInputLineEdit.textEdited.connect(lambda _: self.searchTimer.start())
+
         self.setupPages()
 
         self.currentSidebarButton = self.homeButton
@@ -439,8 +447,6 @@ class MainWindow(QMainWindow):
         self.stackedWidget.addWidget(self.utilitiesPage)
         self.stackedWidget.addWidget(self.billsPage)
 
-        self.updatePages()
-
         self.homeButton.clicked.connect(lambda: self.updatePage(self.homePage, self.homeButton, "Welcome back"))
         self.unitsButton.clicked.connect(lambda: self.updatePage(self.unitsPage, self.unitsButton, "Units"))
         self.utilitiesButton.clicked.connect(lambda: self.updatePage(self.utilitiesPage, self.utilitiesButton, "Utilities"))
@@ -449,6 +455,9 @@ class MainWindow(QMainWindow):
         self.updatePage(self.homePage, self.homeButton, "Welcome back")
 
     def updatePage(self, pageWidget, button, title):
+        # A search still waiting for the typing to stop belongs to the page being left
+        if self.searchTimer.isActive():
+            self.handleSearch()
         self.searchbarTextByPage[self.windowLabel.text()] = self.searchInputLineEdit.text()
 
         self.stackedWidget.setCurrentWidget(pageWidget)
@@ -481,25 +490,19 @@ class MainWindow(QMainWindow):
         self.currentSidebarButton = button
         self.windowLabel.setText(title)
 
-    def handleSearch(self):
-        currentPage = self.stackedWidget.currentWidget()
-        if currentPage == self.unitsPage:
-            self.unitsPage.resetPage()
-        elif currentPage == self.utilitiesPage:
-            self.utilitiesPage.resetPage()
-        elif currentPage == self.billsPage:
-            self.billsPage.resetPage()
-
-        self.updatePages()
+        # Pages are only read when they are shown, if their data changed since
+        pageWidget.showPage()
 
-    def updatePages(self):
+    def handleSearch(self):
+        self.searchTimer.stop()
         currentTitle = self.windowLabel.text()
         self.searchbarTextByPage[currentTitle] = self.searchInputLineEdit.text()
 
-        self.unitsPage.updatePage()
-        self.utilitiesPage.updatePage()
-        self.billsPage.updatePage()
-        self.homePage.updateDashboards()
+        # The search text only belongs to the shown page, the other pages stay as they are
+        currentPage = self.stackedWidget.currentWidget()
+        if currentPage in [self.unitsPage, self.utilitiesPage, self.billsPage]:
+            currentPage.resetPage()
+            currentPage.refreshPage()
     
     def setStatusBarText(self, text: str, duration: int=3000):
         self.statusbar.showMessage(text, duration)
\ No newline at end of file
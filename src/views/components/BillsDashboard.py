@@ -5,6 +5,8 @@ from PyQt6.QtCore import Qt, pyqtSignal
 from src.utils.constants import categoryColors, defaultColor, billDataDatabaseHeaders, billDataHeaders
 from src.views.widgets.BillEntry import BillEntry
 from src.views.dialogs.ViewBill import ViewBill
+from src.views.widgets.LoadingOverlay import LoadingOverlay
+from src.views.workers.RequestRunner import RequestRunner
 from src.controllers.billsController import BillsController
 from src.controllers.dashboardController import DashboardController
 
@@ -19,6 +21,10 @@ class BillsDashboard(QWidget):
 
         self.setupUI(self.bills)
 
+        self.requestRunner = RequestRunner(self)
+        self.loadingOverlay = LoadingOverlay(self)
+        self.requestRunner.loadingChanged.connect(self.loadingOverlay.setLoading)
+
     def setupUI(self, bills):
         # Container frame to apply background & rounded corners
         container = QFrame()
@@ -133,10 +139,16 @@ class BillsDashboard(QWidget):
             self.viewWindow.show()
 
     def updateDashboard(self):
+        self.requestRunner.request(DashboardController.fetchUpcomingBills, onResult=self.applyBills, onError=self.handleLoadError)
+
+    def handleLoadError(self, error: Exception):
+        self.mainWindow.setStatusBarText(f"Failed to load the upcoming bills: {error}")
+
+    def applyBills(self, bills):
         self.clearDashboard()
 
-        self.bills = DashboardController.fetchUpcomingBills()
-        
+        self.bills = bills
+
         for index, bill in enumerate(self.bills):
             utility = bill["Type"]
             color = categoryColors.get(utility, defaultColor)
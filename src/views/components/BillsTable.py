@@ -9,19 +9,21 @@ from src.views.dialogs.EditBillForm import EditBillForm
 from src.controllers.billsController import BillsController
 
 class BillsTable(BaseTableWidget):
+    pageTitle = "Bills"
+    sortDependencies = {"Name": ["UnitID"], "Type": ["UtilityID"]}
+
     def __init__(self, parent=None, mainWindow=None):
         self.databaseHeaders = ["BillID", "Name", "Type", "TotalAmount", "DueDate", "Status"]
         self.headers = ["Bill ID", "Unit Name", "Type", "Total Amount", "Due Date", "Status", "Actions"]
         super().__init__(self.headers, self.databaseHeaders, parent=parent, mainWindow=mainWindow)
 
     def updateTable(self):
-        pageTitle = "Bills"
         self.mainWindow.setStatusBarText("Loading Bills...")
         
         currentPage = self.parentWidget().currentPage
         sortingOrder = self.columnSortStates[self.currentSortIndex]
         sortingField = self.databaseHeaders[self.currentSortIndex]
-        searchValue = self.mainWindow.searchbarTextByPage.get(pageTitle, "").strip()
+        searchValue = self.mainWindow.searchbarTextByPage.get(self.pageTitle, "").strip()
 
         if sortingOrder == SortOrder.ASC:
             sortingOrderStr = "ASC"
@@ -30,19 +32,16 @@ class BillsTable(BaseTableWidget):
         else:
             sortingOrderStr = "ASC"
 
-        data, count = BillsController.fetchBills(currentPage, sortingOrderStr, sortingField, searchValue)
-        self.populateTable(data)
-        self.parentWidget().totalPages = count
-        self.parentWidget().pageLabel.setText(f"Page {currentPage} of {count}")
+        cursor = self.parentWidget().getPageCursor((sortingField, sortingOrderStr, searchValue))
+        self.loadPage(BillsController.fetchBills, BillsController.countBills, currentPage, sortingOrderStr, sortingField, searchValue, cursor)
 
     def handleViewButton(self, row_idx):
-        item = self.item(row_idx, 0)
-        if not item:
+        id = self.rowID(row_idx)
+        if id is None:
             return
         
         self.mainWindow.setStatusBarText("Loading Bill Data....")
         
-        id = item.text()
         billData = BillsController.viewBill(id)
 
         if billData:
@@ -50,11 +49,10 @@ class BillsTable(BaseTableWidget):
             self.viewWindow.show()
 
     def handleEditButton(self, row_idx):
-        item = self.item(row_idx, 0)
-        if not item:
+        billID = self.rowID(row_idx)
+        if billID is None:
             return
 
-        billID = item.text()
         bill = BillsController.viewBill(billID)
 
         dialog = EditBillForm(
@@ -72,16 +70,13 @@ class BillsTable(BaseTableWidget):
         dialog.addButton.clicked.connect(lambda: dialog.onEditClicked(billID))
 
         if dialog.exec():
-            self.mainWindow.updatePages()
             self.mainWindow.setStatusBarText("Bill updated successfully.")
             self.showSuccessNotification("Bill was updated successfully.")
             
     def handleDeleteButton(self, row_idx):
-        item = self.item(row_idx, 0)
-        if not item:
+        billID = self.rowID(row_idx)
+        if billID is None:
             return
-        
-        billID = item.text()
 
         msgBox = QMessageBox(self)
         msgBox.setIcon(QMessageBox.Icon.Warning)
@@ -142,8 +137,6 @@ QPushButton:hover {
             else:
                 self.mainWindow.setStatusBarText("Failed to delete Bill")
                 self.showErrorNotification(f"Failed to delete Bill '{billID}'.")
-
-            self.mainWindow.updatePages()
     
     def showSuccessNotification(self, message="Bill was successfully added"):
         msgBox = QMessageBox(self)
@@ -213,5 +206,4 @@ QPushButton:hover {
         self.columnSortStates = [SortOrder.NONE] * self.columnCount()
         self.columnSortStates[4] = SortOrder.DESC
 
-        self.updateHeaderLabels()
-        self.updateTable()
\ No newline at end of file
+        self.updateHeaderLabels()
\ No newline at end of file
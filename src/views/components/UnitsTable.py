@@ -8,19 +8,20 @@ from src.utils.constants import SortOrder
 from src.controllers.unitsController import UnitsController
 
 class UnitsTable(BaseTableWidget):
+    pageTitle = "Units"
+
     def __init__(self, parent=None, mainWindow=None):
         self.databaseHeaders = ["UnitID", "Name", "Address", "Type"]
         self.headers = ["Unit ID", "Unit Name", "Address", "Unit Type", "Actions"]
         super().__init__(self.headers, self.databaseHeaders, parent=parent, mainWindow=mainWindow)
 
     def updateTable(self):
-        pageTitle = "Units"
         self.mainWindow.setStatusBarText("Loading Units...")
 
         currentPage = self.parentWidget().currentPage
         sortingOrder = self.columnSortStates[self.currentSortIndex]
         sortingField = self.databaseHeaders[self.currentSortIndex]
-        searchValue = self.mainWindow.searchbarTextByPage.get(pageTitle, "").strip()
+        searchValue = self.mainWindow.searchbarTextByPage.get(self.pageTitle, "").strip()
 
         if sortingOrder == SortOrder.ASC:
             sortingOrderStr = "ASC"
@@ -29,19 +30,16 @@ class UnitsTable(BaseTableWidget):
         else:
             sortingOrderStr = "ASC"
 
-        data, count = UnitsController.fetchUnits(currentPage, sortingOrderStr, sortingField, searchValue)
-        self.populateTable(data)
-        self.parentWidget().totalPages = count
-        self.parentWidget().pageLabel.setText(f"Page {currentPage} of {count}")
+        cursor = self.parentWidget().getPageCursor((sortingField, sortingOrderStr, searchValue))
+        self.loadPage(UnitsController.fetchUnits, UnitsController.countUnits, currentPage, sortingOrderStr, sortingField, searchValue, cursor)
 
     def handleViewButton(self, row_idx):
-        item = self.item(row_idx, 0)
-        if not item:
+        id = self.rowID(row_idx)
+        if id is None:
             return
         
         self.mainWindow.setStatusBarText("Loading Unit Data....")
     
-        id = item.text()
         unitData, unitUtilities, unitBillsData = UnitsController.viewUnit(id)
 
         if unitData:
@@ -49,11 +47,10 @@ class UnitsTable(BaseTableWidget):
             self.viewWindow.show()
 
     def handleEditButton(self, row_idx):
-        item = self.item(row_idx, 0)
-        if not item:
+        unitID = self.rowID(row_idx)
+        if unitID is None:
             return
 
-        unitID = item.text()
         unit, _, _ = UnitsController.viewUnit(unitID)
 
         dialog = EditUnitForm(name=unit["Name"], address=unit["Address"], type=unit["Type"])
@@ -63,17 +60,14 @@ class UnitsTable(BaseTableWidget):
         dialog.addButton.clicked.connect(lambda: dialog.onEditClicked(unitID))
 
         if dialog.exec():
-            self.mainWindow.updatePages()
             self.mainWindow.setStatusBarText("Unit updated successfully.")
             self.showSuccessNotification("Unit was updated successfully.")
 
     def handleDeleteButton(self, row_idx):
-        item = self.item(row_idx, 0)
-        if not item:
+        unitID = self.rowID(row_idx)
+        if unitID is None:
             return
 
-        unitID = item.text()
-
         msgBox = QMessageBox(self)
         msgBox.setIcon(QMessageBox.Icon.Warning)
         msgBox.setWindowTitle("Confirm Delete")
@@ -132,8 +126,6 @@ QPushButton:hover {
             else:
                 self.mainWindow.setStatusBarText("Failed to delete Unit.")
                 self.showErrorNotification(f"Failed to delete Unit '{unitID}'.")
-
-            self.mainWindow.updatePages()
     
     def showSuccessNotification(self, message="Unit was successfully added"):
         msgBox = QMessageBox(self)
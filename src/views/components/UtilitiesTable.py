@@ -10,19 +10,20 @@ from src.controllers.utilitiesController import UtilitiesController
 from src.utils.constants import utilityDataHeaders, utilityDataDatabaseHeaders
 
 class UtilitiesTable(BaseTableWidget):
+    pageTitle = "Utilities"
+
     def __init__(self, parent=None, mainWindow=None):
         self.databaseHeaders = ["UtilityID", "Type", "Name", "Status", "BillingCycle"]
         self.headers = ["Utility ID", "Type", "Unit Name", "Status", "Billing Cycle", "Actions"]
         super().__init__(self.headers, self.databaseHeaders, parent=parent, mainWindow=mainWindow)
 
     def updateTable(self):
-        pageTitle = "Utilities"
         self.mainWindow.setStatusBarText("Loading Utilities...")
 
         currentPage = self.parentWidget().currentPage
         sortingOrder = self.columnSortStates[self.currentSortIndex]
         sortingField = self.databaseHeaders[self.currentSortIndex]
-        searchValue = self.mainWindow.searchbarTextByPage.get(pageTitle, "").strip()
+        searchValue = self.mainWindow.searchbarTextByPage.get(self.pageTitle, "").strip()
 
         if sortingOrder == SortOrder.ASC:
             sortingOrderStr = "ASC"
@@ -31,19 +32,16 @@ class UtilitiesTable(BaseTableWidget):
         else:
             sortingOrderStr = "ASC"
 
-        data, count = UtilitiesController.fetchUtilities(currentPage, sortingOrderStr, sortingField, searchValue)
-        self.populateTable(data)
-        self.parentWidget().totalPages = count
-        self.parentWidget().pageLabel.setText(f"Page {currentPage} of {count}")
+        cursor = self.parentWidget().getPageCursor((sortingField, sortingOrderStr, searchValue))
+        self.loadPage(UtilitiesController.fetchUtilities, UtilitiesController.countUtilities, currentPage, sortingOrderStr, sortingField, searchValue, cursor)
 
     def handleViewButton(self, row_idx):
-        item = self.item(row_idx, 0)
-        if not item:
+        id = self.rowID(row_idx)
+        if id is None:
             return
         
         self.mainWindow.setStatusBarText("Loading Utility Data....")
     
-        id = item.text()
         utilityData, utilityUnits, utilityBillsData = UtilitiesController.viewUtility(id)
 
         if utilityData:
@@ -51,11 +49,10 @@ class UtilitiesTable(BaseTableWidget):
             self.viewWindow.show()
     
     def handleEditButton(self, row_idx):
-        item = self.item(row_idx, 0)
-        if not item:
+        utilityID = self.rowID(row_idx)
+        if utilityID is None:
             return
 
-        utilityID = item.text()
         utility, units, _ = UtilitiesController.viewUtility(utilityID)
 
         dialog = EditUtilityForm(
@@ -71,17 +68,14 @@ class UtilitiesTable(BaseTableWidget):
         dialog.addButton.clicked.connect(lambda: dialog.onEditClicked(utilityID))
 
         if dialog.exec():
-            self.mainWindow.updatePages()
             self.mainWindow.setStatusBarText("Utility updated successfully.")
             self.showSuccessNotification("Utility was updated successfully.")
 
     def handleDeleteButton(self, row_idx):
-        item = self.item(row_idx, 0)
-        if not item:
+        utilityID = self.rowID(row_idx)
+        if utilityID is None:
             return
 
-        utilityID = item.text()
-
         msgBox = QMessageBox(self)
         msgBox.setIcon(QMessageBox.Icon.Warning)
         msgBox.setWindowTitle("Confirm Delete")
@@ -141,8 +135,6 @@ QPushButton:hover {
             else:
                 self.mainWindow.setStatusBarText("Failed to delete Utility.")
                 self.showErrorNotification(f"Failed to delete Utility '{utilityID}'.")
-
-            self.mainWindow.updatePages()
     
     def showSuccessNotification(self, message="Utility was successfully added"):
         msgBox = QMessageBox(self)
@@ -4,12 +4,15 @@ from PyQt6.QtCore import Qt, QSize, QDate
 from datetime import datetime
 
 from src.views.widgets.UtilitySumChartWidget import UtilitySumChartWidget
+from src.views.widgets.LoadingOverlay import LoadingOverlay
+from src.views.workers.RequestRunner import RequestRunner
 from src.controllers.dashboardController import DashboardController
 
 class UtilityDashboard(QFrame):
     def __init__(self, parent=None, mainWindow=None):
         super().__init__(parent)
         self.mainWindow = mainWindow
+        self.requestRunner = RequestRunner(self)
 
         self.setupUI()
 
@@ -52,7 +55,10 @@ class UtilityDashboard(QFrame):
 
         # === Summary Cards ===
         summaryLayout = QHBoxLayout()
-        summaryLayout.addWidget(self.createSummaryWidget())
+        self.summaryWidget = self.createSummaryWidget()
+        summaryLayout.addWidget(self.summaryWidget)
+        self.loadingOverlay = LoadingOverlay(self.summaryWidget)
+        self.requestRunner.loadingChanged.connect(self.loadingOverlay.setLoading)
         mainLayout.addLayout(summaryLayout)
 
         # === Utility Chart ===
@@ -139,7 +145,11 @@ class UtilityDashboard(QFrame):
         monthRange = self.chartWidget.parseDateRangeToMonths(self.chartWidget.dateRange)
         offset = self.chartWidget.currDateOffset
 
-        filters = self.chartWidget.utilityFilters
+        filters = list(self.chartWidget.utilityFilters)
 
-        totalUnpaid, totalCost, unpaidBills = DashboardController.fetchBillsSummary(monthRange, offset, filters)
-        self.updateSummaryCards(totalCost, totalUnpaid, unpaidBills)
+        self.requestRunner.request(DashboardController.fetchBillsSummary, monthRange, offset, filters,
+                                   onResult=lambda summary: self.updateSummaryCards(summary[1], summary[0], summary[2]),
+                                   onError=self.handleLoadError)
+
+    def handleLoadError(self, error: Exception) -> None:
+        self.mainWindow.setStatusBarText(f"Failed to load the bills summary: {error}")
@@ -90,6 +90,5 @@ class ViewBill(BaseViewWidget):
 
             self.close()
             self.mainWindow.setStatusBarText("Bill updated successfully.")
-            self.mainWindow.updatePages()
             
 
@@ -1,10 +1,13 @@
 from PyQt6.QtWidgets import QMessageBox
 
 from src.views.widgets.BasePageWidget import BasePageWidget
+from src.controllers.eventBus import Entity
 from src.views.components.BillsTable import BillsTable
 from src.views.dialogs.AddBillForm import AddBillForm
 
 class BillsPage(BasePageWidget):
+    watchedChanges = {Entity.BILL: None, Entity.UNIT: ["Name"], Entity.UTILITY: ["Type"]}
+
     def __init__(self, mainWindow=None):
         self.buttonText = "Add Bill"
         super().__init__(BillsTable, self.buttonText, mainWindow=mainWindow)
@@ -18,7 +21,6 @@ class BillsPage(BasePageWidget):
         dialog = AddBillForm()
         
         if dialog.exec():
-            self.mainWindow.updatePages()
             self.mainWindow.setStatusBarText("Bill added succesfully.")
             self.showSuccessNotification()
     
@@ -9,13 +9,21 @@ from src.views.dialogs.AddBillForm import AddBillForm
 
 from src.controllers.billsController import BillsController
 from src.controllers.dashboardController import DashboardController
+from src.controllers.eventBus import EventBus, Entity, ChangeEvent
 
 class HomePage(QWidget):
+    # The dashboards show every bill, the types of the utilities, and no unit columns
+    watchedChanges = {Entity.BILL: None, Entity.UTILITY: ["Type"], Entity.UNIT: []}
+
     def __init__(self, parent=None, mainWindow=None):
         super().__init__(parent)
         self.mainWindow = mainWindow
         self.setupUI()
 
+        # The dashboards are read while they are built
+        self.dirty = False
+        EventBus.subscribe(self.handleChange, list(self.watchedChanges))
+
     def setupUI(self):
         mainLayout = QHBoxLayout()
         mainLayout.setContentsMargins(15, 20, 15, 20)
@@ -86,6 +94,27 @@ class HomePage(QWidget):
         self.utilityDashboard.updateWidgets()
         self.billsDashboard.updateDashboard()
 
+    def showPage(self):
+        """
+        Called when the page is shown, refreshes the dashboards if their data changed
+        while the page was hidden.
+        """
+        if self.dirty:
+            self.refreshPage()
+
+    def refreshPage(self):
+        self.dirty = False
+        self.updateDashboards()
+
+    def handleChange(self, event : ChangeEvent):
+        columns = self.watchedChanges[event.entity]
+        if self.dirty or (columns is not None and not event.affects(columns)):
+            return
+        if self.mainWindow.stackedWidget.currentWidget() is self:
+            self.refreshPage()
+        else:
+            self.dirty = True
+
     def handleAddBillButton(self):
         dialog = AddBillForm()
         if dialog.exec():
@@ -102,7 +131,6 @@ class HomePage(QWidget):
                 response = BillsController.addBill(unitID, utilityID, totalAmount, billPeriodStart, billPeriodEnd, status, dueDate)
                 
                 if response:
-                    self.mainWindow.updatePages()
                     self.showSuccessNotification()
     
     def showSuccessNotification(self, message="Bill was successfully added"):
@@ -1,10 +1,13 @@
 from PyQt6.QtWidgets import QMessageBox
 
 from src.views.widgets.BasePageWidget import BasePageWidget
+from src.controllers.eventBus import Entity
 from src.views.components.UnitsTable import UnitsTable
 from src.views.dialogs.AddUnitForm import AddUnitForm
 
 class UnitsPage(BasePageWidget):
+    watchedChanges = {Entity.UNIT: None}
+
     def __init__(self, mainWindow=None):
         self.buttonText = "Add Unit"
         super().__init__(UnitsTable, self.buttonText, mainWindow=mainWindow)
@@ -16,7 +19,6 @@ class UnitsPage(BasePageWidget):
         dialog = AddUnitForm()
 
         if dialog.exec():
-            self.mainWindow.updatePages()
             self.mainWindow.setStatusBarText("Unit added succesfully.")
             self.showSuccessNotification()
     
@@ -1,11 +1,15 @@
 from PyQt6.QtWidgets import QMessageBox
 
 from src.views.widgets.BasePageWidget import BasePageWidget
+from src.controllers.eventBus import Entity
 from src.views.components.UtilitiesTable import UtilitiesTable
 from src.views.dialogs.AddUtilityForm import AddUtilityForm
 from src.controllers.utilitiesController import UtilitiesController
 
 class UtilitiesPage(BasePageWidget):
+    watchedChanges = {Entity.UTILITY: None, Entity.UNIT: ["Name", "Type"]}
+    rowColumns = ["UnitID"]
+
     def __init__(self, mainWindow=None):
         self.buttonText = "Add Utility"
         super().__init__(UtilitiesTable, self.buttonText, mainWindow=mainWindow)
@@ -17,7 +21,6 @@ class UtilitiesPage(BasePageWidget):
         dialog = AddUtilityForm()
 
         if dialog.exec():
-            self.mainWindow.updatePages()
             self.mainWindow.setStatusBarText("Utility added succesfully.")
             self.showSuccessNotification()
     
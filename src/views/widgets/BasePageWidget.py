@@ -3,19 +3,35 @@ from PyQt6.QtCore import Qt
 
 from abc import abstractmethod
 
+from src.controllers.eventBus import EventBus, Entity, ChangeEvent, ChangeType
+
 class BasePageWidget(QWidget):
+    # The changes the page is refreshed for: the entity the page lists maps to None,
+    # other entities map to the columns of theirs the page shows
+    watchedChanges : dict[Entity, list[str] | None] = {}
+    # Columns of the listed entity whose edits add or remove rows of the page
+    rowColumns : list[str] = []
+
     def __init__(self, tableWidget, buttonText="Add", mainWindow=None):
         super().__init__()
         self.mainWindow = mainWindow
         self.table = tableWidget(mainWindow=self.mainWindow)
 
+        # The page is read when it is first shown
+        self.dirty = True
+        EventBus.subscribe(self.handleChange, list(self.watchedChanges))
+
         self.currentPage = 1
         self.totalPages = 10000
+        # Keyset cursors of the visited pages, only valid for the sorting and search they were read with
+        self.pageCursors = {}
+        self.pageCursorsKey = None
 
         self.setupUI(buttonText)
         self.addButton.clicked.connect(self.handleAddButton)
         self.prevButton.clicked.connect(self.prevPage)
         self.nextButton.clicked.connect(self.nextPage)
+        self.scrollButton.toggled.connect(self.setInfiniteScroll)
 
     def setupUI(self, buttonText):
         self.layout = QVBoxLayout(self)
@@ -43,12 +59,15 @@ class BasePageWidget(QWidget):
         #addButton:hover {
             background: qlineargradient(spread:pad, x1:0, y1:0, x2:1, y2:0, stop:0.4 #FF5FB2, stop:1 #5A30D6);
         }
-        #prevButton, #nextButton {
+        #prevButton, #nextButton, #scrollButton {
             background-color: #2b2b2b;
         }
-        #prevButton:hover, #nextButton:hover {
+        #prevButton:hover, #nextButton:hover, #scrollButton:hover {
             background-color: #3E3E3E;
         }
+        #scrollButton:checked {
+            background-color: #3A0CA3;
+        }
         QLabel {
             font: 12pt "Urbanist";
             color: white;
@@ -61,25 +80,31 @@ class BasePageWidget(QWidget):
         self.prevButton = QPushButton("←")
         self.pageLabel = QLabel("Page 1 of 1")
         self.nextButton = QPushButton("→")
+        self.scrollButton = QPushButton("↕")
+        self.scrollButton.setCheckable(True)
 
         self.addButton.setObjectName("addButton")
         self.prevButton.setObjectName("prevButton")
         self.nextButton.setObjectName("nextButton")
+        self.scrollButton.setObjectName("scrollButton")
 
         self.addButton.setToolTip("Add")
         self.prevButton.setToolTip("Previous Page")
         self.nextButton.setToolTip("Next Page")
         self.pageLabel.setToolTip("Current Page")
+        self.scrollButton.setToolTip("Infinite Scroll")
 
         self.addButton.setCursor(Qt.CursorShape.PointingHandCursor)
         self.prevButton.setCursor(Qt.CursorShape.PointingHandCursor)
         self.nextButton.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.scrollButton.setCursor(Qt.CursorShape.PointingHandCursor)
 
         self.bottomBar.addWidget(self.addButton)
         self.bottomBar.addStretch()
         self.bottomBar.addWidget(self.prevButton)
         self.bottomBar.addWidget(self.pageLabel)
         self.bottomBar.addWidget(self.nextButton)
+        self.bottomBar.addWidget(self.scrollButton)
 
         self.layout.addLayout(self.bottomBar)
         self.layout.addWidget(self.table)
@@ -88,6 +113,48 @@ class BasePageWidget(QWidget):
         self.table.updateTable()
         self.pageLabel.setText(f"Page {self.currentPage} of {self.totalPages}")
 
+    def showPage(self):
+        """
+        Called when the page is shown, refreshes it if its data changed while it was hidden.
+        """
+        if self.dirty:
+            self.refreshPage()
+
+    def refreshPage(self):
+        self.dirty = False
+        self.updatePage()
+
+    def isShown(self) -> bool:
+        return self.mainWindow is not None and self.mainWindow.stackedWidget.currentWidget() is self
+
+    def handleChange(self, event : ChangeEvent):
+        """
+        Refreshes the page if it is shown and the change alters it, otherwise only marks
+        it to be refreshed when it is shown.
+        """
+        if self.dirty or not self.isAffectedBy(event):
+            return
+        if self.isShown():
+            self.refreshPage()
+        else:
+            self.dirty = True
+
+    def isAffectedBy(self, event : ChangeEvent) -> bool:
+        """
+        Returns True if the change may alter the rows of the current page. Editing rows
+        of the listed entity only does if they are on the page, or if the edit can move
+        rows onto or off the page.
+        """
+        columns = self.watchedChanges.get(event.entity, [])
+        if columns is not None:
+            return event.affects(columns)
+        if event.change != ChangeType.EDITED:
+            return True
+        searchValue = self.mainWindow.searchbarTextByPage.get(self.table.pageTitle, "").strip()
+        if searchValue != "" or event.touches(self.rowColumns + self.table.sortingColumns()):
+            return True
+        return self.table.showsAny(event.ids)
+
     def nextPage(self):
         if self.currentPage < self.totalPages:
             self.currentPage += 1
@@ -98,8 +165,40 @@ class BasePageWidget(QWidget):
             self.currentPage -= 1
             self.updatePage()
 
+    def setInfiniteScroll(self, enabled: bool):
+        """
+        Switches the table between paging with the arrow buttons and scrolling through
+        the pages, and reads it again from the first page.
+        """
+        self.prevButton.setVisible(not enabled)
+        self.nextButton.setVisible(not enabled)
+        self.table.setInfiniteScroll(enabled)
+        self.resetPage()
+        self.updatePage()
+
     def resetPage(self):
         self.currentPage = 1
+        self.pageCursors = {}
+
+    def getPageCursor(self, key):
+        """
+        Returns the cursor to read the current page after, or None if it is not known.
+        The cursors are forgotten when the sorting or search (the key) changes.
+        """
+        if key != self.pageCursorsKey:
+            self.pageCursors = {}
+            self.pageCursorsKey = key
+        return self.pageCursors.get(self.currentPage)
+
+    def setNextPageCursor(self, cursor, page=None):
+        """
+        Stores the cursor of the page after the given page, taken from its last row.
+        The page defaults to the current page.
+        """
+        if page is None:
+            page = self.currentPage
+        if cursor is not None:
+            self.pageCursors[page + 1] = cursor
 
     @abstractmethod
     def handleAddButton(self):
@@ -1,11 +1,14 @@
 from PyQt6 import QtCore, QtWidgets
-from PyQt6.QtWidgets import QTableWidget, QTableWidgetItem, QPushButton, QWidget, QHBoxLayout, QHeaderView, QStyledItemDelegate
-from PyQt6.QtCore import Qt, QSize, pyqtSignal
-from PyQt6.QtGui import QIcon, QColor, QBrush, QPalette
+from PyQt6.QtWidgets import QTableView, QHeaderView, QStyledItemDelegate, QToolTip
+from PyQt6.QtCore import Qt, QRect, QRectF
+from PyQt6.QtGui import QIcon, QColor, QPalette, QPainter
 
 from abc import ABC, abstractmethod
 
 from src.utils.constants import SortOrder
+from src.views.widgets.LoadingOverlay import LoadingOverlay
+from src.views.widgets.TableModel import TableModel
+from src.views.workers.RequestRunner import RequestRunner
 
 class TableItemDelegate(QStyledItemDelegate):
     def paint(self, painter, option, index):
@@ -19,7 +22,62 @@ class TableItemDelegate(QStyledItemDelegate):
 
         super().paint(painter, viewOption, index)
 
-class BaseTableWidget(QTableWidget):
+class ActionButtonsDelegate(TableItemDelegate):
+    """
+    Paints the view, edit and delete buttons of the actions column. The buttons are
+    not widgets, the table finds the clicked button with buttonAt. The buttons of the
+    hovered row of the table are colored and the hovered button is highlighted.
+    """
+    BUTTON_SIZE = 40
+    BUTTON_SPACING = 5
+
+    def __init__(self, table : 'BaseTableWidget'):
+        super().__init__(table)
+        self.table = table
+        self.icons = [QIcon(path) for path in table.ICON_PATHS]
+        self.hoverColors = [QColor(color) for color in table.BUTTON_HOVER_COLORS]
+        self.highlightColors = [QColor(color) for color in table.BUTTON_HOVER_HIGHLIGHT_COLORS]
+
+    def buttonRects(self, cellRect : QRect) -> list[QRect]:
+        width = len(self.icons) * self.BUTTON_SIZE + (len(self.icons) - 1) * self.BUTTON_SPACING
+        left = cellRect.x() + (cellRect.width() - width) // 2
+        top = cellRect.y() + (cellRect.height() - self.BUTTON_SIZE) // 2
+        return [QRect(left + i * (self.BUTTON_SIZE + self.BUTTON_SPACING), top, self.BUTTON_SIZE, self.BUTTON_SIZE)
+                for i in range(len(self.icons))]
+
+    def buttonAt(self, cellRect : QRect, pos) -> int:
+        """
+        Returns the index of the button at the position in the cell, or -1 if there is none.
+        """
+        for i, rect in enumerate(self.buttonRects(cellRect)):
+            if rect.contains(pos):
+                return i
+        return -1
+
+    def paint(self, painter, option, index):
+        super().paint(painter, option, index)
+
+        isHovered = index.row() == self.table.hoveredRow
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(Qt.PenStyle.NoPen)
+        for i, rect in enumerate(self.buttonRects(option.rect)):
+            if isHovered:
+                isHighlighted = i == self.table.hoveredButton
+                painter.setBrush(self.highlightColors[i] if isHighlighted else self.hoverColors[i])
+                painter.drawRoundedRect(QRectF(rect), 3, 3)
+            self.icons[i].paint(painter, rect)
+        painter.restore()
+
+    def helpEvent(self, event, view, option, index):
+        button = self.buttonAt(option.rect, event.pos())
+        if button < 0:
+            QToolTip.hideText()
+            return False
+        QToolTip.showText(event.globalPos(), self.table.BUTTON_TOOL_TIPS[button], view)
+        return True
+
+class BaseTableWidget(QTableView):
     ICON_PATHS = [
         "assets/icons/view.png",
         "assets/icons/edit.png",
@@ -35,7 +93,15 @@ class BaseTableWidget(QTableWidget):
         "#D6B53E",
         "#743131"
     ]
+    BUTTON_TOOL_TIPS = ["View", "Edit", "Delete"]
     BUTTON_COUNT = 3
+    ROWS_PER_PAGE = 50
+    # The most pages kept in the table when scrolling through them
+    MAX_WINDOW_PAGES = 6
+    # The title of the page of the table, which its search text is kept under
+    pageTitle : str = None
+    # Columns shown by the table that are read through other columns of the listed entity
+    sortDependencies : dict[str, list[str]] = {}
     TABLE_TEXT_COLOR_MAP = {
         (3, "Active"): "#00FF6F",
         (3, "Inactive"): "#FA1647",
@@ -47,7 +113,7 @@ class BaseTableWidget(QTableWidget):
     }
 
     def __init__(self, columnHeaders: list[str], databaseHeaders: list[str], parent=None, mainWindow=None):
-        super().__init__(0, len(columnHeaders), parent)
+        super().__init__(parent)
         self.mainWindow = mainWindow
         self.columnHeaders = columnHeaders
         self.databaseHeaders = databaseHeaders
@@ -55,21 +121,42 @@ class BaseTableWidget(QTableWidget):
         self.currentSortIndex = 0
         self.columnSortStates[0] = SortOrder.ASC
 
+        # The rows are kept by the model and painted by the delegates, no widget is made per row
+        self.tableModel = TableModel(columnHeaders, databaseHeaders, self.TABLE_TEXT_COLOR_MAP, self)
+        self.setModel(self.tableModel)
+
         self.hoveredRow = -1
-        self.actionButtonsPerRow = {}
-        self.itemColors = {}
+        self.hoveredButton = -1
 
         self.setupTable()
         self.updateHeaderLabels()
 
         self.setItemDelegate(TableItemDelegate(self))
-        self.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.actionButtonsDelegate = ActionButtonsDelegate(self)
+        self.setItemDelegateForColumn(self.columnCount() - 1, self.actionButtonsDelegate)
+        self.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
         self.setMouseTracking(True)
         self.viewport().setMouseTracking(True)
         self.viewport().installEventFilter(self)
 
+        # The pages are read in the background, only the latest page read is shown and
+        # the reads it replaced are stopped on the server
+        self.requestRunner = RequestRunner(self, cancelSuperseded=True)
+        self.countRunner = RequestRunner(self, cancelSuperseded=True)
+        self.loadingOverlay = LoadingOverlay(self)
+        self.requestRunner.loadingChanged.connect(self.loadingOverlay.setLoading)
+
+        # With infinite scroll, the pages next to the shown ones are read when the table
+        # is scrolled to either end, and the pages farthest from the viewport are dropped
+        self.infiniteScroll = False
+        self.pageQuery = None
+        # The query of the shown rows, reading it again updates the rows in place
+        self.shownPageQuery = None
+        self.adjacentPageRunner = RequestRunner(self, cancelSuperseded=True)
+        self.tableModel.fetchMoreRequested.connect(lambda: self.loadAdjacentPage(self.tableModel.lastPage() + 1))
+        self.verticalScrollBar().valueChanged.connect(self.handleScroll)
+
     def setupTable(self):
-        self.setHorizontalHeaderLabels(self.columnHeaders)
         self.horizontalHeader().setSectionsClickable(True)
         self.horizontalHeader().sectionClicked.connect(self.handleHeaderClicked)
 
@@ -79,9 +166,10 @@ class BaseTableWidget(QTableWidget):
         self.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
         self.verticalHeader().setDefaultSectionSize(45)
         self.verticalHeader().setVisible(False)
+        self.setVerticalScrollMode(QTableView.ScrollMode.ScrollPerPixel)
 
         self.setStyleSheet(""" 
-            QTableWidget {
+            QTableView {
                 font: 12pt "Urbanist";
                 border-radius: 12px;
                 background-color: #1c1c1c;
@@ -99,23 +187,17 @@ class BaseTableWidget(QTableWidget):
                 background-color: #f0f0f0;
                 border-bottom: 2px solid #1c1c1c;
             }
-            QPushButton { 
-                font: 12pt "Urbanist"; 
-                font-weight: bold; 
-                padding: 0px 15px; 
-                border-radius: 3px; 
-            }
-            QTableWidget {
+            QTableView {
                 gridline-color: transparent;
             }
-            QTableWidget::item {
+            QTableView::item {
                 border-right: 1px solid transparent;
                 background-color: transparent;
             }
-            QTableWidget::item:hover {
+            QTableView::item:hover {
                 background-color: #3E3E3E;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #3c3c3c;
             }
         """)
@@ -123,11 +205,6 @@ class BaseTableWidget(QTableWidget):
         header = self.horizontalHeader()
         for i in range(self.columnCount() - 1):
             header.setSectionResizeMode(i, QHeaderView.ResizeMode.Stretch)
-        
-        model = header.model()
-
-        for col in range(self.columnCount()):
-            model.setHeaderData(col, header.orientation(), "Click to sort", Qt.ItemDataRole.ToolTipRole)
 
         header.setSectionResizeMode(0, QHeaderView.ResizeMode.Fixed)
         self.setColumnWidth(0, 90)
@@ -135,51 +212,149 @@ class BaseTableWidget(QTableWidget):
         header.setSectionResizeMode(self.columnCount() - 1, QHeaderView.ResizeMode.Fixed)
         self.setColumnWidth(self.columnCount() - 1, 150)
 
-    def populateTable(self, data: list[dict]):
-        self.clearContents()
-        self.setRowCount(len(data))
-
-        for row_idx, row_data in enumerate(data):
-            for col_idx, col_name in enumerate(self.databaseHeaders):
-                value = str(row_data.get(col_name, ""))
-                item = QTableWidgetItem(value)
-                item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-
-                key = (col_idx, value)
-                if key in self.TABLE_TEXT_COLOR_MAP:
-                    color = QColor(self.TABLE_TEXT_COLOR_MAP[key])
-                    item.setForeground(QBrush(color))
-                    self.itemColors[(row_idx, col_idx)] = color
-                
-                self.setItem(row_idx, col_idx, item)
-
-            self.addActionButtons(row_idx)
-
-    def addActionButtons(self, row_idx):
-        button_container = QWidget()
-        layout = QHBoxLayout()
-        layout.setContentsMargins(5, 2, 5, 2)
-        layout.setSpacing(5)
-
-        self.actionButtonsPerRow[row_idx] = []
-        buttonHandlers = [self.handleViewButton, self.handleEditButton, self.handleDeleteButton]
-        buttonToolTips = ["View", "Edit", "Delete"]
-
-        for i in range(self.BUTTON_COUNT):
-            btn = QPushButton()
-            btn.setFixedSize(40, 40)
-            btn.setIcon(QIcon(self.ICON_PATHS[i]))
-            btn.setIconSize(QSize(40, 40))
-            btn.setCursor(Qt.CursorShape.PointingHandCursor)
-            layout.addWidget(btn)
-            self.actionButtonsPerRow[row_idx].append(btn)
-
-            if i < len(buttonHandlers):
-                btn.clicked.connect(lambda _, idx=row_idx, handler=buttonHandlers[i]: handler(idx))
-                btn.setToolTip(buttonToolTips[i])
-
-        button_container.setLayout(layout)
-        self.setCellWidget(row_idx, self.columnCount() - 1, button_container)
+    def columnCount(self) -> int:
+        return self.tableModel.columnCount()
+
+    def rowCount(self) -> int:
+        return self.tableModel.rowCount()
+
+    def populateTable(self, data: list[dict], page: int = 1):
+        self.hoveredRow = -1
+        self.hoveredButton = -1
+        self.tableModel.setRows(data, page)
+        self.tableModel.hasNextPage = len(data) >= self.ROWS_PER_PAGE
+        self.tableModel.fetching = False
+
+    def refreshTable(self, data: list[dict]):
+        """
+        Updates the shown rows to the rows read again for them, keeping the selection
+        and scroll position. Only the rows that changed are updated.
+        """
+        self.tableModel.updateRows(data)
+        self.tableModel.hasNextPage = len(data) >= self.ROWS_PER_PAGE
+        self.tableModel.fetching = False
+
+    def setInfiniteScroll(self, enabled: bool):
+        """
+        Switches between showing one page at a time and scrolling through the pages.
+        The table has to be updated afterwards.
+        """
+        self.infiniteScroll = enabled
+        self.tableModel.streaming = enabled
+
+    def rowID(self, row_idx: int) -> str | None:
+        """
+        Returns the ID shown in the row, or None if the table has no such row.
+        """
+        return self.tableModel.rowID(row_idx)
+
+    def loadPage(self, fetchPage, countPages, page: int, sortingOrder: str, sortingField: str, searchValue: str, cursor: tuple):
+        """
+        Reads a page of the table in the background. The page of a search is shown as
+        soon as its rows are read, and its pages are counted afterwards unless the
+        count is cached.
+        - fetchPage: The controller method reading the page.
+        - countPages: The controller method counting the pages of a search.
+        """
+        self.countRunner.cancel()
+        self.adjacentPageRunner.cancel()
+        self.tableModel.fetching = False
+        self.pageQuery = (fetchPage, sortingOrder, sortingField, searchValue)
+        withCount = searchValue == ""
+        self.requestRunner.request(fetchPage, page, sortingOrder, sortingField, searchValue, cursor, withCount,
+                                   onResult=lambda result: self.applyPage(page, result, countPages, searchValue),
+                                   onError=self.handleLoadError)
+
+    def applyPage(self, page: int, result: tuple, countPages=None, searchValue: str = ""):
+        data, count, nextCursor = result
+        self.parentWidget().setNextPageCursor(nextCursor, page)
+        if self.pageQuery == self.shownPageQuery and page == self.tableModel.firstPage:
+            self.refreshTable(data)
+        else:
+            self.populateTable(data, page)
+        self.shownPageQuery = self.pageQuery
+        if count is not None:
+            self.applyPageCount(page, count)
+            return
+        self.parentWidget().pageLabel.setText(f"Page {page} of ...")
+        self.countRunner.request(countPages, searchValue,
+                                 onResult=lambda count: self.applyPageCount(page, count),
+                                 onError=self.handleLoadError)
+
+    def applyPageCount(self, page: int, count: int):
+        self.parentWidget().totalPages = count
+        if self.tableModel.pageCount() > 1:
+            page = f"{self.tableModel.firstPage}-{self.tableModel.lastPage()}"
+        self.parentWidget().pageLabel.setText(f"Page {page} of {count}")
+
+    def handleScroll(self, value: int):
+        if self.infiniteScroll and value == self.verticalScrollBar().minimum() and self.tableModel.firstPage > 1:
+            self.loadAdjacentPage(self.tableModel.firstPage - 1)
+
+    def loadAdjacentPage(self, page: int):
+        """
+        Reads the page before or after the pages in the table in the background, after
+        the keyset cursor kept for it when the page before it was read. Its pages are
+        not counted again.
+        """
+        if self.pageQuery is None or self.adjacentPageRunner.isLoading():
+            return
+        fetchPage, sortingOrder, sortingField, searchValue = self.pageQuery
+        cursor = self.parentWidget().pageCursors.get(page)
+        self.tableModel.fetching = True
+        self.adjacentPageRunner.request(fetchPage, page, sortingOrder, sortingField, searchValue, cursor, False,
+                                        onResult=lambda result: self.applyAdjacentPage(page, result),
+                                        onError=self.handleAdjacentPageError)
+
+    def applyAdjacentPage(self, page: int, result: tuple):
+        data, _, nextCursor = result
+        model = self.tableModel
+        model.fetching = False
+        self.parentWidget().setNextPageCursor(nextCursor, page)
+
+        rowHeight = self.verticalHeader().defaultSectionSize()
+        if page == model.lastPage() + 1:
+            model.hasNextPage = len(data) >= self.ROWS_PER_PAGE
+            if len(data) == 0:
+                return
+            model.appendPage(data)
+            if model.pageCount() > self.MAX_WINDOW_PAGES:
+                removed = model.removeFirstPage()
+                self.verticalScrollBar().setValue(self.verticalScrollBar().value() - removed * rowHeight)
+        elif page == model.firstPage - 1 and len(data) > 0:
+            model.prependPage(data)
+            self.verticalScrollBar().setValue(self.verticalScrollBar().value() + len(data) * rowHeight)
+            if model.pageCount() > self.MAX_WINDOW_PAGES:
+                model.removeLastPage()
+                model.hasNextPage = True
+        else:
+            return
+
+        # A refresh reads the pages again from the first page in the table
+        self.parentWidget().currentPage = model.firstPage
+        if not self.countRunner.isLoading():
+            self.applyPageCount(model.firstPage, self.parentWidget().totalPages)
+
+    def handleAdjacentPageError(self, error: Exception):
+        self.tableModel.fetching = False
+        self.handleLoadError(error)
+
+    def handleLoadError(self, error: Exception):
+        self.mainWindow.setStatusBarText(f"Failed to load the table: {error}")
+
+    def sortingColumns(self) -> list[str]:
+        """
+        Returns the columns whose edits can change the order of the rows.
+        """
+        field = self.databaseHeaders[self.currentSortIndex]
+        return [field] + self.sortDependencies.get(field, [])
+
+    def showsAny(self, ids: list[int]) -> bool:
+        """
+        Returns True if any of the rows with the given IDs is in the table.
+        """
+        shown = self.tableModel.rowIDs()
+        return any(str(id) in shown for id in ids)
 
     def handleHeaderClicked(self, index):
         if index >= self.columnCount() - 1:
@@ -208,58 +383,58 @@ class BaseTableWidget(QTableWidget):
                 label += " ↓"
             new_labels.append(label)
 
-            headerItem = self.horizontalHeaderItem(i)
-            if headerItem:
-                headerItem.setBackground(QBrush(QColor(28, 28, 28)))
-
-        self.setHorizontalHeaderLabels(new_labels)
-
-        if self.currentSortIndex is not None:
-            headerItem = self.horizontalHeaderItem(self.currentSortIndex)
-            if headerItem:
-                headerItem.setBackground(QBrush(QColor(48, 48, 48)))
-    
-    def selectionChanged(self, selected, deselected):
-        super().selectionChanged(selected, deselected)
-
-        for index in selected.indexes():
-            row = index.row()
-            col = index.column()
-            originalColor = self.itemColors.get((row, col), QColor("white"))
-            item = self.item(row, col)
-            if item:
-                item.setForeground(QBrush(originalColor))
+        self.tableModel.setHeaderLabels(new_labels, self.currentSortIndex)
 
     def eventFilter(self, source, event):
         if source == self.viewport():
             if event.type() == QtCore.QEvent.Type.MouseMove:
-                index = self.indexAt(event.pos())
-                row = index.row()
-                if row != self.hoveredRow:
-                    self.updateButtonHover(row)
-                    self.hoveredRow = row
+                self.setHoveredButton(*self.buttonAt(event.pos()))
             elif event.type() == QtCore.QEvent.Type.Leave:
-                self.updateButtonHover(-1)
-                self.hoveredRow = -1
+                self.setHoveredButton(-1, -1)
+            elif event.type() in (QtCore.QEvent.Type.MouseButtonPress, QtCore.QEvent.Type.MouseButtonRelease,
+                                  QtCore.QEvent.Type.MouseButtonDblClick):
+                # Clicking a button does not select its row
+                row, button = self.buttonAt(event.pos())
+                if button >= 0 and event.button() == Qt.MouseButton.LeftButton:
+                    if event.type() == QtCore.QEvent.Type.MouseButtonRelease:
+                        buttonHandlers = [self.handleViewButton, self.handleEditButton, self.handleDeleteButton]
+                        buttonHandlers[button](row)
+                    return True
         return super().eventFilter(source, event)
 
-    def updateButtonHover(self, newRow):
-        for row_idx in range(self.rowCount()):
-            isHovered = (row_idx == newRow)
-
-            for i, btn in enumerate(self.actionButtonsPerRow.get(row_idx, [])):
-                if isHovered:
-                    btn.setStyleSheet(f"""
-                        QPushButton {{
-                            background-color: {self.BUTTON_HOVER_COLORS[i]};
-                            border: none;
-                        }}
-                        QPushButton:hover {{
-                            background-color: {self.BUTTON_HOVER_HIGHLIGHT_COLORS[i]};
-                        }}
-                    """)
-                else:
-                    btn.setStyleSheet("background-color: transparent; border: none;")
+    def buttonAt(self, pos) -> tuple[int, int]:
+        """
+        Returns the row at the position in the viewport and the index of the action
+        button there, -1 for either if there is none.
+        """
+        index = self.indexAt(pos)
+        if not index.isValid():
+            return -1, -1
+        if index.column() != self.columnCount() - 1:
+            return index.row(), -1
+        return index.row(), self.actionButtonsDelegate.buttonAt(self.visualRect(index), pos)
+
+    def setHoveredButton(self, row, button):
+        """
+        Repaints the action buttons of the row the mouse left and of the row it entered,
+        the other rows are left as they are.
+        """
+        if (row, button) == (self.hoveredRow, self.hoveredButton):
+            return
+
+        previousRow = self.hoveredRow
+        self.hoveredRow = row
+        self.hoveredButton = button
+
+        if button >= 0:
+            self.viewport().setCursor(Qt.CursorShape.PointingHandCursor)
+        else:
+            self.viewport().unsetCursor()
+
+        for changedRow in {previousRow, row}:
+            if changedRow >= 0:
+                actionsIndex = self.tableModel.index(changedRow, self.columnCount() - 1)
+                self.viewport().update(self.visualRect(actionsIndex))
 
     @abstractmethod
     def updateTable(self):
@@ -0,0 +1,47 @@
+from PyQt6.QtWidgets import QLabel, QWidget
+from PyQt6.QtCore import Qt, QEvent, QTimer
+
+class LoadingOverlay(QLabel):
+    """
+    A translucent "Loading..." placeholder covering its parent widget while the data
+    of the widget is loaded in the background. It only appears if loading takes longer
+    than the delay, so quick reloads do not flicker.
+    """
+
+    def __init__(self, parent : QWidget, delay : int = 150):
+        super().__init__("Loading...", parent)
+        self.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.setStyleSheet("""
+            QLabel {
+                background-color: rgba(28, 28, 28, 170);
+                color: #BFBFBF;
+                font: 14pt "Urbanist";
+                border-radius: 12px;
+            }
+        """)
+        self.hide()
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay)
+        self.timer.timeout.connect(self.showOverlay)
+
+        parent.installEventFilter(self)
+
+    def setLoading(self, loading : bool):
+        if loading:
+            self.timer.start()
+        else:
+            self.timer.stop()
+            self.hide()
+
+    def showOverlay(self):
+        self.setGeometry(self.parentWidget().rect())
+        self.raise_()
+        self.show()
+
+    def eventFilter(self, watched, event):
+        if watched is self.parentWidget() and event.type() == QEvent.Type.Resize:
+            self.setGeometry(self.parentWidget().rect())
+        return super().eventFilter(watched, event)
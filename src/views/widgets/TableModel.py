@@ -0,0 +1,217 @@
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSignal
+from PyQt6.QtGui import QBrush, QColor
+
+class TableModel(QAbstractTableModel):
+    """
+    The rows of a table page. Each row is a dictionary read by a controller, shown in
+    the columns named by the database headers. The last column holds the actions of the
+    row and has no data, its buttons are painted by the table's delegate.
+    - columnHeaders: The titles of the columns, including the actions column.
+    - databaseHeaders: The keys of the shown values in the rows, the first being the ID.
+    - colorMap: The text colors of values, keyed by (column, value).
+    The rows are a window of consecutive pages. When streaming, scrolling to the end
+    asks the table for the next page through fetchMoreRequested.
+    """
+    fetchMoreRequested = pyqtSignal()
+
+    def __init__(self, columnHeaders: list[str], databaseHeaders: list[str], colorMap: dict[tuple[int, str], str], parent=None):
+        super().__init__(parent)
+        self.columnHeaders = list(columnHeaders)
+        self.headerLabels = list(columnHeaders)
+        self.databaseHeaders = databaseHeaders
+        self.sortedColumn = 0
+        self.rows = []
+        self.displayRows = []
+        # The page of the first row and the number of rows of each page in the window
+        self.firstPage = 1
+        self.pageSizes = []
+        self.streaming = False
+        self.hasNextPage = False
+        self.fetching = False
+
+        # The brushes are made once, painting a cell only looks them up
+        self.brushes = {key: QBrush(QColor(color)) for key, color in colorMap.items()}
+        self.headerBrush = QBrush(QColor(28, 28, 28))
+        self.sortedHeaderBrush = QBrush(QColor(48, 48, 48))
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.displayRows)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.columnHeaders)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.column() >= len(self.databaseHeaders):
+            return None
+        value = self.displayRows[index.row()][index.column()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return value
+        if role == Qt.ItemDataRole.ForegroundRole:
+            return self.brushes.get((index.column(), value))
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation != Qt.Orientation.Horizontal:
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.headerLabels[section]
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return "Click to sort"
+        if role == Qt.ItemDataRole.BackgroundRole:
+            return self.sortedHeaderBrush if section == self.sortedColumn else self.headerBrush
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        return not parent.isValid() and self.streaming and self.hasNextPage and not self.fetching
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        self.fetching = True
+        self.fetchMoreRequested.emit()
+
+    def setRows(self, rows: list[dict], page: int = 1):
+        """
+        Replaces the rows of the table with the rows of a page. The shown text of every
+        cell is made here once.
+        """
+        self.beginResetModel()
+        self.rows = list(rows)
+        self.displayRows = [self.displayRow(row) for row in rows]
+        self.firstPage = page
+        self.pageSizes = [len(rows)]
+        self.endResetModel()
+
+    def updateRows(self, rows: list[dict]):
+        """
+        Replaces the rows of the first page of the window with the rows read again for
+        it, and drops the pages after it. The rows are matched by ID, so only the rows
+        that were added, removed, moved or changed are updated, and the view keeps its
+        selection and scroll position.
+        """
+        while len(self.pageSizes) > 1:
+            self.removeLastPage()
+
+        newDisplayRows = [self.displayRow(row) for row in rows]
+        newIDs = [displayRow[0] for displayRow in newDisplayRows]
+        oldIDs = [displayRow[0] for displayRow in self.displayRows]
+        if len(set(newIDs)) != len(newIDs) or len(set(oldIDs)) != len(oldIDs):
+            self.setRows(rows, self.firstPage)
+            return
+
+        # Rows that left the page are removed first, in ranges from the bottom up
+        kept = set(newIDs)
+        row = len(self.displayRows) - 1
+        while row >= 0:
+            if self.displayRows[row][0] in kept:
+                row -= 1
+                continue
+            last = row
+            while row > 0 and self.displayRows[row - 1][0] not in kept:
+                row -= 1
+            self.beginRemoveRows(QModelIndex(), row, last)
+            del self.rows[row:last + 1]
+            del self.displayRows[row:last + 1]
+            self.endRemoveRows()
+            row -= 1
+
+        # The other rows are then inserted or moved into their new order and updated
+        shown = set(oldIDs)
+        for row, (newRow, newDisplayRow) in enumerate(zip(rows, newDisplayRows)):
+            id = newDisplayRow[0]
+            if row >= len(self.displayRows) or self.displayRows[row][0] != id:
+                if id not in shown:
+                    self.beginInsertRows(QModelIndex(), row, row)
+                    self.rows.insert(row, newRow)
+                    self.displayRows.insert(row, newDisplayRow)
+                    self.endInsertRows()
+                    continue
+                current = next(i for i in range(row + 1, len(self.displayRows)) if self.displayRows[i][0] == id)
+                self.beginMoveRows(QModelIndex(), current, current, QModelIndex(), row)
+                self.rows.insert(row, self.rows.pop(current))
+                self.displayRows.insert(row, self.displayRows.pop(current))
+                self.endMoveRows()
+
+            self.rows[row] = newRow
+            if self.displayRows[row] != newDisplayRow:
+                self.displayRows[row] = newDisplayRow
+                self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.databaseHeaders) - 1))
+
+        self.pageSizes = [len(self.rows)]
+
+    def lastPage(self) -> int:
+        return self.firstPage + len(self.pageSizes) - 1
+
+    def pageCount(self) -> int:
+        return len(self.pageSizes)
+
+    def appendPage(self, rows: list[dict]):
+        """
+        Adds the rows of the page after the last page of the window.
+        """
+        self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(rows) - 1)
+        self.rows.extend(rows)
+        self.displayRows.extend(self.displayRow(row) for row in rows)
+        self.pageSizes.append(len(rows))
+        self.endInsertRows()
+
+    def prependPage(self, rows: list[dict]):
+        """
+        Adds the rows of the page before the first page of the window.
+        """
+        self.beginInsertRows(QModelIndex(), 0, len(rows) - 1)
+        self.rows[:0] = rows
+        self.displayRows[:0] = [self.displayRow(row) for row in rows]
+        self.pageSizes.insert(0, len(rows))
+        self.firstPage -= 1
+        self.endInsertRows()
+
+    def removeFirstPage(self) -> int:
+        """
+        Drops the rows of the first page of the window and returns how many there were.
+        """
+        size = self.pageSizes.pop(0)
+        self.firstPage += 1
+        if size > 0:
+            self.beginRemoveRows(QModelIndex(), 0, size - 1)
+            del self.rows[:size]
+            del self.displayRows[:size]
+            self.endRemoveRows()
+        return size
+
+    def removeLastPage(self) -> int:
+        """
+        Drops the rows of the last page of the window and returns how many there were.
+        """
+        size = self.pageSizes.pop()
+        if size > 0:
+            start = len(self.rows) - size
+            self.beginRemoveRows(QModelIndex(), start, len(self.rows) - 1)
+            del self.rows[start:]
+            del self.displayRows[start:]
+            self.endRemoveRows()
+        return size
+
+    def displayRow(self, row: dict) -> list[str]:
+        return [str(row.get(column, "")) for column in self.databaseHeaders]
+
+    def setHeaderLabels(self, labels: list[str], sortedColumn: int):
+        self.headerLabels = list(labels)
+        self.sortedColumn = sortedColumn
+        self.headerDataChanged.emit(Qt.Orientation.Horizontal, 0, len(self.headerLabels) - 1)
+
+    def rowID(self, row: int) -> str | None:
+        """
+        Returns the shown ID of the row, or None if there is no such row.
+        """
+        if row < 0 or row >= len(self.displayRows):
+            return None
+        return self.displayRows[row][0]
+
+    def rowIDs(self) -> set[str]:
+        return {displayRow[0] for displayRow in self.displayRows}
@@ -25,6 +25,8 @@ from src.utils.formatMoney import formatMoneyNoDecimal, formatMoney
 from src.utils.constants import categoryColors, billDataHeaders, billDataDatabaseHeaders
 from src.views.widgets.CheckableComboBox import CheckableComboBox
 from src.views.dialogs.ViewBill import ViewBill
+from src.views.widgets.LoadingOverlay import LoadingOverlay
+from src.views.workers.RequestRunner import RequestRunner
 from src.controllers.dashboardController import DashboardController
 from src.controllers.billsController import BillsController
 
@@ -54,6 +56,10 @@ class UtilitySumChartWidget(QFrame):
 
         self.canvas.mpl_connect("motion_notify_event", self.onHover)
 
+        self.requestRunner = RequestRunner(self)
+        self.loadingOverlay = LoadingOverlay(self.canvas)
+        self.requestRunner.loadingChanged.connect(self.loadingOverlay.setLoading)
+
     def setupUI(self):
         layout = QVBoxLayout(self)
         self.setObjectName("UtilityChartWidget")
@@ -386,9 +392,16 @@ class UtilitySumChartWidget(QFrame):
     # Controllers
     def updateWidget(self) -> None:
         months = self.parseDateRangeToMonths(self.dateRange)
-        data, lastDateOffset = DashboardController.fetchUtilityDashboard(months, self.currDateOffset)
+        self.updatePageLabel()
+        self.requestRunner.request(DashboardController.fetchUtilityDashboard, months, self.currDateOffset,
+                                   onResult=self.applyDashboard, onError=self.handleLoadError)
+
+    def handleLoadError(self, error: Exception) -> None:
+        self.mainWindow.setStatusBarText(f"Failed to load the utilities chart: {error}")
+
+    def applyDashboard(self, result) -> None:
+        data, lastDateOffset = result
         self.data = data
         self.lastDateOffset = lastDateOffset
-        self.updatePageLabel()
-        
-        self.updateChart(data)
\ No newline at end of file
+
+        self.updateChart(data)
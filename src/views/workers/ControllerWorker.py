@@ -0,0 +1,85 @@
+import threading
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from src.models.DatabaseConnection import DatabaseConnection
+
+class WorkerSignals(QObject):
+    """
+    The signals of a ControllerWorker. They are created on the GUI thread, so the
+    slots connected to them run on the GUI thread when the worker emits them.
+    - finished: emitted with the request number and the result of the call.
+    - failed: emitted with the request number and the exception raised by the call.
+    """
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, object)
+
+class ControllerWorker(QRunnable):
+    """
+    Runs a controller method on a thread of the worker pool. The database connection
+    borrowed by the thread is returned to the pool when the call is done, so idle
+    worker threads do not hold connections.
+    - request: The number of the request, passed back with the result.
+    - function: The controller method to call.
+    - args: The arguments of the call.
+    """
+
+    __threadPool : QThreadPool = None
+
+    def __init__(self, request : int, function, *args):
+        super().__init__()
+        self.request = request
+        self.function = function
+        self.args = args
+        self.signals = WorkerSignals()
+
+        # The thread and the server ID of the connection while the call runs, guarded by the lock
+        self.__threadID = None
+        self.__connectionID = None
+        self.__cancelled = False
+        self.__lock = threading.Lock()
+
+    def run(self):
+        try:
+            with self.__lock:
+                if self.__cancelled:
+                    raise InterruptedError("The call was cancelled before it started.")
+                self.__threadID = threading.get_ident()
+                self.__connectionID = DatabaseConnection.getConnectionID()
+            result = self.function(*self.args)
+        except Exception as e:
+            print(f"Error: {e}")
+            self.signals.failed.emit(self.request, e)
+        else:
+            self.signals.finished.emit(self.request, result)
+        finally:
+            with self.__lock:
+                self.__threadID = None
+                self.__connectionID = None
+            DatabaseConnection.releaseConnection()
+
+    def cancel(self):
+        """
+        Stops the call. If it has not started, it fails right away; if it is running,
+        the statement it runs on the server is killed and the thread can run no further
+        statements, so the call fails with the error of the statement or with
+        InterruptedError between two statements. The worker still emits failed (or finished, if the call was already
+        done), so its owner knows when the worker thread is free again.
+        """
+        with self.__lock:
+            self.__cancelled = True
+            if self.__threadID is not None:
+                DatabaseConnection.cancelThread(self.__threadID)
+            if self.__connectionID is not None:
+                DatabaseConnection.killQuery(self.__connectionID)
+
+    @staticmethod
+    def threadPool() -> QThreadPool:
+        """
+        Returns the pool the workers run on. It has one thread less than the database
+        connection pool, so the GUI thread can always get a connection.
+        """
+        if ControllerWorker.__threadPool is None:
+            ControllerWorker.__threadPool = QThreadPool()
+            ControllerWorker.__threadPool.setMaxThreadCount(max(1, DatabaseConnection.getPoolSize() - 1))
+        return ControllerWorker.__threadPool
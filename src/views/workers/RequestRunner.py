@@ -0,0 +1,98 @@
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from src.views.workers.ControllerWorker import ControllerWorker
+
+class RequestRunner(QObject):
+    """
+    Runs the controller calls of one widget in the background and applies only the
+    result of the latest call. At most one call of the widget runs at a time: a call
+    requested while another runs waits for it and replaces any call that was already
+    waiting, and the result of a call that was replaced by a newer one is dropped.
+    - loadingChanged: emitted with True when the widget starts waiting for a result
+    and with False when the latest result was applied.
+    - cancelSuperseded: If True, a running call is stopped on the server as soon as a
+    newer call replaces it, instead of running to the end. Only for calls that read.
+    """
+    loadingChanged = pyqtSignal(bool)
+
+    def __init__(self, parent : QObject = None, cancelSuperseded : bool = False):
+        super().__init__(parent)
+        self.__cancelSuperseded = cancelSuperseded
+        self.__latest = 0
+        self.__running = None
+        self.__pending = None
+        self.__loading = False
+
+    def request(self, function, *args, onResult, onError = None):
+        """
+        Calls a controller method in the background.
+        - function: The controller method to call.
+        - args: The arguments of the call.
+        - onResult: Called on the GUI thread with the result, if no newer call was requested.
+        - onError: Called on the GUI thread with the exception raised by the call, if no
+        newer call was requested.
+        """
+        self.__latest += 1
+        call = (self.__latest, function, args, onResult, onError)
+        self.__setLoading(True)
+        if self.__running is not None:
+            self.__pending = call
+            self.__cancelRunning()
+            return
+        self.__start(call)
+
+    def cancel(self):
+        """
+        Drops the result of the running call and the waiting call.
+        """
+        self.__latest += 1
+        self.__pending = None
+        self.__cancelRunning()
+        self.__setLoading(False)
+
+    def isLoading(self) -> bool:
+        return self.__loading
+
+    def __setLoading(self, loading : bool):
+        if loading != self.__loading:
+            self.__loading = loading
+            self.loadingChanged.emit(loading)
+
+    def __cancelRunning(self):
+        if self.__cancelSuperseded and self.__running is not None:
+            self.__running[1].cancel()
+
+    def __start(self, call : tuple):
+        request, function, args, _, _ = call
+        worker = ControllerWorker(request, function, *args)
+        worker.signals.finished.connect(self.__onFinished)
+        worker.signals.failed.connect(self.__onFailed)
+        # The worker and its signals are kept alive until its result arrives
+        self.__running = (call, worker)
+        ControllerWorker.threadPool().start(worker)
+
+    def __onFinished(self, request : int, result):
+        call = self.__finish(request)
+        if call is not None:
+            call[3](result)
+
+    def __onFailed(self, request : int, error : Exception):
+        call = self.__finish(request)
+        if call is not None and call[4] is not None:
+            call[4](error)
+
+    def __finish(self, request : int) -> tuple | None:
+        """
+        Starts the waiting call, if any, and returns the finished call if its result
+        should be applied.
+        """
+        call, _ = self.__running
+        self.__running = None
+        if self.__pending is not None:
+            pending, self.__pending = self.__pending, None
+            self.__start(pending)
+            return None
+        if request != self.__latest:
+            return None
+        self.__setLoading(False)
+        return call
@@ -8,7 +8,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from src.controllers.unitsController import UnitsController
 from src.controllers.utilitiesController import UtilitiesController
-from src.controllers.billsController import BillsController
+from src.models.BillDatabaseTable import BillDatabaseTable as Bill
 
 # Simulated controllers
 # class UnitsController:
@@ -112,6 +112,7 @@ def generate_bills(utility_records, from_date):
     today = date.today()
     first_of_this_month = date(today.year, today.month, 1)
     month_cursor = date(from_date.year, from_date.month, 1)
+    bills = []
 
     while month_cursor < today:
         next_month = (month_cursor.replace(day=28) + timedelta(days=4)).replace(day=1)
@@ -175,17 +176,21 @@ def generate_bills(utility_records, from_date):
             if billing_end.toPyDate() > today:
                 continue
 
-            BillsController.addBill(
-                unitID=str(record["unit_id"]),
-                utilityID=str(record["id"]),
-                totalAmount=f"{amount:.2f}",
-                billingPeriodStart=billing_start,
-                billingPeriodEnd=billing_end,
-                status=status,
-                dueDate=due_date
-            )
+            bills.append({
+                "UnitID": record["unit_id"],
+                "UtilityID": record["id"],
+                "TotalAmount": f"{amount:.2f}",
+                "BillingPeriodStart": billing_start.toString("yyyy-MM-dd"),
+                "BillingPeriodEnd": billing_end.toString("yyyy-MM-dd"),
+                "Status": status,
+                "DueDate": due_date.toString("yyyy-MM-dd")
+            })
         month_cursor = next_month
 
+    # Insert all the generated bills in a few multi-row statements
+    ids, count = Bill.createMany(bills)
+    print(f"Added {count} bills")
+
 # Run everything
 unit_groups = create_units()
 utility_data = add_utilities(unit_groups, START_DATE)
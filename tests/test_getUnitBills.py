@@ -0,0 +1,87 @@
+import datetime
+
+import pytest
+
+pytest.importorskip("mysql.connector")
+pytest.importorskip("dotenv")
+
+from src.models.DatabaseConnection import DatabaseConnection
+from src.models.SchemaCache import SchemaCache
+from src.models.BillDatabaseTable import BillDatabaseTable
+from src.utils.constants import Range
+
+METADATA = {
+    "bill": {"primary": ["BillID"], "columns": ["BillID", "UnitID", "UtilityID", "TotalAmount",
+                "BillingPeriodStart", "BillingPeriodEnd", "Status", "DueDate"]},
+    "unit": {"primary": ["UnitID"], "columns": ["UnitID", "Name", "Address", "Type"]},
+    "utility": {"primary": ["UtilityID"], "columns": ["UtilityID", "Type", "Status", "BillingCycle"]},
+    "installedutility": {"primary": ["UnitID", "UtilityID"], "columns": ["UnitID", "UtilityID", "InstallationDate"]}
+}
+
+TYPES = ["Electricity", "Water", "Internet", "Gas", "Trash", "Maintenance", "Miscellaneous"]
+
+class FakeCursor:
+    """
+    Counts the statements executed on it and returns the rows of the joined bills
+    query for a unit with the given number of utilities, each with two bills.
+    """
+
+    def __init__(self, utilities : int, log : list):
+        self.utilities = utilities
+        self.log = log
+
+    def execute(self, sql, params = ()):
+        self.log.append(sql)
+
+    def fetchall(self):
+        rows = []
+        for utilityID in range(1, self.utilities + 1):
+            for month in [1, 2]:
+                rows.append({"UtilityID": utilityID,
+                             "Type": TYPES[(utilityID - 1) % len(TYPES)],
+                             "BillID": utilityID * 10 + month,
+                             "TotalAmount": 100.0 * month,
+                             "BillingPeriodEnd": datetime.date(2025, month, 28)})
+        return rows
+
+    def fetchone(self):
+        rows = self.fetchall()
+        return rows[0] if len(rows) > 0 else None
+
+    def close(self):
+        pass
+
+@pytest.fixture
+def database(monkeypatch):
+    log = []
+    state = {"utilities": 1}
+    monkeypatch.setattr(SchemaCache, "getMetadata", staticmethod(lambda tableName : METADATA[tableName]))
+    monkeypatch.setattr(DatabaseConnection, "getCursor",
+                        staticmethod(lambda sql : FakeCursor(state["utilities"], log)))
+    return log, state
+
+@pytest.mark.parametrize("utilities", [1, 3, 7])
+def test_query_count_does_not_grow_with_utilities(database, utilities):
+    log, state = database
+    state["utilities"] = utilities
+
+    result = BillDatabaseTable.getUnitBills(1, Range.THREE_MONTHS, 1)
+
+    assert len(log) == 1
+    assert list(result.keys()) == TYPES[:utilities]
+    for bills in result.values():
+        assert [bill["TotalAmount"] for bill in bills] == [100.0, 200.0]
+        assert set(bills[0].keys()) == {"BillID", "TotalAmount", "BillingPeriodEnd"}
+
+def test_later_utility_of_same_type_replaces_earlier(database):
+    log, state = database
+    state["utilities"] = len(TYPES) + 1
+
+    result = BillDatabaseTable.getUnitBills(1, Range.THREE_MONTHS, 1)
+
+    assert len(log) == 1
+    assert [bill["BillID"] for bill in result[TYPES[0]]] == [(len(TYPES) + 1) * 10 + 1, (len(TYPES) + 1) * 10 + 2]
+
+def test_rejects_non_integer_unit(database):
+    with pytest.raises(ValueError):
+        BillDatabaseTable.getUnitBills("1", Range.THREE_MONTHS, 1)
@@ -0,0 +1,57 @@
+import pytest
+
+pytest.importorskip("mysql.connector")
+
+from src.models.PreparedStatementCache import PreparedStatementCache
+
+class FakePreparedCursor:
+    """
+    Prepares the statement again whenever it is executed with a string object other
+    than the last one, like the connector's prepared cursor.
+    """
+
+    def __init__(self, log : dict):
+        self.log = log
+        self._executed = None
+        self.rowcount = 0
+        self.lastrowid = None
+
+    def execute(self, operation, params = ()):
+        if operation is not self._executed:
+            if self._executed is not None:
+                self.log["closes"] += 1
+            self.log["prepares"] += 1
+            self._executed = operation
+        self.log["executes"] += 1
+
+    def fetchall(self):
+        return []
+
+    def close(self):
+        pass
+
+class FakeConnection:
+
+    def __init__(self):
+        self.log = {"prepares": 0, "closes": 0, "executes": 0}
+        self.unread_result = False
+
+    def cursor(self, prepared = False, dictionary = False):
+        return FakePreparedCursor(self.log)
+
+def buildSQL(table : str) -> str:
+    return f"SELECT * FROM {table} WHERE {table}ID = %s"
+
+def test_rebuilt_statement_is_prepared_once():
+    connection = FakeConnection()
+    cache = PreparedStatementCache(connection)
+
+    for id in [1, 2]:
+        sql = buildSQL("unit")
+        cursor = cache.getCursor(sql)
+        cursor.execute(sql, (id,))
+        cursor.close()
+
+    assert buildSQL("unit") is not buildSQL("unit")
+    assert cache.hits == 1 and cache.misses == 1
+    assert connection.log == {"prepares": 1, "closes": 0, "executes": 2}